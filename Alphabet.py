@@ -0,0 +1,40 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: Alphabet.py                                                      #
+# Description: The alphabets a cipher can work over. Letters is the way the   #
+#              ciphers have always worked, on a - z. Bytes treats every one   #
+#              of the 256 byte values as a symbol, so any file, binary or     #
+#              not, comes back out exactly as it went in:                     #
+#                                                                             #
+#              Caesar          adds the key to every byte, mod 256            #
+#              Vigenre         adds the bytes of the key, mod 256             #
+#              Railfence       moves the bytes, nothing is dropped            #
+#              RowTransposition moves the bytes, the last row is left short  #
+#                              instead of being filled with x                 #
+#                                                                             #
+#              The bytes alphabet only takes bytes, text is never decoded.    #
+###############################################################################
+
+LETTERS = "letters"
+BYTES = "bytes"
+ALPHABETS = (LETTERS, BYTES)
+
+# Number of symbols in the bytes alphabet
+SIZE = 256
+
+# Byte tables that add a shift to every byte mod 256, indexed by the shift.
+# Subtracting a shift is adding SIZE - shift.
+ADD_TABLES = [bytes(range(shift, SIZE)) + bytes(range(shift))
+              for shift in range(SIZE)]
+
+
+# Input: An alphabet name
+# Output: True if it is one of ALPHABETS
+def is_alphabet(alphabet):
+    return alphabet in ALPHABETS
+
+
+# Input: The shift to undo
+# Output: The byte table that undoes it
+def subtract_table(shift):
+    return ADD_TABLES[-shift % SIZE]
@@ -0,0 +1,144 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: Batch.py                                                         #
+# Description: Runs one cipher over a whole set of files. The files can come  #
+#              from a directory, a glob pattern or a manifest file with one   #
+#              path per line. The work is spread over a pool of processes     #
+#              and the results are written to a tree that mirrors the input.  #
+#              A file that fails is reported and the rest carry on.           #
+###############################################################################
+
+import Alphabet
+import Cipher
+import Normalize
+import concurrent.futures
+import glob
+import io
+import os
+import time
+
+
+# Characters that make a source a glob pattern instead of a file name
+GLOB_CHARACTERS = "*?["
+
+
+# Input: A file name or glob pattern
+# Output: True if it is a glob pattern
+def is_pattern(source):
+    return any(c in source for c in GLOB_CHARACTERS)
+
+
+# Find the files to work on
+# Input: A directory, a glob pattern or a manifest file
+# Output: The list of files and the directory they should be mirrored from
+def collect_files(source):
+    if os.path.isdir(source):
+        files = []
+        for directory, _, names in os.walk(source):
+            for name in sorted(names):
+                files.append(os.path.join(directory, name))
+        return sorted(files), source
+
+    if is_pattern(source):
+        files = [f for f in glob.glob(source, recursive=True)
+                 if os.path.isfile(f)]
+    else:
+        # A manifest lists one file per line
+        with open(source, "r") as manifest:
+            files = [line.strip() for line in manifest if line.strip()]
+
+    if not files:
+        return [], "."
+
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(f))
+                               for f in files])
+    return sorted(files), root
+
+
+# Encrypt or decrypt one file. Runs in a worker process.
+# Input: The cipher name, the key, "e" or "d", the input and output paths,
+#        the policy for cleaning up plain text and the alphabet
+# Output: The input path, the number of bytes read and an error message, or
+#         None if everything went fine
+def process_file(name, key, mode, in_path, out_path,
+                 policy=Normalize.KEEP, alphabet=Alphabet.LETTERS):
+    try:
+        # Each worker keeps the ciphers it has built, so the key is only
+        # set up once per worker
+        cipher = Cipher.make_cipher(name, key, policy=policy,
+                                    alphabet=alphabet)
+
+        with open(in_path, "rb") as input_file:
+            data = input_file.read()
+
+        # Letters are read the way the CLI reads them, as text. Plain ASCII
+        # comes out the same as bytes, anything else is decoded.
+        text = data
+        if alphabet == Alphabet.LETTERS and not Cipher.same_as_text(data):
+            text = io.TextIOWrapper(io.BytesIO(data)).read()
+
+        if mode == "e":
+            result = cipher.encrypt(text)
+        else:
+            result = cipher.decrpyt(text)
+
+        directory = os.path.dirname(out_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with open(out_path, "w" if isinstance(result, str) else "wb") \
+                as output_file:
+            output_file.write(result)
+    except (IOError, ValueError) as error:
+        return in_path, 0, str(error)
+
+    return in_path, len(data), None
+
+
+# Run a cipher over a batch of files and print a summary at the end
+# Input: The cipher name, the key, "e" or "d", where the files come from,
+#        the directory to write to, the number of worker processes, the
+#        policy for cleaning up plain text and the alphabet
+# Output: The number of files that failed
+def run_batch(name, key, mode, source, out_dir, workers=None,
+              policy=Normalize.KEEP, alphabet=Alphabet.LETTERS):
+    try:
+        files, root = collect_files(source)
+    except IOError as error:
+        print("Error reading manifest: {}".format(error))
+        return 1
+
+    out_paths = [os.path.join(out_dir, os.path.relpath(os.path.abspath(f),
+                                                       os.path.abspath(root)))
+                 for f in files]
+
+    start = time.monotonic()
+    total_bytes = 0
+    failed = 0
+
+    # Lots of small files are handed out in groups to cut down on the
+    # back and forth with the workers
+    chunk_size = max(1, len(files) // (4 * (workers or os.cpu_count() or 1)))
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        results = executor.map(process_file,
+                               [name] * len(files), [key] * len(files),
+                               [mode] * len(files), files, out_paths,
+                               [policy] * len(files),
+                               [alphabet] * len(files), chunksize=chunk_size)
+
+        for in_path, size, error in results:
+            if error is not None:
+                failed += 1
+                print("Failed: {}: {}".format(in_path, error))
+            total_bytes += size
+
+    elapsed = max(time.monotonic() - start, 1e-9)
+    done = len(files) - failed
+
+    print("Processed {} of {} files, {} bytes in {:.2f}s".format(
+        done, len(files), total_bytes, elapsed))
+    print("{:.1f} files/sec, {:.2f} MB/sec".format(
+        done / elapsed, total_bytes / elapsed / 1e6))
+
+    return failed
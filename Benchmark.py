@@ -0,0 +1,282 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: Benchmark.py                                                     #
+# Description: Measures how fast each cipher encrypts and decrypts. The text  #
+#              is generated from a fixed seed so every run uses the same      #
+#              English-like corpus. Results are written as JSON and can be    #
+#              checked against a stored baseline; the run fails if a cipher   #
+#              got slower than the allowed percentage.                        #
+#                                                                             #
+#              python3 Benchmark.py --sizes 1KB,1MB -o results.json           #
+#              python3 Benchmark.py --baseline results.json --threshold 10    #
+###############################################################################
+
+import Cipher
+import Sizes
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+# Common English words and roughly how often they show up, used to build a
+# corpus with realistic letter, pair and doubled letter frequencies
+WORDS = {
+    "the": 56, "of": 31, "and": 29, "to": 26, "a": 22, "in": 18, "is": 10,
+    "you": 10, "that": 10, "it": 10, "he": 9, "was": 9, "for": 9, "on": 8,
+    "are": 7, "as": 7, "with": 7, "his": 7, "they": 6, "at": 6, "be": 6,
+    "this": 6, "have": 6, "from": 5, "or": 5, "one": 5, "had": 5, "by": 5,
+    "word": 4, "but": 4, "not": 4, "what": 4, "all": 4, "were": 4, "we": 4,
+    "when": 4, "your": 3, "can": 3, "said": 3, "there": 3, "use": 3,
+    "each": 3, "which": 3, "she": 3, "do": 3, "how": 3, "their": 3, "if": 3,
+    "will": 3, "up": 3, "other": 2, "about": 2, "out": 2, "many": 2,
+    "then": 2, "them": 2, "these": 2, "so": 2, "some": 2, "her": 2,
+    "would": 2, "make": 2, "like": 2, "him": 2, "into": 2, "time": 2,
+    "has": 2, "look": 2, "two": 2, "more": 2, "write": 2, "go": 2, "see": 2,
+    "number": 1, "no": 1, "way": 1, "could": 1, "people": 1, "my": 1,
+    "than": 1, "first": 1, "water": 1, "been": 1, "call": 1, "who": 1,
+    "oil": 1, "its": 1, "now": 1, "find": 1, "long": 1, "down": 1, "day": 1,
+    "did": 1, "get": 1, "come": 1, "made": 1, "may": 1, "part": 1,
+    "letter": 1, "little": 1, "small": 1, "still": 1, "between": 1,
+    "good": 1, "street": 1, "book": 1, "three": 1, "across": 1, "quick": 1,
+    "jump": 1, "puzzle": 1, "zebra": 1, "happy": 1, "keep": 1, "less": 1,
+}
+
+# Keys for every cipher, one short and one long
+KEYS = {
+    "caesar": ["3", "23"],
+    "vigenre": ["key", "thequickbrownfoxjumpsoverthelazydog"],
+    "playfair": ["key", "playfairexample"],
+    "railfence": ["3", "97"],
+    "rowtransposition": ["3142", "836152479"],
+}
+
+DEFAULT_SIZES = "1KB,64KB,1MB,16MB"
+
+# Size of the pieces larger corpora are stitched together from
+PIECE_SIZE = 1 << 16
+
+
+# Build an English-like corpus. Small corpora are made word by word; larger
+# ones are stitched together from a pool of pieces so a 1GB corpus doesn't
+# take longer to generate than to encrypt.
+# Input: The number of characters and the seed
+# Output: The corpus as a string
+def make_corpus(length, seed=0):
+    rng = random.Random(seed)
+    words = list(WORDS)
+    weights = list(WORDS.values())
+
+    def make_piece(size):
+        text = []
+        total = 0
+        while total < size:
+            sentence = " ".join(rng.choices(words, weights, k=12)) + ".\n"
+            text.append(sentence)
+            total += len(sentence)
+        return "".join(text)[:size]
+
+    if length <= PIECE_SIZE:
+        return make_piece(length)
+
+    pieces = [make_piece(PIECE_SIZE) for _ in range(16)]
+    count = -(-length // PIECE_SIZE)
+    return "".join(rng.choice(pieces) for _ in range(count))[:length]
+
+
+# Each sample calls the function over and over until this many seconds have
+# gone by, the way timeit's autorange does, so a call of a few microseconds
+# is timed as well as a long one
+MIN_SAMPLE_TIME = 0.05
+
+# Calls shorter than this many seconds are still noisy after looping, so
+# they get SHORT_TOLERANCE times the allowed slowdown
+SHORT_CALL = 1e-3
+SHORT_TOLERANCE = 3
+
+
+# Time one sample of a function, calling it until MIN_SAMPLE_TIME has gone
+# by
+# Input: The function and its argument
+# Output: The time of one call in seconds and the result of the last call
+def time_call(function, argument):
+    number = 0
+    start = time.perf_counter()
+    while True:
+        result = function(argument)
+        number += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SAMPLE_TIME:
+            return elapsed / number, result
+
+
+# Run every cipher with every key over every corpus size. The samples of
+# each size are taken in rounds over all the ciphers and keys, so a slow
+# spell on the machine doesn't land on every sample of one measurement.
+# Input: The cipher names, the sizes, how many samples to take the best of
+#        and whether to use bytes instead of str
+# Output: A list of result records
+def run_benchmarks(ciphers, sizes, repeat=3, use_bytes=False):
+    results = []
+
+    for size in sizes:
+        corpus = make_corpus(size)
+        if use_bytes:
+            corpus = corpus.encode("ascii")
+
+        best = {}
+        for _ in range(repeat):
+            for name in ciphers:
+                for key in KEYS[name]:
+                    cipher = Cipher.make_cipher(name, key)
+
+                    seconds, cipher_text = time_call(cipher.encrypt, corpus)
+                    keep_best(best, (name, key, "encrypt"), seconds)
+
+                    seconds, _ = time_call(cipher.decrpyt, cipher_text)
+                    keep_best(best, (name, key, "decrypt"), seconds)
+
+        for (name, key, operation), seconds in best.items():
+            results.append(make_record(name, key, size, operation, seconds,
+                                       use_bytes))
+
+    return results
+
+
+# Input: The best times so far, what was measured and a new time
+# Output: None, the time is kept if it is the best yet
+def keep_best(best, measurement, seconds):
+    if measurement not in best or seconds < best[measurement]:
+        best[measurement] = seconds
+
+
+# Input: What was measured, how long it took and whether it was the bytes
+#        path
+# Output: A result record
+def make_record(name, key, size, operation, seconds, use_bytes=False):
+    return {
+        "cipher": name,
+        "key": key,
+        "size": size,
+        "operation": operation,
+        "bytes": use_bytes,
+        "seconds": seconds,
+        "mb_per_sec": size / max(seconds, 1e-12) / 1e6,
+    }
+
+
+# The fields that say which measurement a record is for
+# Input: A result record
+# Output: A tuple that is the same for the same measurement in any run.
+#         The bytes path is a different measurement from the str one.
+def record_id(record):
+    return (record["cipher"], record["key"], record["size"],
+            record["operation"], record["bytes"])
+
+
+# Compare a run with a baseline
+# Input: The new results, the baseline results and the allowed slowdown in
+#        percent
+# Output: A list of (record, baseline record, slowdown in percent) for every
+#         measurement that got slower than allowed. Short calls are allowed
+#         more.
+def find_regressions(results, baseline, threshold):
+    old = {record_id(record): record for record in baseline}
+
+    regressions = []
+    for record in results:
+        before = old.get(record_id(record))
+        if before is None:
+            continue
+
+        allowed = threshold
+        if min(before["seconds"], record["seconds"]) < SHORT_CALL:
+            allowed *= SHORT_TOLERANCE
+
+        slowdown = (before["mb_per_sec"] - record["mb_per_sec"]) / \
+            before["mb_per_sec"] * 100
+        if slowdown > allowed:
+            regressions.append((record, before, slowdown))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ciphers")
+    parser.add_argument("-c", "--ciphers", default=",".join(KEYS),
+                        help="comma separated ciphers to run")
+    parser.add_argument("-s", "--sizes", default=DEFAULT_SIZES,
+                        help="comma separated corpus sizes, 1KB up to 1GB")
+    parser.add_argument("-r", "--repeat", type=int, default=5,
+                        help="samples per measurement, the fastest is kept")
+    parser.add_argument("--bytes", action="store_true",
+                        help="benchmark the bytes path instead of str")
+    parser.add_argument("-o", "--output", help="file to write the JSON to")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="allowed slowdown against the baseline in "
+                             "percent")
+    args = parser.parse_args(argv)
+
+    ciphers = [c.strip().lower() for c in args.ciphers.split(",")]
+    for name in ciphers:
+        if name not in KEYS:
+            print("Unknown cipher: {}".format(name))
+            return 2
+
+    sizes = [Sizes.parse_size(size) for size in args.sizes.split(",")]
+    results = run_benchmarks(ciphers, sizes, args.repeat, args.bytes)
+
+    for record in results:
+        print("{cipher:>16} {key:>36} {size:>11} {operation:>7} "
+              "{seconds:10.6f}s {mb_per_sec:10.2f} MB/s".format(**record),
+              file=sys.stderr)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "bytes": args.bytes,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, "r") as baseline_file:
+            baseline_report = json.load(baseline_file)
+
+        # Records from before they said which path they timed take it from
+        # the report
+        baseline = baseline_report["results"]
+        for record in baseline:
+            record.setdefault("bytes", baseline_report.get("bytes", False))
+
+        # Nothing to compare with passes for the wrong reason
+        compared = {record_id(record) for record in baseline}
+        if not any(record_id(record) in compared for record in results):
+            print("No measurements in the baseline match this run (was it "
+                  "the other of str and --bytes?)", file=sys.stderr)
+            return 2
+
+        regressions = find_regressions(results, baseline, args.threshold)
+        for record, before, slowdown in regressions:
+            print("Regression: {} {} key={} size={}: {:.2f} -> {:.2f} MB/s "
+                  "({:.1f}% slower)".format(
+                      record["cipher"], record["operation"], record["key"],
+                      record["size"], before["mb_per_sec"],
+                      record["mb_per_sec"], slowdown), file=sys.stderr)
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
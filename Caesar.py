@@ -7,10 +7,115 @@
 #              letters are shifted and wrap around with z->a.                 #
 ###############################################################################
 
+import Alphabet
 import CipherInterface
+import Normalize
+
+
+class ShiftTable(dict):
+    # Translation table for one Caesar shift. Only the first 256 characters
+    # are stored up front; anything past that is worked out the first time
+    # it shows up, using the same rule, so the output matches character for
+    # character.
+    def __init__(self, rule):
+        dict.__init__(self)
+        self.rule = rule
+
+        for i in range(256):
+            self[i] = rule(i)
+
+    def __missing__(self, letter_ascii):
+        self[letter_ascii] = self.rule(letter_ascii)
+        return self[letter_ascii]
+
+
+# Shift a character forward by the key
+# Going out of bounds on the letter ascii > (z = 122), loop back to
+# beginning. EX: ascii of 123-26 = 97 = a
+# Input: The key and the ascii value of the character
+# Output: The ascii value of the shifted character
+def shift_forward(key, letter_ascii):
+    letter_ascii += key
+
+    if letter_ascii > 122:
+        letter_ascii -= 26
+
+    return letter_ascii
+
+
+# Shift a character back by the key
+# Going out of bounds on the letter ascii < (a = 97), loop back to
+# end. EX: ascii of 96+26 = 122 = z
+# Input: The key and the ascii value of the character
+# Output: The ascii value of the shifted character
+def shift_back(key, letter_ascii):
+    letter_ascii -= key
+
+    if letter_ascii < 97:
+        letter_ascii += 26
+
+    return letter_ascii
+
+
+# Lowercase a single ASCII character
+# Input: The ascii value of the character
+# Output: The ascii value of the lowercase character
+def lower(letter_ascii):
+    if 65 <= letter_ascii <= 90:
+        return letter_ascii + 32
+
+    return letter_ascii
+
+
+# Build the translation tables for every valid key (1 - 25) once at import.
+# Spaces are never encrypted, so the encrypt tables delete them.
+# Input: None
+# Output: Lists of str tables and bytes tables, indexed by key
+def build_tables():
+    encrypt_tables = [None]
+    decrypt_tables = [None]
+    encrypt_byte_tables = [None]
+    decrypt_byte_tables = [None]
+
+    for key in range(1, 26):
+        encrypt_table = ShiftTable(
+            lambda c, key=key: chr(shift_forward(key, c)))
+        encrypt_table[ord(" ")] = None
+        encrypt_tables.append(encrypt_table)
+
+        decrypt_tables.append(ShiftTable(
+            lambda c, key=key: chr(shift_back(key, c))))
+
+        # Bytes can only hold 0 - 255, wrap the few characters at the very
+        # top of the range that would shift past that. Uppercase letters are
+        # lowered as part of the lookup.
+        encrypt_byte_tables.append(bytes(
+            shift_forward(key, lower(c)) % 256 for c in range(256)))
+        decrypt_byte_tables.append(bytes(
+            shift_back(key, lower(c)) % 256 for c in range(256)))
+
+    return encrypt_tables, decrypt_tables, \
+        encrypt_byte_tables, decrypt_byte_tables
+
+
+ENCRYPT_TABLES, DECRYPT_TABLES, ENCRYPT_BYTE_TABLES, DECRYPT_BYTE_TABLES = \
+    build_tables()
+
+
+# Shift only the letters, for the passthrough policy
+# Input: A string (or bytes) of text and the str and bytes tables to use
+# Output: The text with its letters shifted
+def shift_letters(text, tables):
+    if isinstance(text, str):
+        return text.translate(tables[0])
+
+    return bytes(text).translate(tables[1])
 
 
 class Caesar(CipherInterface.CipherInterface):
+    alphabets = Alphabet.ALPHABETS
+    policies = Normalize.POLICIES
+
     def __init__(self):
         self.key = ""
 
@@ -18,13 +123,14 @@ class Caesar(CipherInterface.CipherInterface):
     # Input: User defined key
     # Output: True of False if the key is valid
     def set_key(self, key):
+        size = Alphabet.SIZE if self.alphabet == Alphabet.BYTES else 26
 
         # Valid key for Caesar is any integer digit > 0
-        # Also if the key mod 26 is 0, it is invalid
+        # Also if the key mod 26 (256 for bytes) is 0, it is invalid
         # A key of 0 or a multiple of 26 means no encrpytion happens
-        if key.isdigit() and key != "0" and int(key) % 26 != 0:
+        if key.isdigit() and key != "0" and int(key) % size != 0:
 
-            self.key = int(key) % 26
+            self.key = int(key) % size
 
             return True
         else:
@@ -32,54 +138,113 @@ class Caesar(CipherInterface.CipherInterface):
             return False
 
     # Encrypt the given plain text based on the key
-    # Input: A string of plain text
+    # Input: A string (or bytes) of plain text
     # Output: The resulting cipher text
     def encrypt(self, plain_text):
-        # Convert to lowercase so AbC will react the same as abc, etc.
-        plain = plain_text.lower()
-        cipher_text = ""
-        key = self.key
-
-        # Go through each letter in the plain text, convert to ascii, and
-        # increment by the key
-        for c in plain:
-            # Don't encrypt spaces
-            if c == " ":
-                continue
+        if self.alphabet == Alphabet.BYTES:
+            return CipherInterface.raw_bytes(plain_text).translate(
+                Alphabet.ADD_TABLES[self.key])
 
-            letter_ascii = ord(c)
-            letter_ascii += key
+        if self.policy == Normalize.PASSTHROUGH:
+            return shift_letters(plain_text,
+                                 Normalize.SHIFT_TABLES[self.key])
 
-            # Going out of bounds on the letter ascii > (z = 122), loop back to
-            # beginning. EX: ascii of 123-26 = 97 = a
-            if letter_ascii > 122:
-                letter_ascii -= 26
+        plain_text = self.normalize(plain_text)
 
-            # Build the cipher text
-            cipher_text += chr(letter_ascii)
+        # The shift tables already drop spaces and wrap z->a, so the whole
+        # text is encrypted in a single translate pass
+        if isinstance(plain_text, str):
+            # Convert to lowercase so AbC will react the same as abc, etc.
+            # Normalized text already is.
+            plain = plain_text.lower() \
+                if self.policy == Normalize.KEEP else plain_text
+            return plain.translate(ENCRYPT_TABLES[self.key])
 
-        return cipher_text
+        # The byte tables treat A-Z as a-z, so there is no lower() copy
+        return bytes(plain_text).translate(ENCRYPT_BYTE_TABLES[self.key],
+                                           b" ")
 
     # Decrypt the given cipher text based on the key
-    # Input: A string of cipher text
+    # Input: A string (or bytes) of cipher text
     # Output: The resulting plain text
     def decrpyt(self, cipher_text):
-        cipher = cipher_text.lower()
-        plain_text = ""
-        key = self.key
-
-        # Go through each letter in the cipher text, convert to ascii, and
-        # decrement by the key
-        for c in cipher:
-            letter_ascii = ord(c)
-            letter_ascii -= key
-
-            # Going out of bounds on the letter ascii < (a = 97), loop back to
-            # end. EX: ascii of 96+26 = 122 = z
-            if letter_ascii < 97:
-                letter_ascii += 26
-
-            # Build the plain text
-            plain_text += chr(letter_ascii)
-
-        return plain_text
+        if self.alphabet == Alphabet.BYTES:
+            return CipherInterface.raw_bytes(cipher_text).translate(
+                Alphabet.subtract_table(self.key))
+
+        if self.policy == Normalize.PASSTHROUGH:
+            return shift_letters(cipher_text,
+                                 Normalize.UNSHIFT_TABLES[self.key])
+
+        if isinstance(cipher_text, str):
+            cipher = cipher_text.lower()
+            return cipher.translate(DECRYPT_TABLES[self.key])
+
+        return bytes(cipher_text).translate(DECRYPT_BYTE_TABLES[self.key])
+
+    # Encrypt many texts. Each one is already a single translate, so the
+    # work saved is everything around it: the policy, the type and the
+    # table are only looked at once.
+    # Input: A list of strings (or bytes) of plain text
+    # Output: A list of the cipher texts, in the same order
+    def encrypt_many(self, plain_texts):
+        if self.alphabet == Alphabet.BYTES:
+            table = Alphabet.ADD_TABLES[self.key]
+            return [CipherInterface.raw_bytes(text).translate(table)
+                    for text in plain_texts]
+
+        if self.policy != Normalize.KEEP:
+            plain_texts = [self.normalize(text) for text in plain_texts]
+
+        texts, is_str = CipherInterface.as_byte_texts(plain_texts)
+        if texts is None or self.policy == Normalize.PASSTHROUGH:
+            return CipherInterface.CipherInterface.encrypt_many(self,
+                                                                plain_texts)
+
+        table = ENCRYPT_BYTE_TABLES[self.key]
+        return CipherInterface.from_byte_texts(
+            [text.translate(table, b" ") for text in texts], is_str)
+
+    # Decrypt many texts, looking at the type and the table only once
+    # Input: A list of strings (or bytes) of cipher text
+    # Output: A list of the plain texts, in the same order
+    def decrypt_many(self, cipher_texts):
+        if self.alphabet == Alphabet.BYTES:
+            table = Alphabet.subtract_table(self.key)
+            return [CipherInterface.raw_bytes(text).translate(table)
+                    for text in cipher_texts]
+
+        texts, is_str = CipherInterface.as_byte_texts(cipher_texts)
+        if texts is None or self.policy == Normalize.PASSTHROUGH:
+            return CipherInterface.CipherInterface.decrypt_many(self,
+                                                                cipher_texts)
+
+        table = DECRYPT_BYTE_TABLES[self.key]
+        return CipherInterface.from_byte_texts(
+            [text.translate(table) for text in texts], is_str)
+
+    # Every letter is shifted on its own, so chunks go straight through
+    # Input: None
+    # Output: An object with update() and finalize()
+    def encryptor(self):
+        return CipherInterface.ChunkStream(self.encrypt, self.empty_text())
+
+    # Input: None
+    # Output: An object with update() and finalize()
+    def decryptor(self):
+        return CipherInterface.ChunkStream(self.decrpyt, self.empty_text())
+
+    # Input: "e" or "d" and the whitespace to delete (only spaces are)
+    # Output: Spaces are deleted when encrypting and one table is used for
+    #         every letter. The bytes alphabet deletes nothing.
+    def substitution(self, mode,
+                     whitespace=CipherInterface.BYTE_WHITESPACE):
+        if self.alphabet == Alphabet.BYTES:
+            table = Alphabet.ADD_TABLES[self.key] if mode == "e" else \
+                Alphabet.subtract_table(self.key)
+            return b"", [list(table)]
+
+        if mode == "e":
+            return b" ", [list(ENCRYPT_BYTE_TABLES[self.key])]
+
+        return b"", [list(DECRYPT_BYTE_TABLES[self.key])]
@@ -0,0 +1,318 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: Chain.py                                                         #
+# Description: Runs several ciphers one after another as if they were one.    #
+#              The key is the list of ciphers and their keys, like            #
+#              vigenre:lemon,rowtransposition:3142. Decrypting runs the       #
+#              chain backwards.                                               #
+#                                                                             #
+#              Ciphers next to each other that only swap bytes (Caesar,       #
+#              Vigenre) are folded into one set of tables with one table per  #
+#              key position, and ciphers next to each other that only move    #
+#              bytes (Railfence, RowTransposition) into one permutation, so   #
+#              each group goes over the text once.                            #
+###############################################################################
+
+import Alphabet
+import Cipher
+import CipherInterface
+import Permutation
+import math
+
+# Longest key that substitutions are folded into. Folding two keys makes a
+# key as long as their least common multiple.
+MAX_PERIOD = 1 << 12
+
+# Most moves a folded permutation can have. Each move is one slice.
+MAX_MOVES = 1 << 12
+
+
+# Split a chain key into its ciphers
+# Input: The chain key, cipher:key stages split by commas
+# Output: A list of (cipher name, key)
+def parse_chain(spec):
+    stages = []
+    for stage in spec.split(","):
+        name, colon, key = stage.strip().partition(":")
+        name = name.lower()
+        if not colon or name not in Cipher.REGISTRY or name == "chain":
+            raise ValueError("Bad chain stage: \"{}\"".format(stage))
+        stages.append((name, key))
+
+    return stages
+
+
+class Substitutions:
+    # Several substitutions folded into one. Bytes in pre are deleted first,
+    # then byte i of what is left goes through tables[i % len(tables)].
+    # Entries of -1 are dropped at the end. Entries for bytes in pre are
+    # never used, so they are left out of every check.
+    def __init__(self, pre, tables):
+        self.pre = pre
+        self.tables = tables
+        self.reachable = [c for c in range(256) if c not in pre]
+        self.compiled = None
+
+    # Fold the next substitution in after this one. If this one drops bytes
+    # after its key has lined up, the next one's key would line up
+    # differently, so that only works when the next key is one letter.
+    # Input: The bytes the next substitution deletes first and its tables
+    # Output: True if it was folded in, False if it has to run on its own
+    def add(self, pre, tables):
+        drops = any(table[c] == -1 or table[c] in pre
+                    for table in self.tables for c in self.reachable)
+        if drops and len(tables) > 1:
+            return False
+
+        period = math.lcm(len(self.tables), len(tables))
+        if period > MAX_PERIOD:
+            return False
+
+        folded = []
+        for i in range(period):
+            first = self.tables[i % len(self.tables)]
+            second = tables[i % len(tables)]
+            folded.append([-1 if c == -1 or c in pre else second[c]
+                           for c in first])
+
+        if self.sentinel(folded, self.reachable) is None:
+            return False
+
+        self.tables = folded
+        self.compiled = None
+        return True
+
+    # Dropped bytes are marked with a byte none of the tables give
+    # otherwise, then removed at the end
+    # Input: The tables and the bytes that can reach them
+    # Output: The byte to mark with, -1 if nothing is dropped or None if
+    #         every byte is used
+    @staticmethod
+    def sentinel(tables, reachable):
+        used = set()
+        for table in tables:
+            used.update(table[c] for c in reachable)
+
+        if -1 not in used:
+            return -1
+
+        return next((c for c in range(256) if c not in used), None)
+
+    # Input: Bytes
+    # Output: The bytes run through every folded substitution
+    def run(self, data):
+        if self.compiled is None:
+            mark = self.sentinel(self.tables, self.reachable)
+
+            # With nothing to drop, -1 is only left on bytes pre deleted
+            marker = max(mark, 0)
+            self.compiled = mark, [bytes(marker if c == -1 else c
+                                         for c in table)
+                                   for table in self.tables]
+        mark, tables = self.compiled
+
+        if len(tables) == 1:
+            out = data.translate(tables[0], self.pre)
+        else:
+            if self.pre:
+                data = data.translate(None, self.pre)
+            out = bytearray(len(data))
+            for i in range(min(len(tables), len(data))):
+                out[i::len(tables)] = data[i::len(tables)].translate(tables[i])
+
+        if mark != -1:
+            out = out.replace(bytes([mark]), b"")
+
+        return bytes(out)
+
+
+class Transpositions:
+    # Several transpositions folded into one permutation. The text goes
+    # through table and delete first. Any bytes a transposition fills the
+    # text out with are added to the end of the text and moved into place
+    # like the rest.
+    def __init__(self, table, delete, layout):
+        self.table = table
+        self.delete = delete
+        self.layouts = [layout]
+
+    # Fold the next transposition in after this one. Its translate runs on
+    # the text after this one's, so it can only be folded in if it deletes
+    # nothing that could still be there.
+    # Input: The next transposition's table, bytes to delete and layout
+    # Output: True if it was folded in, False if it has to run on its own
+    def add(self, table, delete, layout):
+        if table is not None and any(table[c] != c for c in b"x"):
+            return False
+
+        left = bytes(range(256)).translate(self.table, self.delete)
+        if any(c in delete for c in left + b"x"):
+            return False
+
+        # Both translates happen before anything is moved
+        if table is not None:
+            self.table = bytes(range(256)).translate(self.table) \
+                .translate(table)
+
+        self.layouts.append(layout)
+        return True
+
+    # Input: Bytes
+    # Output: The bytes run through every folded transposition
+    def run(self, data):
+        data = data.translate(self.table, self.delete)
+
+        length = len(data)
+        moves = [(0, 1, 0, 1, length)]
+        filler = b""
+        for layout in self.layouts:
+            fill, stage_moves = layout(length)
+
+            if len(moves) > 1 and \
+                    (len(moves) + 1) * len(stage_moves) > MAX_MOVES:
+                # Too many pieces, finish what is folded so far and carry on
+                # from there
+                data = Permutation.apply_moves(data + filler, moves, length)
+                moves = [(0, 1, 0, 1, length)]
+                filler = b""
+
+            if fill:
+                moves.append((length, 1, len(data) + len(filler), 1,
+                              len(fill)))
+                filler += fill
+
+            moves = Permutation.compose(moves, stage_moves)
+            length = sum(move[4] for move in moves)
+
+        return Permutation.apply_moves(data + filler, moves, length)
+
+
+class Chain(CipherInterface.CipherInterface):
+    # Every stage works over the chain's alphabet, so a stage that can't
+    # makes the key invalid
+    alphabets = Alphabet.ALPHABETS
+
+    def __init__(self):
+        self.key = ""
+        self.ciphers = []
+        self.plans = {}
+
+    # Determine if the key is valid or not
+    # Input: User defined key, cipher:key stages split by commas
+    # Output: True of False if the key is valid
+    def set_key(self, key):
+        try:
+            ciphers = [Cipher.make_cipher(name, stage_key,
+                                          alphabet=self.alphabet)
+                       for name, stage_key in parse_chain(key)]
+        except ValueError:
+            return False
+
+        self.key = key
+        self.ciphers = ciphers
+        self.plans = {}
+        return True
+
+    # Work out the steps for one direction, folding together neighbours
+    # that can be. Only done once per direction and kind of text.
+    # Input: "e" or "d" and whether the bytes are str text that was encoded.
+    #        str counts a few more characters as whitespace than bytes do.
+    # Output: A list of Substitutions, Transpositions and ciphers to run
+    def plan(self, mode, is_str=False):
+        if (mode, is_str) in self.plans:
+            return self.plans[mode, is_str]
+
+        whitespace = CipherInterface.ASCII_WHITESPACE if is_str else \
+            CipherInterface.BYTE_WHITESPACE
+        ciphers = self.ciphers if mode == "e" else self.ciphers[::-1]
+        steps = []
+        for cipher in ciphers:
+            substitution = cipher.substitution(mode, whitespace)
+            transposition = cipher.transposition(mode)
+            last = steps[-1] if steps else None
+
+            if substitution is not None:
+                if not (isinstance(last, Substitutions) and
+                        last.add(*substitution)):
+                    steps.append(Substitutions(*substitution))
+            elif transposition is not None:
+                if not (isinstance(last, Transpositions) and
+                        last.add(*transposition)):
+                    steps.append(Transpositions(*transposition))
+            else:
+                steps.append(cipher)
+
+        self.plans[mode, is_str] = steps
+        return steps
+
+    # Run the text through the chain. Folding is done on bytes. Every cipher
+    # gives the same answer for ASCII text as str or as bytes and keeps it
+    # ASCII, so ASCII str is folded as bytes too. Wider text goes through
+    # every cipher in turn.
+    # Input: A string (or bytes) of text and "e" or "d"
+    # Output: The resulting text
+    def run(self, text, mode):
+        # The stages keep their own clean up, the chain's policy runs first
+        if mode == "e":
+            text = self.normalize(text)
+
+        if isinstance(text, str) and text.isascii() and \
+                self.alphabet == Alphabet.LETTERS:
+            return self.run_plan(text.encode("ascii"), mode,
+                                 True).decode("latin-1")
+
+        if isinstance(text, str):
+            ciphers = self.ciphers if mode == "e" else self.ciphers[::-1]
+            for cipher in ciphers:
+                if mode == "e":
+                    text = cipher.encrypt(text)
+                else:
+                    text = cipher.decrpyt(text)
+            return text
+
+        return self.run_plan(bytes(text), mode)
+
+    # Run bytes through the folded steps. Ciphers that can't be folded are
+    # given str back if the bytes came from str, so they treat it the same.
+    # Input: Bytes of text, "e" or "d" and whether the bytes are str text
+    #        that was encoded
+    # Output: The resulting bytes
+    def run_plan(self, data, mode, is_str=False):
+        for step in self.plan(mode, is_str):
+            if isinstance(step, (Substitutions, Transpositions)):
+                data = step.run(data)
+                continue
+
+            text = data.decode("latin-1") if is_str else data
+            text = step.encrypt(text) if mode == "e" else step.decrpyt(text)
+            data = text.encode("latin-1") if is_str else text
+
+        return data
+
+    # Encrypt the given plain text with every cipher in order
+    # Input: A string (or bytes) of plain text
+    # Output: The resulting cipher text
+    def encrypt(self, plain_text):
+        return self.run(plain_text, "e")
+
+    # Decrypt the given cipher text with every cipher, last first
+    # Input: A string (or bytes) of cipher text
+    # Output: The resulting plain text
+    def decrpyt(self, cipher_text):
+        return self.run(cipher_text, "d")
+
+    # Input: The size of the plain text
+    # Output: The largest the cipher text can be
+    def max_encrypt_size(self, length):
+        for cipher in self.ciphers:
+            length = cipher.max_encrypt_size(length)
+
+        return length
+
+    # Input: The size of the cipher text
+    # Output: The largest the plain text can be
+    def max_decrypt_size(self, length):
+        for cipher in reversed(self.ciphers):
+            length = cipher.max_decrypt_size(length)
+
+        return length
@@ -6,169 +6,522 @@
 #              determine which cipher to operate with.                        #
 ###############################################################################
 
-import CipherInterface
-import Caesar
-import Railfence
-import Vigenre
-import Playfair
-import RowTransposition
+import Alphabet
+import KeyCache
+import Metrics
+import Normalize
 import argparse
+import importlib
+import io
+import mmap
+import os
+import sys
+
+# Every cipher this program knows about. The name used on the command line
+# maps to the module and class it lives in and the name to show the user.
+# Modules are only imported the first time the cipher is used, so a run
+# only pays for the cipher it needs.
+REGISTRY = {
+    "caesar": ("Caesar", "Caesar", "Caesar"),
+    "chain": ("Chain", "Chain", "Chain"),
+    "playfair": ("Playfair", "Playfair", "Playfair"),
+    "railfence": ("Railfence", "Railfence", "Railfence"),
+    "rowtransposition": ("RowTransposition", "RowTransposition",
+                         "Row Transposition"),
+    "vigenre": ("Vigenre", "Vigenre", "Vigenre"),
+}
+
+
+# Find the class for a cipher, importing its module if it hasn't been yet
+# Input: The name of the cipher
+# Output: The cipher class
+def load_cipher(name):
+    if name.lower() not in REGISTRY:
+        raise ValueError("Unknown cipher: {}".format(name))
+
+    module_name, class_name, _ = REGISTRY[name.lower()]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+# Ciphers that have been built, most recently used last. Bounded so a
+# service that sees a stream of new keys doesn't grow without limit.
+CIPHERS = KeyCache.KeyCache()
+
+
+# Build a cipher with its key set
+# Input: The name of the cipher, the key, the Metrics to time checking the
+#        key and building its schedule with (None for no timing), how
+#        plain text is cleaned up (see Normalize.py) and the alphabet (see
+#        Alphabet.py)
+# Output: The cipher, ready to use
+def build_cipher(name, key, metrics=None, policy=Normalize.KEEP,
+                 alphabet=Alphabet.LETTERS):
+    Metrics.count(metrics, "key_schedules_built")
+    cipher = load_cipher(name)()
+    if not Normalize.is_policy(policy):
+        raise ValueError("Unknown policy: {}".format(policy))
+    if not cipher.set_policy(policy):
+        raise ValueError("The {} cipher can't use the {} policy"
+                         .format(name, policy))
+
+    # The alphabet decides what a valid key is, so it goes first
+    if not Alphabet.is_alphabet(alphabet):
+        raise ValueError("Unknown alphabet: {}".format(alphabet))
+    if not cipher.set_alphabet(alphabet):
+        raise ValueError("The {} cipher can't work over the {} alphabet"
+                         .format(name, alphabet))
+
+    # Every byte is a symbol, there is nothing to clean up
+    if alphabet == Alphabet.BYTES and policy != Normalize.KEEP:
+        raise ValueError("Only the letters alphabet can be normalized")
+
+    with Metrics.stage(metrics, "set_key"):
+        valid = cipher.set_key(key)
+    if not valid:
+        raise ValueError("Key: \"{}\" is not a valid key".format(key))
+
+    # Playfair needs its matrix built from the key
+    if hasattr(cipher, "construct_key_matrix"):
+        with Metrics.stage(metrics, "key_schedule"):
+            cipher.construct_key_matrix(key)
+
+    return cipher
+
+
+# Find a cipher with its key set. Ciphers are kept once built, so using the
+# same cipher and key again doesn't set the key up again. The cipher is
+# shared, don't change its key.
+# Input: The name of the cipher, the key, the Metrics (or None), the
+#        policy for cleaning up plain text and the alphabet
+# Output: The cipher, ready to use
+def make_cipher(name, key, metrics=None, policy=Normalize.KEEP,
+                alphabet=Alphabet.LETTERS):
+    name = name.lower()
+    return CIPHERS.get((name, key, policy, alphabet),
+                       lambda: build_cipher(name, key, metrics, policy,
+                                            alphabet))
+
+
+# Encrypt data with a cipher, for using this file as a library
+# Input: The name of the cipher, the key, a string (or bytes), the policy
+#        for cleaning up the plain text and the alphabet
+# Output: The cipher text
+def encrypt(name, key, data, policy=Normalize.KEEP,
+            alphabet=Alphabet.LETTERS):
+    return make_cipher(name, key, policy=policy,
+                       alphabet=alphabet).encrypt(data)
+
+
+# Decrypt data with a cipher, for using this file as a library
+# Input: The name of the cipher, the key, a string (or bytes), the policy
+#        the plain text was cleaned up with and the alphabet
+# Output: The plain text
+def decrypt(name, key, data, policy=Normalize.KEEP,
+            alphabet=Alphabet.LETTERS):
+    return make_cipher(name, key, policy=policy,
+                       alphabet=alphabet).decrpyt(data)
+
+
+# How much of the input file is read at a time
+BLOCK_SIZE = 1 << 20
+
+# Ciphers that -p can split over several processes
+PARALLEL_CIPHERS = ("caesar", "vigenre", "playfair")
+
+
+# Bytes that text mode doesn't read as they are: \r is turned into a
+# newline, \x1c - \x1f are whitespace to str and not to bytes, and anything
+# past ASCII is decoded
+TEXT_ONLY = b"\r\x1c\x1d\x1e\x1f"
+
+
+# Whether working on the bytes of a file gives the same result as reading it
+# as text, the way the ciphers always have. Only plain ASCII does.
+# Input: The bytes (a mapping or a memoryview) of the file
+# Output: True if the bytes can be worked on as they are
+def same_as_text(data):
+    if os.linesep != "\n":
+        return False
+
+    for start in range(0, len(data), BLOCK_SIZE):
+        block = bytes(data[start:start + BLOCK_SIZE])
+        if not block.isascii() or any(c in block for c in TEXT_ONLY):
+            return False
+
+    return True
+
+
+# Open a file for reading or writing, "-" means stdin or stdout
+# Input: The file name and the mode to open it with
+# Output: The open file
+def open_file(name, mode):
+    if name == "-":
+        std = sys.stdin if mode.startswith("r") else sys.stdout
+        return std.buffer if "b" in mode else std
+
+    return open(name, mode)
+
+
+# Run a file through an encryptor or decryptor a block at a time so the
+# whole file never has to be in memory at once
+# Input: The stream from the cipher, the open input and output files and
+#        the Metrics (or None)
+# Output: None. The result is written to the output file
+def run_stream(stream, input_file, output_file, metrics=None):
+    while True:
+        with Metrics.stage(metrics, "read"):
+            chunk = input_file.read(BLOCK_SIZE)
+        if not chunk:
+            break
+        Metrics.count(metrics, "bytes_in", len(chunk))
+
+        with Metrics.stage(metrics, "transform"):
+            out = stream.update(chunk)
+        with Metrics.stage(metrics, "write"):
+            output_file.write(out)
+        Metrics.count(metrics, "bytes_out", len(out))
+
+    with Metrics.stage(metrics, "transform"):
+        out = stream.finalize()
+    with Metrics.stage(metrics, "write"):
+        output_file.write(out)
+    Metrics.count(metrics, "bytes_out", len(out))
+
+
+# Run files opened in binary mode through the cipher as text, the same way
+# as if they had been opened in text mode
+# Input: The cipher, "e" or "d", the input and output files opened in
+#        binary mode and the Metrics (or None)
+# Output: None. The result is written to the output file
+def run_text(cipher, mode, input_file, output_file, metrics=None):
+    text_input = io.TextIOWrapper(input_file)
+    text_output = io.TextIOWrapper(output_file)
+    stream = cipher.encryptor() if mode == "e" else cipher.decryptor()
+    try:
+        run_stream(stream, text_input, text_output, metrics)
+        text_output.flush()
+    finally:
+        # The files are still the caller's to close
+        text_input.detach()
+        text_output.detach()
+
+
+# Run a file through a cipher by mapping both files into memory. The cipher
+# reads the bytes of the input and writes straight into the output file,
+# with no decoding to str and back. Letters that aren't plain ASCII text
+# are read as text instead, so the result is the same as without mapping.
+# Input: The cipher, "e" or "d", the input and output files opened in
+#        binary mode and the Metrics (or None)
+# Output: None. The result is written to the output file
+def run_mmap(cipher, mode, input_file, output_file, metrics=None):
+    size = input_file.seek(0, 2)
+
+    # Empty files can't be mapped
+    with Metrics.stage(metrics, "read"):
+        src = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) \
+            if size else b""
+
+    if cipher.alphabet == Alphabet.LETTERS and not same_as_text(src):
+        if size:
+            src.close()
+        input_file.seek(0)
+        return run_text(cipher, mode, input_file, output_file, metrics)
+    Metrics.count(metrics, "bytes_in", size)
+
+    if mode == "e":
+        out_size = cipher.max_encrypt_size(size)
+        transform = cipher.encrypt_into
+    else:
+        out_size = cipher.max_decrypt_size(size)
+        transform = cipher.decrypt_into
 
-# Creates a parser to allow us to handle command line arguments
-parser = argparse.ArgumentParser(description="Encrypt or decrypt a file")
-parser.add_argument("-c", "--cipher", help="cipher to use")
-parser.add_argument("-k", "--key", help="key to use")
-parser.add_argument("-e", "--encrypt", help="encrypt mode")
-parser.add_argument("-d", "--decrypt", help="decrypt mode")
-parser.add_argument("-o", "--out_file", help="name of new file")
-args = parser.parse_args()
-
-CIPHER = CipherInterface.CipherInterface()
-
-
-def handle_input(cipher, key, in_file, out_file, mode):
+    # Make the output as large as the result could be, then cut it down to
+    # what was actually written
+    written = 0
+    try:
+        with Metrics.stage(metrics, "write"):
+            output_file.truncate(out_size)
+        if out_size:
+            dst = mmap.mmap(output_file.fileno(), out_size)
+            try:
+                with Metrics.stage(metrics, "transform"):
+                    written = transform(src, dst)
+            finally:
+                with Metrics.stage(metrics, "write"):
+                    dst.close()
+        output_file.truncate(written)
+        Metrics.count(metrics, "bytes_out", written)
+    finally:
+        if size:
+            src.close()
+
+
+# Run a file through the cipher one way or the other
+# Input: The cipher, "e" or "d", the open input and output files, whether
+#        to map the files into memory, the Metrics (or None) and the block
+#        size and queue depth to overlap reading, the cipher and writing
+#        with (or None)
+# Output: The stage stats and seconds taken for a pipeline, otherwise None.
+#         The result is written to the output file
+def run_file(cipher, mode, input_file, output_file, use_mmap=False,
+             metrics=None, pipeline=None):
+    cipher = Metrics.instrument(cipher, metrics)
+    if use_mmap:
+        return run_mmap(cipher, mode, input_file, output_file, metrics)
+
+    stream = cipher.encryptor() if mode == "e" else cipher.decryptor()
+    if pipeline is not None:
+        # Only loaded when it's used, like batch and parallel mode
+        import Pipeline
+        return Pipeline.run_pipeline(stream, input_file, output_file,
+                                     *pipeline, metrics)
+
+    return run_stream(stream, input_file, output_file, metrics)
+
+
+# Metrics (when given) time every stage of the run and are written out as
+# JSON at the end. Profile (when given) is where cProfile stats of running
+# the file through the cipher go, "-" prints them. Policy is how plain text
+# is cleaned up, see Normalize.py. Pipeline (when given) is the block size
+# and queue depth for reading, the cipher and writing at once, see
+# Pipeline.py. Alphabet is letters or bytes, see Alphabet.py.
+def handle_input(cipher, key, in_file, out_file, mode, use_mmap=False,
+                 metrics=None, profile=None, policy=Normalize.KEEP,
+                 pipeline=None, alphabet=Alphabet.LETTERS):
     # Standardize the cipher
     the_cipher = cipher.lower()
 
-    # Try to open files specified
-    try:
-        input_file = open(in_file, "r")
-        output_file = open(out_file, "w")
+    # Messages go to stderr when the output is going to stdout
+    messages = sys.stderr if out_file == "-" else sys.stdout
 
-        text = input_file.read()
-        input_file.close()
-    except IOError:
-        # If there was an error opening the file, abort
-        print("Error opening file")
+    # User didn't enter a correct cipher
+    if the_cipher not in REGISTRY:
+        print("Unknown cipher entered...", file=messages)
         return
 
-    # Execute Caesar cipher
-    if the_cipher == "caesar":
-        CIPHER = Caesar.Caesar()
+    # Mapping needs real files opened in binary
+    if use_mmap and "-" in (in_file, out_file):
+        print("Can't map stdin or stdout into memory", file=messages)
+        return
 
-        if CIPHER.set_key(key):
-            if mode == "e":
-                print("Using Caesar cipher to encrypt: {}".format(in_file))
-                encrypt = CIPHER.encrypt(text)
-                output_file.write(encrypt)
+    if use_mmap and pipeline is not None:
+        print("Choose --mmap or --pipeline, not both", file=messages)
+        return
 
-            elif mode == "d":
-                print("Using Caesar cipher to decrypt: {}".format(out_file))
-                decrypt = CIPHER.decrpyt(text)
-                output_file.write(decrypt)
+    if alphabet not in load_cipher(the_cipher).alphabets:
+        print("The {} cipher can't work over the {} alphabet".format(
+            REGISTRY[the_cipher][2], alphabet), file=messages)
+        return
 
-            output_file.close()
-        else:
-            print("Key: \"{}\" is not a valid key.\n "
-                  "No encryption will occur.".format(key))
-
-    # Execute Playfair cipher
-    elif the_cipher == "playfair":
-        CIPHER = Playfair.Playfair()
-
-        if CIPHER.set_key(key):
-            CIPHER.construct_key_matrix(key)
-            if mode == "e":
-                print("Using Playfair cipher to encrypt: {}".format(in_file))
-                encrypt = CIPHER.encrypt(text)
-                output_file.write(encrypt)
-
-            elif mode == "d":
-                print("Using Playfair cipher to decrypt: {}".format(out_file))
-                decrypt = CIPHER.decrpyt(text)
-                output_file.write(decrypt)
-
-            output_file.close()
-        else:
-            print("Key: \"{}\" is not a valid key.\n "
-                  "No encryption will occur.".format(key))
+    if policy not in load_cipher(the_cipher).policies:
+        print("The {} cipher can't use the {} policy".format(
+            REGISTRY[the_cipher][2], policy), file=messages)
+        return
 
-    # Execute Railfence cipher
-    elif the_cipher == "railfence":
-        CIPHER = Railfence.Railfence()
+    if alphabet == Alphabet.BYTES and policy != Normalize.KEEP:
+        print("Only the letters alphabet can be normalized", file=messages)
+        return
 
-        if CIPHER.set_key(key):
-            if mode == "e":
-                print("Using Railfence cipher to encrypt: {}".format(in_file))
-                encrypt = CIPHER.encrypt(text)
-                output_file.write(encrypt)
+    # Try to open files specified
+    try:
+        with Metrics.stage(metrics, "open"):
+            if use_mmap:
+                input_file = open(in_file, "rb")
+                output_file = open(out_file, "w+b")
+            elif alphabet == Alphabet.BYTES:
+                # The bytes alphabet never decodes
+                input_file = open_file(in_file, "rb")
+                output_file = open_file(out_file, "wb")
+            else:
+                input_file = open_file(in_file, "r")
+                output_file = open_file(out_file, "w")
+    except IOError:
+        # If there was an error opening the file, abort
+        print("Error opening file", file=messages)
+        return
 
-            elif mode == "d":
-                print("Using Railfence cipher to decrypt: {}".format(out_file))
-                decrypt = CIPHER.decrpyt(text)
-                output_file.write(decrypt)
+    display_name = REGISTRY[the_cipher][2]
+    name = the_cipher
+    failed = True
 
-            output_file.close()
-        else:
-            print("Key: \"{}\" is not a valid key.\n "
-                  "No encryption will occur.".format(key))
-
-    # Execute Row Transposition cipher
-    elif the_cipher == "rowtransposition":
-        CIPHER = RowTransposition.RowTransposition()
-
-        if CIPHER.set_key(key):
-            if mode == "e":
-                print("Using Row Transposition cipher to encrypt: {}"
-                      .format(in_file))
-                encrypt = CIPHER.encrypt(text)
-                output_file.write(encrypt)
-
-            elif mode == "d":
-                print("Using Row Transposition cipher to decrypt: {}"
-                      .format(out_file))
-                decrypt = CIPHER.decrpyt(text)
-                output_file.write(decrypt)
-
-            output_file.close()
-        else:
-            print("Key: \"{}\" is not a valid key.\n "
-                  "No encryption will occur.".format(key))
-
-    # Execute Vigenre cipher
-    elif the_cipher == "vigenre":
-        CIPHER = Vigenre.Vigenre()
-
-        if CIPHER.set_key(key):
-            CIPHER.build_rows()
-            if mode == "e":
-                print("Using Vigenre cipher to encrypt: {}".format(in_file))
-                encrypt = CIPHER.encrypt(text)
-                output_file.write(encrypt)
-
-            elif mode == "d":
-                print("Using Vigenre cipher to decrypt: {}".format(out_file))
-                decrypt = CIPHER.decrpyt(text)
-                output_file.write(decrypt)
-
-            output_file.close()
+    try:
+        with Metrics.stage(metrics, "key"):
+            the_cipher = make_cipher(the_cipher, key, metrics, policy,
+                                     alphabet)
+    except ValueError:
+        print("Key: \"{}\" is not a valid key.\n "
+              "No encryption will occur.".format(key), file=messages)
+    else:
+        if mode == "e":
+            print("Using {} cipher to encrypt: {}".format(display_name,
+                                                          in_file),
+                  file=messages)
+        elif mode == "d":
+            print("Using {} cipher to decrypt: {}".format(display_name,
+                                                          out_file),
+                  file=messages)
+
+        try:
+            if profile is None:
+                stats = run_file(the_cipher, mode, input_file, output_file,
+                                 use_mmap, metrics, pipeline)
+            else:
+                stats = Metrics.run_profiled(profile, run_file, the_cipher,
+                                             mode, input_file, output_file,
+                                             use_mmap, metrics, pipeline)
+        except ValueError as error:
+            # The reject policy found something it doesn't allow
+            print(error, file=messages)
         else:
-            print("Key: \"{}\" is not a valid key.\n "
-                  "No encryption will occur.".format(key))
+            failed = False
+            if stats is not None:
+                import Pipeline
+                Pipeline.print_report(*stats, messages)
+
+    # Close the files, leaving stdin and stdout open
+    with Metrics.stage(metrics, "close"):
+        for f in (input_file, output_file):
+            if f not in (sys.stdin, sys.stdout, sys.stdin.buffer,
+                         sys.stdout.buffer):
+                f.close()
+
+    # Nothing is left behind that could pass for the result, whether it
+    # was cut short or laid out to full size and never filled in
+    if failed and out_file != "-":
+        os.remove(out_file)
+
+    if metrics is not None:
+        metrics.emit(cipher=name, mode=mode, in_file=in_file,
+                     out_file=out_file, mmap=use_mmap,
+                     pipeline=pipeline is not None, alphabet=alphabet)
+
+
+# Pick how to run the cipher based on the options given
+# Input: The file (or batch source) to work on and "e" or "d"
+# Output: None
+def run_mode(args, in_file, mode):
+    # The batch and parallel modules are only loaded when they're used
+    if args.batch:
+        import Batch
+        Batch.run_batch(args.cipher, args.key, mode, in_file,
+                        args.out_file, args.workers, args.normalize,
+                        args.alphabet)
+
+    # Splitting works out where each segment starts in the key from its
+    # position in the file, which only holds if nothing is cleaned up and
+    # the letters are the ones the split was worked out for
+    elif args.parallel and args.cipher.lower() in PARALLEL_CIPHERS and \
+            "-" not in (in_file, args.out_file) and \
+            args.normalize == Normalize.KEEP and \
+            args.alphabet == Alphabet.LETTERS:
+        import Parallel
+        try:
+            Parallel.run_parallel(args.cipher, args.key, mode, in_file,
+                                  args.out_file, args.workers)
+        except ValueError as error:
+            print(error)
+        except IOError:
+            print("Error opening file")
 
-    # User didn't enter a correct cipher
     else:
-        print("Unknown cipher entered...")
-
-# Handles argument input
-if args.encrypt is not None and args.decrypt is not None:
-    # User entered -e and -d, cant do both at once
-    print("You need to choose encryption or decryption!")
-
-elif args.encrypt is not None and \
-                args.cipher is not None and \
-                args.key is not None and \
-                args.out_file is not None:
-    # User entered all the proper info for encryption
-
-    handle_input(args.cipher, args.key, args.encrypt, args.out_file, "e")
-elif args.decrypt is not None and \
-                args.cipher is not None and \
-                args.key is not None and \
-                args.out_file is not None:
-    # User entered all the proper info for decryption
-
-    handle_input(args.cipher, args.key, args.decrypt, args.out_file, "d")
-else:
-    # Some piece of info was missing
-    print("You messed up somewhere... Try again.")
+        metrics = None if args.metrics is None else \
+            Metrics.Metrics(args.metrics)
+        pipeline = None
+        if args.pipeline:
+            import Pipeline
+            try:
+                pipeline = (Pipeline.parse_size(args.buffer_size),
+                            Pipeline.parse_depth(args.queue_depth))
+            except ValueError as error:
+                print(error)
+                return
+        handle_input(args.cipher, args.key, in_file, args.out_file, mode,
+                     args.mmap, metrics, args.profile, args.normalize,
+                     pipeline, args.alphabet)
+
+
+def main(argv=None):
+    # Creates a parser to allow us to handle command line arguments
+    parser = argparse.ArgumentParser(description="Encrypt or decrypt a file")
+    parser.add_argument("-c", "--cipher",
+                        help="cipher to use, or a chain of cipher:key "
+                             "stages split by commas")
+    parser.add_argument("-k", "--key", help="key to use")
+    parser.add_argument("-e", "--encrypt", help="encrypt mode")
+    parser.add_argument("-d", "--decrypt", help="decrypt mode")
+    parser.add_argument("-o", "--out_file", help="name of new file")
+    parser.add_argument("--mmap", action="store_true",
+                        help="map the files into memory and work on the "
+                             "bytes directly")
+    parser.add_argument("-b", "--batch", action="store_true",
+                        help="treat the -e/-d argument as a directory, glob "
+                             "or manifest file and -o as the output "
+                             "directory")
+    parser.add_argument("-p", "--parallel", action="store_true",
+                        help="split one large file over several processes "
+                             "(caesar, vigenre and playfair)")
+    parser.add_argument("-w", "--workers", type=int,
+                        help="number of worker processes for batch and "
+                             "parallel mode")
+    parser.add_argument("--normalize", choices=Normalize.POLICIES,
+                        default=Normalize.KEEP,
+                        help="before encrypting, keep the text as each "
+                             "cipher always has, strip everything but "
+                             "letters, reject anything but letters and "
+                             "whitespace, or pass everything but letters "
+                             "through as it is (caesar and vigenre, both "
+                             "ways)")
+    parser.add_argument("--alphabet", choices=Alphabet.ALPHABETS,
+                        default=Alphabet.LETTERS,
+                        help="work over the letters a - z, or over all 256 "
+                             "byte values so binary files come back out "
+                             "exactly (caesar, vigenre, railfence, "
+                             "rowtransposition and chains of them)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="time every stage of the run and add a JSON "
+                             "record to FILE, - for stderr")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="save cProfile stats of the cipher work to "
+                             "FILE, - to print them")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="read, run the cipher and write at the same "
+                             "time in separate threads and report MB/s "
+                             "for each")
+    parser.add_argument("--buffer-size", default="1MB",
+                        help="size of each block the pipeline reads, like "
+                             "64KB or 4MB")
+    parser.add_argument("--queue-depth", type=int, default=3,
+                        help="how many blocks can wait between pipeline "
+                             "stages")
+    args = parser.parse_args(argv)
+
+    # A chain of cipher:key stages given as the cipher carries its own keys
+    if args.cipher is not None and ":" in args.cipher and args.key is None:
+        args.cipher, args.key = "chain", args.cipher
+
+    # Handles argument input
+    if args.encrypt is not None and args.decrypt is not None:
+        # User entered -e and -d, cant do both at once
+        print("You need to choose encryption or decryption!")
+
+    elif args.encrypt is not None and \
+                    args.cipher is not None and \
+                    args.key is not None and \
+                    args.out_file is not None:
+        # User entered all the proper info for encryption
+
+        run_mode(args, args.encrypt, "e")
+    elif args.decrypt is not None and \
+                    args.cipher is not None and \
+                    args.key is not None and \
+                    args.out_file is not None:
+        # User entered all the proper info for decryption
+
+        run_mode(args, args.decrypt, "d")
+    else:
+        # Some piece of info was missing
+        print("You messed up somewhere... Try again.")
+
+
+if __name__ == "__main__":
+    main()
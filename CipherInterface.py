@@ -4,7 +4,142 @@
 # Description: Parent class for all the ciphers to inherit from.              #
 ###############################################################################
 
+import Alphabet
+import Normalize
+
+# Whitespace removed from text before encrypting. The str table covers the
+# same characters that str.split() breaks on, the bytes version covers the
+# ASCII ones that bytes.split() breaks on.
+WHITESPACE = {c: None for c in range(0x3001) if chr(c).isspace()}
+BYTE_WHITESPACE = Normalize.BYTE_WHITESPACE
+
+# The ASCII characters WHITESPACE removes, for ASCII str that is worked on
+# as bytes
+ASCII_WHITESPACE = bytes(c for c in range(128) if chr(c).isspace())
+
+
+# Get the bytes out of any buffer (bytes, bytearray, memoryview, mmap, ...).
+# bytes are used as they are, anything else has to be copied once since the
+# ciphers work on bytes.
+# Input: A buffer
+# Output: The contents as bytes
+def as_bytes(src):
+    if isinstance(src, bytes):
+        return src
+
+    return memoryview(src).tobytes()
+
+
+# Get many texts as bytes so a cipher can go over them together. ASCII str
+# goes through bytes the same way a single text does.
+# Input: A list of strings (or bytes)
+# Output: A list of bytes, or None if the texts are a mix of str and bytes
+#         or str that isn't ASCII, and whether the texts were str
+def as_byte_texts(texts):
+    if all(type(text) is bytes for text in texts):
+        return texts, False
+
+    if all(isinstance(text, str) for text in texts):
+        if not all(text.isascii() for text in texts):
+            return None, True
+        return [text.encode("ascii") for text in texts], True
+
+    if any(isinstance(text, str) for text in texts):
+        return None, False
+
+    return [as_bytes(text) for text in texts], False
+
+
+# Input: The results of as_byte_texts texts and whether the texts were str
+# Output: The results in the type of the texts
+def from_byte_texts(results, is_str):
+    if is_str:
+        return [result.decode("latin-1") for result in results]
+
+    return results
+
+
+# Get the bytes of a text for the bytes alphabet, which never decodes
+# Input: A buffer
+# Output: The contents as bytes. Raises TypeError for str.
+def raw_bytes(data):
+    if isinstance(data, str):
+        raise TypeError("The bytes alphabet only works on bytes, not str")
+
+    return as_bytes(data)
+
+
+# Copy the result of a cipher into a buffer the caller gave us
+# Input: A writable buffer and the bytes to put in it
+# Output: The number of bytes written
+def write_into(dst, data):
+    out = memoryview(dst).cast("B")
+    if len(data) > len(out):
+        raise ValueError("Output buffer is too small: {} bytes needed, {} "
+                         "given".format(len(data), len(out)))
+
+    out[:len(data)] = data
+    return len(data)
+
+
+class BufferedStream:
+    # Incremental encrypt/decrypt for ciphers that need the whole text before
+    # they can produce anything, like the transposition ciphers. Chunks are
+    # held on to and the cipher runs once everything has been given. Empty
+    # is what the cipher is given if no chunks ever were.
+    def __init__(self, function, empty=""):
+        self.function = function
+        self.empty = empty
+        self.chunks = []
+
+    # Input: The next chunk of text
+    # Output: The text that is ready, always empty for this stream
+    def update(self, chunk):
+        self.chunks.append(chunk)
+        return chunk[:0]
+
+    # Input: None
+    # Output: The rest of the text
+    def finalize(self):
+        if not self.chunks:
+            return self.function(self.empty)
+
+        text = self.chunks[0][:0].join(self.chunks)
+        self.chunks = []
+        return self.function(text)
+
+
+class ChunkStream:
+    # Incremental encrypt/decrypt for ciphers where every character is
+    # handled on its own, so each chunk can go straight through the cipher
+    def __init__(self, function, empty=""):
+        self.function = function
+        self.empty = empty
+
+    # Input: The next chunk of text
+    # Output: The text that is ready
+    def update(self, chunk):
+        self.empty = chunk[:0]
+        return self.function(chunk)
+
+    # Input: None
+    # Output: The rest of the text, always empty for this stream
+    def finalize(self):
+        return self.empty
+
+
 class CipherInterface:
+    # How plain text is cleaned up before it is encrypted, see Normalize.py,
+    # and the policies the cipher can use. Keep leaves it to the cipher, the
+    # way it has always been.
+    policy = Normalize.KEEP
+    policies = (Normalize.KEEP, Normalize.STRIP, Normalize.REJECT)
+
+    # The symbols the cipher works over, see Alphabet.py, and the ones it
+    # can. Letters is the way it has always been.
+    alphabet = Alphabet.LETTERS
+    alphabets = (Alphabet.LETTERS,)
+
     def __init__(self):
         self.data = []
 
@@ -16,3 +151,115 @@ class CipherInterface:
 
     def decrpyt(self, cipher_text):
         return ""
+
+    # Encrypt many texts at once, giving the same results as encrypt on
+    # each. Ciphers that can go over all of them together override this.
+    # Input: A list of strings (or bytes) of plain text
+    # Output: A list of the cipher texts, in the same order
+    def encrypt_many(self, plain_texts):
+        return [self.encrypt(text) for text in plain_texts]
+
+    # Decrypt many texts at once, giving the same results as decrpyt on each
+    # Input: A list of strings (or bytes) of cipher text
+    # Output: A list of the plain texts, in the same order
+    def decrypt_many(self, cipher_texts):
+        return [self.decrpyt(text) for text in cipher_texts]
+
+    # Choose how plain text is cleaned up before it is encrypted
+    # Input: keep, strip, reject or passthrough
+    # Output: True or False if the cipher can use the policy
+    def set_policy(self, policy):
+        if policy not in self.policies:
+            return False
+
+        self.policy = policy
+        return True
+
+    # Choose the symbols the cipher works over. Has to be done before the
+    # key is set, what makes a valid key depends on it.
+    # Input: letters or bytes
+    # Output: True or False if the cipher can work over the alphabet
+    def set_alphabet(self, alphabet):
+        if alphabet not in self.alphabets:
+            return False
+
+        self.alphabet = alphabet
+        return True
+
+    # Input: None
+    # Output: An empty text of the type the cipher gives back, for streams
+    #         that are finished before they were given anything
+    def empty_text(self):
+        return b"" if self.alphabet == Alphabet.BYTES else ""
+
+    # Clean up plain text with the cipher's policy
+    # Input: A string (or bytes) of plain text
+    # Output: The cleaned up text. Raises ValueError if the policy is reject
+    #         and the text has something other than letters and whitespace.
+    def normalize(self, plain_text):
+        return Normalize.normalize(plain_text, self.policy)
+
+    # Start encrypting a text that arrives a chunk at a time. Works like
+    # hashlib: call update() with each chunk and finalize() at the end, and
+    # join everything they return.
+    # Input: None
+    # Output: An object with update() and finalize()
+    def encryptor(self):
+        return BufferedStream(self.encrypt, self.empty_text())
+
+    # Start decrypting a text that arrives a chunk at a time
+    # Input: None
+    # Output: An object with update() and finalize()
+    def decryptor(self):
+        return BufferedStream(self.decrpyt, self.empty_text())
+
+    # Encrypt straight from one buffer into another without going through
+    # str. Works with anything that supports the buffer protocol, like
+    # bytes, bytearray, memoryview or mmap.
+    # Input: A buffer of plain text and a writable buffer for the result
+    # Output: The number of bytes written to dst
+    def encrypt_into(self, src, dst):
+        return write_into(dst, self.encrypt(as_bytes(src)))
+
+    # Decrypt straight from one buffer into another
+    # Input: A buffer of cipher text and a writable buffer for the result
+    # Output: The number of bytes written to dst
+    def decrypt_into(self, src, dst):
+        return write_into(dst, self.decrpyt(as_bytes(src)))
+
+    # The most bytes encrypt_into can write for an input of a given size,
+    # used to size the output buffer
+    # Input: The size of the plain text
+    # Output: The largest the cipher text can be
+    def max_encrypt_size(self, length):
+        return length
+
+    # The most bytes decrypt_into can write for an input of a given size
+    # Input: The size of the cipher text
+    # Output: The largest the plain text can be
+    def max_decrypt_size(self, length):
+        return length
+
+    # Ciphers that swap every byte for another on its own (Caesar, Vigenre)
+    # describe how they do it here, so Chain can fold several of them into
+    # one pass. Bytes only.
+    # Input: "e" or "d" and the whitespace to delete, ASCII_WHITESPACE if
+    #        the bytes are str text that was encoded
+    # Output: None if the cipher isn't a substitution, otherwise the bytes
+    #         deleted before the key lines up with the text and a list of
+    #         tables, one per key position, each a list of 256 bytes where
+    #         -1 means the byte is dropped after the key has moved past it
+    def substitution(self, mode, whitespace=BYTE_WHITESPACE):
+        return None
+
+    # Ciphers that only move bytes around (Railfence, RowTransposition)
+    # describe how they do it here, so Chain can fold several of them into
+    # one permutation. Bytes only.
+    # Input: "e" or "d"
+    # Output: None if the cipher isn't a transposition, otherwise a table
+    #         and the bytes to delete for bytes.translate before the bytes
+    #         are moved, and a function that takes the length of the text
+    #         and gives the bytes to fill the text out with and the moves
+    #         (see Permutation.py)
+    def transposition(self, mode):
+        return None
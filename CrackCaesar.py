@@ -0,0 +1,140 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: CrackCaesar.py                                                   #
+# Description: Finds the key of text encrypted with Caesar. The letters of    #
+#              the cipher text are counted once, then every key from 1 to 25  #
+#              is scored by shifting the counts back and comparing them with  #
+#              English, so trying a key never looks at the text again. Works  #
+#              over as many files as you like, spread over several processes. #
+#                                                                             #
+#              python3 CrackCaesar.py secret.txt "archive/**/*.txt"           #
+###############################################################################
+
+import Batch
+import Caesar
+import English
+import argparse
+import concurrent.futures
+import math
+import os
+import sys
+import time
+
+# Every key Caesar accepts, a key of 0 doesn't encrypt
+KEYS = range(1, 26)
+
+
+# Score every key against the letter counts of the cipher text. The
+# confidence of a key is how likely it is compared to the others, assuming
+# the plain text is English letters picked at random.
+# Input: A list of 26 letter counts of the cipher text
+# Output: A list of (key, confidence, chi-squared), best first
+def rank_keys(counts):
+    scores = [English.log_likelihood(counts, key) for key in KEYS]
+
+    # Softmax, shifted by the best score so nothing overflows
+    best = max(scores)
+    weights = [math.exp(score - best) for score in scores]
+    total = sum(weights)
+
+    ranked = [(key, weight / total, English.chi_squared(counts, key))
+              for key, weight in zip(KEYS, weights)]
+    ranked.sort(key=lambda result: -result[1])
+
+    return ranked
+
+
+# Find the most likely keys for a cipher text. Caesar decrypts uppercase
+# letters as lowercase, so they are counted the same.
+# Input: A string (or bytes) of cipher text
+# Output: A list of (key, confidence, chi-squared), best first, or an empty
+#         list if there are no letters
+def crack(cipher_text):
+    counts = English.letter_counts(English.to_bytes(cipher_text).lower())
+    if not any(counts):
+        return []
+
+    return rank_keys(counts)
+
+
+# Decrypt with the most likely key
+# Input: A string (or bytes) of cipher text
+# Output: The key and the plain text, or None and the cipher text if there
+#         are no letters
+def decrypt(cipher_text):
+    ranked = crack(cipher_text)
+    if not ranked:
+        return None, cipher_text
+
+    cipher = Caesar.Caesar()
+    cipher.set_key(str(ranked[0][0]))
+    return ranked[0][0], cipher.decrpyt(cipher_text)
+
+
+# Crack one file. Runs in a worker process.
+# Input: The path of the file
+# Output: The path, the ranked keys and an error message, or None if
+#         everything went fine
+def crack_file(path):
+    try:
+        with open(path, "rb") as input_file:
+            return path, crack(input_file.read()), None
+    except IOError as error:
+        return path, [], str(error)
+
+
+# Crack every file from a list of sources
+# Input: The files, directories or glob patterns to crack, how
+#        many keys to print per file and the number of worker processes
+# Output: The number of files that failed
+def crack_files(sources, top=1, workers=None):
+    files = []
+    for source in sources:
+        if os.path.isdir(source) or Batch.is_pattern(source):
+            files.extend(Batch.collect_files(source)[0])
+        else:
+            files.append(source)
+
+    start = time.monotonic()
+    failed = 0
+
+    # Cracking a file is quick, so hand them out in groups
+    chunk_size = max(1, len(files) // (4 * (workers or os.cpu_count() or 1)))
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        for path, ranked, error in executor.map(crack_file, files,
+                                                chunksize=chunk_size):
+            if error is not None:
+                failed += 1
+                print("Failed: {}: {}".format(path, error))
+            elif not ranked:
+                print("{}: no letters".format(path))
+            else:
+                print("{}: {}".format(path, ", ".join(
+                    "key {} ({:.1%})".format(key, confidence)
+                    for key, confidence, _ in ranked[:top])))
+
+    elapsed = max(time.monotonic() - start, 1e-9)
+    print("Cracked {} files in {:.2f}s, {:.1f} files/sec".format(
+        len(files) - failed, elapsed, (len(files) - failed) / elapsed),
+        file=sys.stderr)
+
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Find the key of Caesar cipher texts")
+    parser.add_argument("sources", nargs="+",
+                        help="files, directories or glob patterns to crack")
+    parser.add_argument("--top", type=int, default=1,
+                        help="how many keys to show per file")
+    parser.add_argument("-w", "--workers", type=int,
+                        help="number of worker processes")
+    args = parser.parse_args(argv)
+
+    return 1 if crack_files(args.sources, args.top, args.workers) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
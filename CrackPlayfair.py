@@ -0,0 +1,421 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: CrackPlayfair.py                                                 #
+# Description: Recovers the key square of text encrypted with Playfair by     #
+#              simulated annealing. Starting from a random square, small      #
+#              changes are tried (swap two letters, swap two rows or columns, #
+#              flip the square) and kept if the decrypted text scores better  #
+#              on n-grams, or now and then even if it scores worse so the     #
+#              search doesn't get stuck. Every restart starts from a new      #
+#              random square and restarts run on several processes at once.  #
+#                                                                             #
+#              python3 CrackPlayfair.py cipher.txt --corpus english.txt       #
+###############################################################################
+
+import Cipher
+import English
+import NGrams
+import argparse
+import concurrent.futures
+import math
+import multiprocessing
+import operator
+import os
+import random
+import sys
+import time
+
+# Letter codes that can be in the square, j shares a spot with i
+SQUARE_LETTERS = [c for c in range(26) if c != 9]
+
+# How many candidate squares each restart tries
+ITERATIONS = 150000
+
+# How often a restart checks whether another one already found the key
+CHECK_EVERY = 1000
+
+# With no target given, stop once a key scores within this much (log10 per
+# n-gram) of the sample English text put through Playfair and back
+TARGET_MARGIN = 0.25
+
+# Key the sample text is put through Playfair with
+SAMPLE_KEY = "playfair"
+
+# How many restarts to run
+RESTARTS = 8
+
+# The scorer used by the worker processes and the event that tells them
+# to stop, set up once per worker
+SCORER = None
+STOP = None
+
+
+# Where the plain text letters of a cipher text pair are in the square,
+# for the pair's letters at every two spots of the square. Spots are
+# numbered 0 - 24 row by row. These never change, only which letter sits at
+# each spot does.
+# Input: None
+# Output: A list of 625 entries, 25 * first spot + second spot, each the two
+#         plain text spots as bytes
+def build_rules():
+    rules = []
+    for spot_one in range(25):
+        for spot_two in range(25):
+            row_one, col_one = divmod(spot_one, 5)
+            row_two, col_two = divmod(spot_two, 5)
+
+            if row_one == row_two:
+                # Same row, move 1 column left of each letter
+                pair = (row_one * 5 + (col_one - 1) % 5,
+                        row_two * 5 + (col_two - 1) % 5)
+            elif col_one == col_two:
+                # Same column, move 1 row up of each letter
+                pair = ((row_one - 1) % 5 * 5 + col_one,
+                        (row_two - 1) % 5 * 5 + col_two)
+            else:
+                # Different row and column
+                pair = (row_one * 5 + col_two, row_two * 5 + col_one)
+
+            rules.append(bytes(pair))
+
+    return rules
+
+
+RULES = build_rules()
+
+# 25 * spot for every spot, to find a pair's entry in RULES
+TIMES_25 = [spot * 25 for spot in range(25)]
+
+# Numbers the square spots 0 - 24
+SPOTS = bytes(range(25))
+
+# Fills a square out to a full 256 byte translate table
+PADDING = bytes(231)
+
+# Turns j into i, j isn't in the square
+J_TO_I = bytes.maketrans(b"\x09", b"\x08")
+
+
+class Digraphs:
+    # The cipher text split into pairs of letter codes. Each distinct pair
+    # is only decrypted once per square, then the text is put together from
+    # the decrypted pairs.
+    def __init__(self, cipher_text):
+        codes = NGrams.to_codes(cipher_text).translate(J_TO_I)
+        codes = codes[:len(codes) // 2 * 2]
+
+        pairs = [codes[i:i + 2] for i in range(0, len(codes), 2)]
+        distinct = sorted(set(pairs))
+        number = {pair: i for i, pair in enumerate(distinct)}
+
+        self.firsts = bytes(pair[0] for pair in distinct)
+        self.seconds = bytes(pair[1] for pair in distinct)
+        self.order = [number[pair] for pair in pairs]
+
+        # The distinct pairs each letter is in
+        self.with_letter = [frozenset(i for i, pair in enumerate(distinct)
+                                      if letter in pair)
+                            for letter in range(26)]
+
+    def __len__(self):
+        return 2 * len(self.order)
+
+    # Where the plain text letters of every distinct pair are in a square
+    # Input: The square as 25 bytes of letter codes
+    # Output: A list with the two plain text spots of each distinct pair
+    def spot_table(self, square):
+        where = bytes.maketrans(square, SPOTS)
+        return list(map(RULES.__getitem__,
+                        map(operator.add,
+                            map(TIMES_25.__getitem__,
+                                self.firsts.translate(where)),
+                            self.seconds.translate(where))))
+
+    # Update the spot table after two letters of the square swapped places.
+    # Only the pairs with one of those letters in them move, every other
+    # pair still decrypts to the same spots.
+    # Input: The spot table of the square before the swap, the square after
+    #        it and the two spots that were swapped
+    # Output: The spot table of the new square
+    def swap_table(self, table, square, one, two):
+        where = bytes.maketrans(square, SPOTS)
+        table = list(table)
+        for i in self.with_letter[square[one]] | self.with_letter[square[two]]:
+            table[i] = RULES[TIMES_25[where[self.firsts[i]]] +
+                             where[self.seconds[i]]]
+
+        return table
+
+    # Everything is done on spots first, then the spots are turned into
+    # letters in one go
+    # Input: The spot table and the square it is for
+    # Output: The plain text as bytes of letter codes
+    def text(self, table, square):
+        spots = b"".join(map(table.__getitem__, self.order))
+        return spots.translate(square + PADDING)
+
+    # Input: The square as 25 bytes of letter codes
+    # Output: The plain text as bytes of letter codes
+    def decrypt(self, square):
+        return self.text(self.spot_table(square), square)
+
+
+# Make a small random change to a square. Mostly two letters are swapped,
+# sometimes whole rows or columns are moved.
+# Input: The square as bytes and the random number generator
+# Output: A new square, and the two spots that were swapped if that was the
+#         change (None otherwise)
+def change_square(square, rng):
+    square = bytearray(square)
+    choice = rng.random()
+
+    if choice < 0.9:
+        one, two = rng.sample(range(25), 2)
+        square[one], square[two] = square[two], square[one]
+        return bytes(square), (one, two)
+    elif choice < 0.92:
+        one, two = rng.sample(range(5), 2)
+        for col in range(5):
+            square[one * 5 + col], square[two * 5 + col] = \
+                square[two * 5 + col], square[one * 5 + col]
+    elif choice < 0.94:
+        one, two = rng.sample(range(5), 2)
+        for row in range(5):
+            square[row * 5 + one], square[row * 5 + two] = \
+                square[row * 5 + two], square[row * 5 + one]
+    elif choice < 0.96:
+        # Flip top to bottom
+        square = bytearray(square[(4 - row) * 5 + col]
+                           for row in range(5) for col in range(5))
+    elif choice < 0.98:
+        # Flip left to right
+        square = bytearray(square[row * 5 + 4 - col]
+                           for row in range(5) for col in range(5))
+    else:
+        square.reverse()
+
+    return bytes(square), None
+
+
+# Finish off a square by swapping every two letters, keeping any swap that
+# scores better, until no swap helps. Annealing that stopped early is often
+# only a letter or two away.
+# Input: The square, its score, the cipher text Digraphs and the n-gram
+#        table
+# Output: The best score, the best square and how many squares were tried
+def polish(square, score, digraphs, scorer):
+    table = digraphs.spot_table(square)
+    tried = 0
+    better = True
+    while better:
+        better = False
+        for one in range(25):
+            for two in range(one + 1, 25):
+                candidate = bytearray(square)
+                candidate[one], candidate[two] = square[two], square[one]
+                candidate = bytes(candidate)
+
+                candidate_table = digraphs.swap_table(table, candidate, one,
+                                                      two)
+                candidate_score = scorer.score_codes(
+                    digraphs.text(candidate_table, candidate))
+                tried += 1
+                if candidate_score > score:
+                    square, table, score = candidate, candidate_table, \
+                        candidate_score
+                    better = True
+
+    return score, square, tried
+
+
+# Run one restart of simulated annealing. The temperature starts high enough
+# that worse squares are often kept and falls to zero, when only better
+# squares are. The starting temperature grows with the length of the text,
+# since the score is a sum over the whole text.
+# Input: The cipher text Digraphs, the n-gram table, the random number
+#        generator, the number of squares to try and an event that stops
+#        the restart when set
+# Output: The best score, the best square and how many squares were tried
+def anneal(digraphs, scorer, rng, iterations=ITERATIONS, stop=None):
+    square = list(SQUARE_LETTERS)
+    rng.shuffle(square)
+    square = bytes(square)
+    table = digraphs.spot_table(square)
+    score = scorer.score_codes(digraphs.text(table, square))
+    best_score, best_square = score, square
+
+    # Half the usual 10 + 0.087 * (length - 84). The usual schedule tries
+    # about a million squares; with far fewer, less time is spent wandering
+    # at temperatures where nothing settles.
+    start_temperature = (10 + 0.087 * max(0, len(digraphs) - 84)) / 2
+
+    tried = 0
+    for step in range(iterations):
+        if stop is not None and step % CHECK_EVERY == 0 and stop.is_set():
+            break
+
+        temperature = start_temperature * (1 - step / iterations)
+
+        # Swapping two letters only moves the pairs with those letters in
+        # them, so only they are looked up again
+        candidate, swapped = change_square(square, rng)
+        if swapped is None:
+            candidate_table = digraphs.spot_table(candidate)
+        else:
+            candidate_table = digraphs.swap_table(table, candidate, *swapped)
+        candidate_score = scorer.score_codes(
+            digraphs.text(candidate_table, candidate))
+        tried += 1
+
+        change = candidate_score - score
+        if change >= 0 or (temperature > 0 and
+                           rng.random() < math.exp(change / temperature)):
+            square, table, score = candidate, candidate_table, \
+                candidate_score
+
+            if score > best_score:
+                best_score, best_square = score, square
+
+    best_score, best_square, polished = polish(best_square, best_score,
+                                               digraphs, scorer)
+    return best_score, best_square, tried + polished
+
+
+# Set up a worker process
+# Input: The corpus or table file (None for the sample text), n and the
+#        stop event
+# Output: None
+def load_scorer(corpus, n, stop):
+    global SCORER, STOP
+    SCORER = NGrams.load_table(corpus, n)
+    STOP = stop
+
+
+# Run one restart. Runs in a worker process. A restart that reaches the
+# target stops the ones running next to it.
+# Input: The cipher text Digraphs, the seed, the number of squares to try
+#        and the average n-gram score to stop at
+# Output: The best score, the key and how many squares were tried
+def run_restart(digraphs, seed, iterations, target):
+    score, square, tried = anneal(digraphs, SCORER, random.Random(seed),
+                                  iterations, STOP)
+
+    if score / max(1, len(digraphs) - SCORER.n + 1) >= target:
+        STOP.set()
+
+    return score, bytes(c + 97 for c in square).decode(), tried
+
+
+# The score to stop at when none is given: a little below what a right
+# decryption of the sample English text scores. That has the x's Playfair
+# puts in and i for every j, so it scores well below the sample itself.
+# Input: The n-gram table
+# Output: The average n-gram score to stop at
+def default_target(scorer):
+    decrypted = Cipher.decrypt("playfair", SAMPLE_KEY, Cipher.encrypt(
+        "playfair", SAMPLE_KEY, English.SAMPLE_TEXT))
+    return scorer.average(decrypted) - TARGET_MARGIN
+
+
+# Find the most likely keys for a cipher text. Once a restart reaches the
+# target the others are stopped.
+# Input: A string (or bytes) of cipher text, the number of restarts and
+#        squares per restart, the number of worker processes, the corpus
+#        or table file and n for the n-gram table, the average n-gram score
+#        to stop at (None to work it out) and the first seed
+# Output: A list of (score, key) with the best first, how many squares were
+#         tried and how long it took in seconds
+def solve(cipher_text, restarts=RESTARTS, iterations=ITERATIONS,
+          workers=None, corpus=None, n=4, target=None, seed=0):
+    digraphs = Digraphs(cipher_text)
+    if not len(digraphs):
+        return [], 0, 0.0
+
+    if target is None:
+        target = default_target(NGrams.load_table(corpus, n))
+
+    grams = max(1, len(digraphs) - n + 1)
+    start = time.monotonic()
+    results = []
+    tried = 0
+
+    stop = multiprocessing.Event()
+    with concurrent.futures.ProcessPoolExecutor(
+            workers, initializer=load_scorer,
+            initargs=(corpus, n, stop)) as executor:
+        futures = [executor.submit(run_restart, digraphs, seed + restart,
+                                   iterations, target)
+                   for restart in range(restarts)]
+
+        for future in concurrent.futures.as_completed(futures):
+            if future.cancelled():
+                continue
+
+            score, key, count = future.result()
+            results.append((score, key))
+            tried += count
+
+            # Good enough, don't start any more restarts. The ones that
+            # are running have been told to stop.
+            if score / grams >= target:
+                for waiting in futures:
+                    waiting.cancel()
+
+    results.sort(reverse=True)
+    return results, tried, time.monotonic() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Recover the key square of a Playfair cipher text")
+    parser.add_argument("file", help="file with the cipher text, - for stdin")
+    parser.add_argument("--corpus",
+                        help="English text to build the n-gram table from, "
+                             "or a table file from NGrams.py")
+    parser.add_argument("-n", type=int, default=4,
+                        help="length of the n-grams to score with")
+    parser.add_argument("--restarts", type=int, default=RESTARTS,
+                        help="how many times to start from a random square")
+    parser.add_argument("--iterations", type=int, default=ITERATIONS,
+                        help="squares to try per restart")
+    parser.add_argument("--target", type=float,
+                        help="stop once the average n-gram score (log10) "
+                             "reaches this, by default a little below a "
+                             "right decryption of the sample English text")
+    parser.add_argument("-w", "--workers", type=int,
+                        help="number of worker processes")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the first restart")
+    args = parser.parse_args(argv)
+
+    if args.file == "-":
+        cipher_text = sys.stdin.buffer.read()
+    else:
+        with open(args.file, "rb") as input_file:
+            cipher_text = input_file.read()
+
+    results, tried, seconds = solve(cipher_text, args.restarts,
+                                    args.iterations, args.workers,
+                                    args.corpus, args.n, args.target,
+                                    args.seed)
+    if not results:
+        print("No letters to work with")
+        return 1
+
+    for score, key in results:
+        print("{:>12.2f}  {}".format(score, key))
+
+    print("Tried {} keys in {:.2f}s, {:.0f} keys/sec on {} workers".format(
+        tried, seconds, tried / max(seconds, 1e-9),
+        args.workers or os.cpu_count()), file=sys.stderr)
+
+    key = results[0][1]
+    print("Best key: {}".format(key))
+    print(Cipher.decrypt("playfair", key, cipher_text)[:200].decode(
+        "latin-1"))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
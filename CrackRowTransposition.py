@@ -0,0 +1,251 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: CrackRowTransposition.py                                         #
+# Description: Recovers the key of text encrypted with Row Transposition by   #
+#              trying every key. Keys are 2 - 9 digits, so there are at most  #
+#              9! = 362880 of each length. The cipher text is cut back into   #
+#              its columns and every two columns get a score for how well     #
+#              they read side by side (bigrams along every row). Keys are     #
+#              built up one column at a time and a partial key is dropped as  #
+#              soon as even the best columns left can't beat the keys found   #
+#              so far. The first two columns split the keys between several  #
+#              processes. The best keys are then scored on quadgrams of the   #
+#              whole decrypted text.                                          #
+#                                                                             #
+#              python3 CrackRowTransposition.py cipher.txt --top 5            #
+###############################################################################
+
+import English
+import NGrams
+import RowTransposition
+import argparse
+import concurrent.futures
+import heapq
+import math
+import sys
+import time
+
+# Key lengths RowTransposition accepts
+LENGTHS = range(2, 10)
+
+# How many keys of each length are kept from the column search and scored
+# on quadgrams. The column scores can't tell apart keys that only differ at
+# the ends of the rows, the quadgrams of the whole text can.
+KEEP = 100
+
+# Byte table that turns a - z (and A - Z) into 0 - 25 and everything else
+# into 26
+TO_CODES = bytes(English.LETTERS.find(bytes([c]).lower()) % 27
+                 for c in range(256))
+
+
+# Bigram scores with room for code 26. A pair with a character that isn't a
+# letter scores what an average English bigram does, so it doesn't pull
+# those columns anywhere.
+# Input: A bigram NGramTable
+# Output: A list of 27 * 27 scores, indexed by first * 27 + second
+def pair_scores(table):
+    average = sum(10 ** p * p for p in table.log_probs)
+    scores = [average] * (27 * 27)
+    for first in range(26):
+        for second in range(26):
+            scores[first * 27 + second] = table.log_probs[first * 26 + second]
+
+    return scores
+
+
+# Cut the cipher text back into columns and score every two of them. The
+# cipher text is the columns one after the other, each num_rows long.
+# Input: The cipher text as bytes, the key length and the pair scores
+# Output: A matrix where [a][b] is the score of column b right after a
+def column_scores(data, length, pairs):
+    num_rows = len(data) // length
+    codes = data.translate(TO_CODES)
+    columns = [codes[i * num_rows:(i + 1) * num_rows] for i in range(length)]
+
+    scores = []
+    for a in columns:
+        row = []
+        for b in columns:
+            row.append(sum(map(pairs.__getitem__,
+                               [x * 27 + y for x, y in zip(a, b)])))
+        scores.append(row)
+
+    return scores
+
+
+# Try every key that starts with the given columns. Runs in a worker
+# process. An order lists which cipher text column goes at each spot of
+# the plain text, so its score is the sum of scores of neighbours.
+# Input: The column score matrix, the first columns and how many orders
+#        to keep
+# Output: The best (score, order) found, how many orders were scored in
+#         full and how many partial orders were dropped
+def search(scores, prefix, keep=KEEP):
+    length = len(scores)
+
+    # The best any column can do with something after it, for the bound
+    best_next = [max(scores[a][b] for b in range(length) if b != a)
+                 for a in range(length)]
+
+    found = []
+    threshold = -math.inf
+    scored = 0
+    pruned = 0
+
+    # Depth first, with the columns left and a score so far on the stack
+    start = sum(scores[a][b] for a, b in zip(prefix, prefix[1:]))
+    left = [c for c in range(length) if c not in prefix]
+    stack = [(list(prefix), left, start)]
+
+    while stack:
+        order, left, score = stack.pop()
+
+        if not left:
+            scored += 1
+            if len(found) < keep:
+                heapq.heappush(found, (score, tuple(order)))
+                if len(found) == keep:
+                    threshold = found[0][0]
+            elif score > threshold:
+                heapq.heapreplace(found, (score, tuple(order)))
+                threshold = found[0][0]
+            continue
+
+        # Every column but the last one still needs something after it,
+        # and can at best get its best score
+        last = order[-1]
+        bounds = [best_next[c] for c in left]
+        bound = score + best_next[last] + sum(bounds) - min(bounds)
+        if bound <= threshold:
+            pruned += 1
+            continue
+
+        for c in left:
+            stack.append((order + [c], [d for d in left if d != c],
+                          score + scores[last][c]))
+
+    return found, scored, pruned
+
+
+# Input: An order of the cipher text columns
+# Output: The RowTransposition key for it. The digit at each spot of the
+#         plain text is which cipher text column goes there.
+def order_to_key(order):
+    return "".join(str(column + 1) for column in order)
+
+
+# Input: The cipher text as bytes
+# Output: The key lengths that fit the cipher text, encryption always fills
+#         the last row
+def fitting_lengths(data, lengths=LENGTHS):
+    return [length for length in lengths
+            if len(data) % length == 0 and len(data) >= 2 * length]
+
+
+# Find the most likely keys for a cipher text
+# Input: A string (or bytes) of cipher text, how many keys to return, the
+#        key lengths to try, the number of worker processes (1 runs here)
+#        and the bigram and quadgram NGramTables (None for the sample text
+#        ones)
+# Output: A list of (quadgram score, key) with the best first, how many keys
+#         there are, how many were scored in full and how many partial keys
+#         were dropped
+def crack(cipher_text, top=1, lengths=LENGTHS, workers=None, bigrams=None,
+          quadgrams=None):
+    data = English.to_bytes(cipher_text)
+    pairs = pair_scores(bigrams or NGrams.default_table(2))
+    quadgrams = quadgrams or NGrams.default_table(4)
+
+    jobs = []
+    total = 0
+    for length in fitting_lengths(data, lengths):
+        scores = column_scores(data, length, pairs)
+        total += math.factorial(length)
+        jobs.extend((length, scores, (first, second))
+                    for first in range(length) for second in range(length)
+                    if first != second)
+
+    if not jobs:
+        return [], 0, 0, 0
+
+    # One worker runs the searches here, without starting a pool
+    arguments = ([job[1] for job in jobs], [job[2] for job in jobs])
+    if workers == 1:
+        results = list(map(search, *arguments))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(search, *arguments,
+                                        chunksize=max(1, len(jobs) // 64)))
+
+    candidates = {}
+    scored = 0
+    pruned = 0
+    for (length, _, _), (found, count, dropped) in zip(jobs, results):
+        candidates.setdefault(length, []).extend(found)
+        scored += count
+        pruned += dropped
+
+    # Score the best orders of every length on the whole decrypted text
+    cipher = RowTransposition.RowTransposition()
+    ranked = []
+    for length, found in candidates.items():
+        for _, order in heapq.nlargest(KEEP, found):
+            key = order_to_key(order)
+            cipher.set_key(key)
+            ranked.append((quadgrams.score(cipher.decrpyt(data)), key))
+
+    ranked.sort(reverse=True)
+    return ranked[:top], total, scored, pruned
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Find the key of a Row Transposition cipher text")
+    parser.add_argument("file", help="file with the cipher text, - for stdin")
+    parser.add_argument("--top", type=int, default=5,
+                        help="how many keys to show")
+    parser.add_argument("--length", type=int, action="append",
+                        choices=LENGTHS,
+                        help="key length to try, can be given more than "
+                             "once (default all that fit)")
+    parser.add_argument("--corpus",
+                        help="English text to build the n-gram tables from, "
+                             "or a table file from NGrams.py")
+    parser.add_argument("-w", "--workers", type=int,
+                        help="number of worker processes")
+    args = parser.parse_args(argv)
+
+    if args.file == "-":
+        cipher_text = sys.stdin.buffer.read()
+    else:
+        with open(args.file, "rb") as input_file:
+            cipher_text = input_file.read()
+
+    start = time.monotonic()
+    ranked, total, scored, pruned = crack(
+        cipher_text, args.top, args.length or LENGTHS, args.workers,
+        NGrams.load_table(args.corpus, 2), NGrams.load_table(args.corpus, 4))
+    elapsed = time.monotonic() - start
+
+    if not ranked:
+        print("No key length fits a cipher text of {} characters".format(
+            len(cipher_text)))
+        return 1
+
+    for score, key in ranked:
+        print("{:>12.2f}  {}".format(score, key))
+
+    print("{} keys, {} scored in full, {} partial keys dropped, {:.2f}s"
+          .format(total, scored, pruned, elapsed), file=sys.stderr)
+
+    cipher = RowTransposition.RowTransposition()
+    cipher.set_key(ranked[0][1])
+    print("Best key: {}".format(ranked[0][1]))
+    print(cipher.decrpyt(cipher_text)[:200].decode("latin-1"))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
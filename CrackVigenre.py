@@ -0,0 +1,186 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: CrackVigenre.py                                                  #
+# Description: Recovers the key of text encrypted with Vigenre. First the key #
+#              length is found with the index of coincidence: split the text  #
+#              into len(key) columns and every column is a Caesar cipher, so  #
+#              it reads like English letter wise. Then every column is solved #
+#              on its own by picking the shift whose letter counts are        #
+#              closest to English (chi-squared). The best key is checked by   #
+#              decrypting with the Vigenre class.                             #
+#                                                                             #
+#              python3 CrackVigenre.py cipher.txt --top 5                     #
+###############################################################################
+
+import English
+import Vigenre
+import argparse
+import sys
+
+# Longest key length that is tried
+MAX_PERIOD = 40
+
+# How much of the text is used to find the key length and to solve the
+# columns. This is already far more than the statistics need.
+PERIOD_SAMPLE_SIZE = 1 << 16
+SOLVE_SAMPLE_SIZE = 1 << 20
+
+# Key lengths that leave fewer letters than this in a column aren't tried,
+# the index of coincidence of a handful of letters is mostly noise
+MIN_COLUMN_SIZE = 12
+
+# How many key lengths are solved
+PERIODS_TO_SOLVE = 5
+
+
+# Score every key length. The text is in order of the key, so character i
+# was encrypted with key letter i % len(key), whether it is a letter or not.
+# Input: The cipher text as bytes and the longest key length to try
+# Output: A list of (key length, average index of coincidence of the columns)
+def period_scores(data, max_period=MAX_PERIOD):
+    sample = data[:PERIOD_SAMPLE_SIZE]
+    max_period = max(1, min(max_period, len(sample) // MIN_COLUMN_SIZE))
+
+    scores = []
+    for period in range(1, max_period + 1):
+        columns = [English.index_of_coincidence(
+                   English.letter_counts(sample[column::period]))
+                   for column in range(period)]
+        scores.append((period, sum(columns) / period))
+
+    return scores
+
+
+# Pick the key lengths to solve. Multiples of the real key length score as
+# well as the key length itself (on short texts often a little better, by
+# chance), so of the lengths that score close to the best, the shortest
+# come first.
+# Input: The key length scores and how many lengths to return
+# Output: A list of key lengths, most likely first
+def rank_periods(scores, count=PERIODS_TO_SOLVE):
+    best = max(ioc for _, ioc in scores)
+    threshold = English.RANDOM_IOC + 0.75 * (best - English.RANDOM_IOC)
+
+    close = [period for period, ioc in scores if ioc >= threshold]
+    rest = [period for period, ioc in sorted(scores, key=lambda s: -s[1])
+            if period not in close]
+
+    return (close + rest)[:count]
+
+
+# Solve every column of the text for one key length
+# Input: The cipher text as bytes and the key length
+# Output: The key and the letter counts of the text once decrypted with it
+def solve_columns(data, period):
+    sample = data[:SOLVE_SAMPLE_SIZE]
+
+    key = []
+    plain_counts = [0] * 26
+    for column in range(period):
+        counts = English.letter_counts(sample[column::period])
+        shift = min(range(26), key=lambda s: English.chi_squared(counts, s))
+
+        key.append(chr(shift + 97))
+        plain_counts = [a + b for a, b in
+                        zip(plain_counts, English.rotate(counts, shift))]
+
+    return "".join(key), plain_counts
+
+
+# A key that repeats itself, like "abcabc", works the same as its first
+# repeat
+# Input: A key
+# Output: The shortest key that repeats to the same thing
+def reduce_key(key):
+    for length in range(1, len(key)):
+        if len(key) % length == 0 and key[:length] * (len(key) // length) \
+                == key:
+            return key[:length]
+
+    return key
+
+
+# Find the most likely keys for a cipher text. The keys are ranked by their
+# key length, not by how English the decrypted letters are: a longer key
+# always fits the letter counts a little better because every column gets
+# to pick its own shift.
+# Input: A string (or bytes) of cipher text, the longest key length to try
+#        and how many key lengths to solve
+# Output: A list of (key, chi-squared of the decrypted letters), best first
+def crack(cipher_text, max_period=MAX_PERIOD, periods=PERIODS_TO_SOLVE):
+    data = English.to_bytes(cipher_text)
+    if not any(English.letter_counts(data[:PERIOD_SAMPLE_SIZE])):
+        return []
+
+    candidates = {}
+    for period in rank_periods(period_scores(data, max_period), periods):
+        key, plain_counts = solve_columns(data, period)
+        key = reduce_key(key)
+        if key not in candidates:
+            candidates[key] = English.chi_squared(plain_counts)
+
+    return list(candidates.items())
+
+
+# Decrypt with the Vigenre class and check the result reads like English
+# Input: A string (or bytes) of cipher text and the key
+# Output: The plain text and whether it looks like English
+def verify(cipher_text, key):
+    cipher = Vigenre.Vigenre()
+    cipher.set_key(key)
+    plain_text = cipher.decrpyt(cipher_text)
+
+    ioc = English.index_of_coincidence(
+        English.letter_counts(English.to_bytes(plain_text)))
+    english = ioc >= English.RANDOM_IOC + \
+        0.6 * (English.ENGLISH_IOC - English.RANDOM_IOC)
+
+    return plain_text, english
+
+
+# Input: A string (or bytes) of cipher text
+# Output: The most likely key if decrypting with it gives English,
+#         otherwise None
+def recover_key(cipher_text):
+    for key, _ in crack(cipher_text)[:1]:
+        if verify(cipher_text, key)[1]:
+            return key
+
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Recover the key of a Vigenre cipher text")
+    parser.add_argument("file", help="file with the cipher text, - for stdin")
+    parser.add_argument("--max-period", type=int, default=MAX_PERIOD,
+                        help="longest key length to try")
+    parser.add_argument("--top", type=int, default=PERIODS_TO_SOLVE,
+                        help="how many key lengths to solve")
+    args = parser.parse_args(argv)
+
+    if args.file == "-":
+        cipher_text = sys.stdin.buffer.read()
+    else:
+        with open(args.file, "rb") as input_file:
+            cipher_text = input_file.read()
+
+    ranked = crack(cipher_text, args.max_period, args.top)
+    if not ranked:
+        print("No letters to work with")
+        return 1
+
+    for key, score in ranked:
+        print("{:>10.1f}  {}".format(score, key))
+
+    key = ranked[0][0]
+    plain_text, english = verify(cipher_text, key)
+    print("Best key: {} ({})".format(
+        key, "decrypts to English" if english else "not verified"))
+    print(plain_text[:200].decode("latin-1"))
+
+    return 0 if english else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
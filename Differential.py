@@ -0,0 +1,474 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: Differential.py                                                  #
+# Description: Checks the fast ciphers against the frozen originals in        #
+#              Reference.py. Random keys and texts in four size classes go    #
+#              through every way into the fast engines (str, bytes, a chunk   #
+#              at a time and encrypt_many) and each result has to match what  #
+#              the reference gives, for both encrypt and decrpyt. Texts of    #
+#              plain letters also have to survive a round trip wherever the   #
+#              reference's do. A case that fails is shrunk to the smallest    #
+#              key and text that still fail.                                  #
+#              Each case also has a time budget for its size class and key,   #
+#              so an engine that is right but slow fails too.                 #
+#                                                                             #
+#              Where the reference raises an error there is nothing to match, #
+#              so that check is skipped.                                      #
+#                                                                             #
+#              python3 Differential.py --cases 50 --seed 1                    #
+#              python3 Differential.py --cipher playfair --size large         #
+###############################################################################
+
+import Cipher
+import Reference
+import argparse
+import random
+import sys
+import time
+
+# Smallest and largest text of each size class
+SIZE_CLASSES = {
+    "tiny": (0, 16),
+    "small": (17, 256),
+    "medium": (257, 4096),
+    "large": (4097, 32768),
+}
+
+# Most milliseconds one encrypt or decrpyt of the fast engine may take on
+# the largest text of each size class. Shorter texts get a share of it by
+# length, but never less than FLOOR. The reference takes ten times longer or
+# more on medium and large texts.
+BUDGETS = {
+    "caesar": {"tiny": 0.2, "small": 0.2, "medium": 0.3, "large": 1},
+    "vigenre": {"tiny": 0.2, "small": 0.2, "medium": 0.3, "large": 1.5},
+    "playfair": {"tiny": 0.3, "small": 0.5, "medium": 4, "large": 30},
+    "railfence": {"tiny": 0.2, "small": 0.4, "medium": 0.6, "large": 2},
+    "rowtransposition": {"tiny": 0.2, "small": 0.2, "medium": 0.4,
+                         "large": 2},
+}
+
+# Milliseconds added for every rail or column the key has, the
+# transpositions move the text one rail or column at a time
+KEY_BUDGETS = {
+    "railfence": 0.003,
+    "rowtransposition": 0.005,
+}
+
+# Milliseconds any call may take, the cost of the call itself and of the
+# timer
+FLOOR = 0.5
+
+# Each timing calls the engine over and over until this many seconds have
+# gone by and takes the time of one call, the way timeit's autorange does
+MIN_TIME = 0.005
+
+# Timings are the best of this many, so one slow run doesn't fail
+REPEATS = 3
+
+# Most smaller cases tried while shrinking a failure
+MAX_SHRINKS = 2000
+
+LOWER = "abcdefghijklmnopqrstuvwxyz"
+UPPER = LOWER.upper()
+
+# Characters texts are made of. Plain letters, letters with spaces, and
+# anything goes (the reference has quirks outside a - z worth keeping).
+TEXT_ALPHABETS = (
+    LOWER,
+    LOWER + "    ",
+    LOWER + UPPER + " \t\n.,'!0189~\x7f",
+)
+
+
+# Input: The random generator
+# Output: A key for each cipher, mostly valid ones
+def caesar_key(rng):
+    return rng.choice([str(rng.randint(1, 25)), str(rng.randint(1, 500)),
+                       "0", "26", "3a"])
+
+
+def vigenre_key(rng):
+    letters = LOWER if rng.random() < 0.8 else LOWER + UPPER
+    key = "".join(rng.choice(letters) for _ in range(rng.randint(1, 12)))
+    return key if rng.random() < 0.95 else key + "1"
+
+
+def playfair_key(rng):
+    letters = LOWER if rng.random() < 0.8 else LOWER + UPPER
+    return "".join(rng.choice(letters) for _ in range(rng.randint(1, 15)))
+
+
+def railfence_key(rng):
+    return rng.choice([str(rng.randint(1, 12)), str(rng.randint(1, 200)),
+                       "0", "00"])
+
+
+def rowtransposition_key(rng):
+    digits = list("123456789"[:rng.randint(2, 9)])
+    rng.shuffle(digits)
+    key = "".join(digits)
+    return key if rng.random() < 0.95 else key + key[0]
+
+
+KEYS = {
+    "caesar": caesar_key,
+    "vigenre": vigenre_key,
+    "playfair": playfair_key,
+    "railfence": railfence_key,
+    "rowtransposition": rowtransposition_key,
+}
+
+
+# Input: The random generator and the smallest and largest length
+# Output: A random text. Letters are doubled now and then, so Playfair's x
+#         between doubled letters gets used.
+def make_text(rng, low, high):
+    alphabet = rng.choice(TEXT_ALPHABETS)
+    length = rng.randint(low, high)
+
+    letters = []
+    while len(letters) < length:
+        if letters and rng.random() < 0.1:
+            letters.append(letters[-1])
+        else:
+            letters.append(rng.choice(alphabet))
+
+    return "".join(letters)
+
+
+# Run something, catching any error
+# Input: The function and its arguments
+# Output: What it returned, or the error
+def attempt(function, *args):
+    try:
+        return function(*args)
+    except Exception as error:
+        return error
+
+
+# Input: The cipher's name, the key and the text
+# Output: The cipher from the fast engines, or None if the key isn't valid
+def make_fast(name, key):
+    try:
+        return Cipher.make_cipher(name, key)
+    except ValueError:
+        return None
+
+
+# Run a text through a stream a few characters at a time
+# Input: The stream, the text and the random generator for the chunk sizes
+# Output: Everything the stream gave back, joined
+def run_chunks(stream, text, rng):
+    out = []
+    start = 0
+    while start < len(text):
+        size = rng.randint(1, max(1, len(text) // 3))
+        out.append(stream.update(text[start:start + size]))
+        start += size
+    out.append(stream.finalize())
+
+    return "".join(out)
+
+
+# Every way into the fast engine for one direction
+# Input: The fast cipher, "e" or "d", the text and a seed for the chunks
+# Output: A list of (name of the path, result, what it should be). What it
+#         should be is None where it is what the reference gives.
+def fast_paths(cipher, mode, text, seed):
+    if mode == "e":
+        function, many, stream = cipher.encrypt, cipher.encrypt_many, \
+            cipher.encryptor
+    else:
+        function, many, stream = cipher.decrpyt, cipher.decrypt_many, \
+            cipher.decryptor
+
+    paths = [("str", attempt(function, text), None)]
+
+    # Bytes give the same as str for ASCII, wider characters aren't bytes
+    if text.isascii():
+        result = attempt(function, text.encode("ascii"))
+        if isinstance(result, bytes):
+            result = result.decode("latin-1")
+        paths.append(("bytes", result, None))
+
+    paths.append(("stream", attempt(
+        lambda: run_chunks(stream(), text, random.Random(seed))), None))
+
+    # A batch has to give every text what it gets on its own. The reversed
+    # text comes second, so key phase, padding or pairs left over from the
+    # first one show up.
+    texts = [text, text[::-1]]
+    result = attempt(many, texts)
+    if not isinstance(result, list) or len(result) != len(texts):
+        paths.append(("many", result, None))
+        return paths
+
+    paths.append(("many[0]", result[0], None))
+    alone = attempt(function, texts[1])
+    if not isinstance(alone, Exception):
+        paths.append(("many[1]", result[1], alone))
+
+    return paths
+
+
+# Round trips for texts of plain letters. Each takes the letters and what
+# came back and says if it is right.
+ROUND_TRIPS = {
+    "caesar": lambda plain, back, key: back == plain,
+    "vigenre": lambda plain, back, key: back == plain,
+    "railfence": lambda plain, back, key: back == plain,
+    # The last row is filled with x
+    "rowtransposition": lambda plain, back, key:
+        back.startswith(plain) and len(back) % len(key) == 0 and
+        not back[len(plain):].strip("x"),
+    # An x goes between doubled letters and on the end, and j comes back
+    # as i
+    "playfair": lambda plain, back, key:
+        back.replace("x", "") == plain.replace("j", "i").replace("x", ""),
+}
+
+
+# Check one key and text
+# Input: The cipher's name, the key, the text and a seed for the chunks
+# Output: A list of what didn't match, empty if everything did
+def check_case(name, key, text, seed=0):
+    reference = Reference.make_reference(name, key)
+    fast = make_fast(name, key)
+
+    if reference is None or fast is None:
+        # A key the reference takes but can't use is fine to turn away
+        if fast is None and reference is not None and \
+                not isinstance(attempt(reference.encrypt, "a"), Exception):
+            return ["key {!r} is valid in the reference".format(key)]
+        if reference is None and fast is not None:
+            return ["key {!r} is invalid in the reference".format(key)]
+        return []
+
+    problems = []
+
+    # Decrypt both the text and what the reference encrypted it to
+    inputs = [("e", text), ("d", text)]
+    encrypted = attempt(reference.encrypt, text)
+    if isinstance(encrypted, str):
+        inputs.append(("d", encrypted))
+
+    for mode, data in inputs:
+        function = reference.encrypt if mode == "e" else reference.decrpyt
+        want = attempt(function, data)
+        if isinstance(want, Exception):
+            continue
+
+        for path, got, expected in fast_paths(fast, mode, data, seed):
+            if expected is None:
+                expected = want
+            if got != expected:
+                problems.append("{} {} of {!r}: want {!r}, got {!r}".format(
+                    path, mode, data, expected, got))
+
+    # Only held to where the reference keeps it, Playfair keys with a j in
+    # them can't always get back what went in
+    plain = "".join(c for c in text if c in LOWER)
+    round_trip = ROUND_TRIPS[name]
+    round_key = fast.key if name == "rowtransposition" else key
+    back = attempt(lambda: reference.decrpyt(reference.encrypt(plain)))
+    if isinstance(back, str) and round_trip(plain, back, round_key):
+        back = attempt(lambda: fast.decrpyt(fast.encrypt(plain)))
+        if not isinstance(back, str) or \
+                not round_trip(plain, back, round_key):
+            problems.append("round trip of {!r} gave {!r}".format(plain,
+                                                                  back))
+
+    return problems
+
+
+# Time one call, calling it over and over until MIN_TIME has gone by
+# Input: The function and what to call it with
+# Output: The time of one call in seconds
+def time_call(function, data):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            attempt(function, data)
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_TIME:
+            return elapsed / number
+        number *= 2
+
+
+# Time the fast engine on a text
+# Input: The cipher's name, the key and the text
+# Output: The slowest of encrypt and decrpyt in milliseconds, each the best
+#         of REPEATS timings
+def time_case(name, key, text):
+    fast = make_fast(name, key)
+    if fast is None:
+        return 0.0
+
+    encrypted = attempt(fast.encrypt, text)
+    slowest = 0.0
+    for function, data in ((fast.encrypt, text), (fast.decrpyt, encrypted)):
+        if isinstance(data, Exception):
+            continue
+
+        best = min(time_call(function, data) for _ in range(REPEATS))
+        slowest = max(slowest, best)
+
+    return slowest * 1000
+
+
+# How many rails or columns the key moves the text through
+# Input: The cipher's name, the key and the text
+# Output: The number of rails or columns, 0 for the other ciphers
+def key_size(name, key, text):
+    if name == "railfence" and key.isdigit():
+        return min(int(key), len(text))
+    if name == "rowtransposition":
+        return len(key)
+    return 0
+
+
+# Input: The cipher's name, the size class, the key, the text and how much
+#        to scale the budget by
+# Output: The most milliseconds one encrypt or decrpyt may take
+def budget_for(name, size, key, text, budget_scale=1.0):
+    share = BUDGETS[name][size] * len(text) / SIZE_CLASSES[size][1]
+    rails = KEY_BUDGETS.get(name, 0) * key_size(name, key, text)
+    return (max(FLOOR, share) + rails) * budget_scale
+
+
+# Smaller texts to try: halves, quarters and so on cut out, then single
+# characters dropped, then characters made plainer
+# Input: The text
+# Output: The texts, smallest first
+def smaller_texts(text):
+    size = len(text) // 2
+    while size >= 1:
+        for start in range(0, len(text), size):
+            yield text[:start] + text[start + size:]
+        size //= 2
+
+    for i, c in enumerate(text):
+        if c != "a":
+            yield text[:i] + "a" + text[i + 1:]
+
+
+# Smaller keys to try for each cipher
+# Input: The cipher's name and the key
+# Output: The keys
+def smaller_keys(name, key):
+    if name in ("caesar", "railfence") and key.isdigit():
+        for n in range(1, min(int(key), 100)):
+            yield str(n)
+    elif name in ("vigenre", "playfair"):
+        for i in range(len(key)):
+            yield key[:i] + key[i + 1:]
+        yield key.lower()
+    elif name == "rowtransposition" and key.isdigit():
+        # Drop the highest digit, the key stays a valid order
+        top = str(len(key))
+        if len(key) > 2 and top in key:
+            yield key.replace(top, "")
+
+
+# Shrink a failing case until nothing smaller still fails
+# Input: The cipher's name, the key and the text
+# Output: The smallest key and text found and what they fail on
+def shrink(name, key, text):
+    problems = check_case(name, key, text)
+    tries = 0
+    shrunk = True
+    while shrunk and tries < MAX_SHRINKS:
+        shrunk = False
+        candidates = [(key, t) for t in smaller_texts(text)] + \
+            [(k, text) for k in smaller_keys(name, key) if k != key]
+
+        for candidate_key, candidate_text in candidates:
+            tries += 1
+            if tries > MAX_SHRINKS:
+                break
+
+            found = check_case(name, candidate_key, candidate_text)
+            if found:
+                key, text, problems = candidate_key, candidate_text, found
+                shrunk = True
+                break
+
+    return key, text, problems
+
+
+# Run random cases for one cipher and size class
+# Input: The cipher's name, the size class, how many cases, the random
+#        generator, how much to scale the budgets by and whether to time
+# Output: The number of cases, failures and slow cases
+def run_class(name, size, cases, rng, budget_scale=1.0, timing=True):
+    low, high = SIZE_CLASSES[size]
+    failures = 0
+    slow = 0
+
+    for _ in range(cases):
+        key = KEYS[name](rng)
+        text = make_text(rng, low, high)
+        seed = rng.random()
+
+        if check_case(name, key, text, seed):
+            failures += 1
+            key, text, problems = shrink(name, key, text)
+            print("FAIL {} key={!r} text={!r}".format(name, key, text))
+            for problem in problems[:5]:
+                print("    " + problem)
+            continue
+
+        if timing:
+            budget = budget_for(name, size, key, text, budget_scale)
+            elapsed = time_case(name, key, text)
+            if elapsed > budget:
+                slow += 1
+                print("SLOW {} {} key={!r} length {}: {:.3f}ms, budget "
+                      "{:.3f}ms".format(name, size, key, len(text), elapsed,
+                                        budget))
+
+    return cases, failures, slow
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check the fast ciphers against Reference.py")
+    parser.add_argument("--cipher", action="append", choices=sorted(KEYS),
+                        help="cipher to check, can be given more than once "
+                             "(default all)")
+    parser.add_argument("--size", action="append",
+                        choices=list(SIZE_CLASSES),
+                        help="size class to check, can be given more than "
+                             "once (default all)")
+    parser.add_argument("--cases", type=int, default=30,
+                        help="random cases per cipher and size class")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed for the random cases")
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="multiply every time budget, for slow machines")
+    parser.add_argument("--no-timing", action="store_true",
+                        help="only check results, not time budgets")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    total_failures = 0
+    total_slow = 0
+
+    for name in args.cipher or sorted(KEYS):
+        for size in args.size or list(SIZE_CLASSES):
+            start = time.monotonic()
+            cases, failures, slow = run_class(name, size, args.cases, rng,
+                                              args.budget_scale,
+                                              not args.no_timing)
+            print("{:<17} {:<7} {:>4} cases {:>3} failed {:>3} slow "
+                  "({:.1f}s)".format(name, size, cases, failures, slow,
+                                     time.monotonic() - start))
+            total_failures += failures
+            total_slow += slow
+
+    return 1 if total_failures or total_slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
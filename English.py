@@ -0,0 +1,175 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: English.py                                                       #
+# Description: How often each letter shows up in English text, and the        #
+#              scores used to tell whether some text looks like English. The  #
+#              cipher breaking modules share these. Letter counts are worked  #
+#              out once per text and every shift is scored by rotating the    #
+#              counts, so trying another shift never looks at the text again. #
+###############################################################################
+
+import math
+
+LETTERS = b"abcdefghijklmnopqrstuvwxyz"
+UPPER_LETTERS = LETTERS.upper()
+
+# Byte tables that lower A - Z and delete everything but letters, the
+# ciphers and the scorers all clean up text with these
+TO_LOWER = bytes.maketrans(UPPER_LETTERS, LETTERS)
+NOT_LETTERS = bytes(c for c in range(256) if c not in UPPER_LETTERS + LETTERS)
+
+# Percent of English letters that are a, b, c, ... z
+LETTER_FREQUENCIES = (
+    8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153,
+    0.772, 4.025, 2.406, 6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056,
+    2.758, 0.978, 2.360, 0.150, 1.974, 0.074,
+)
+
+# The same as fractions and as logs, for the scores below
+LETTER_PROBABILITIES = tuple(f / sum(LETTER_FREQUENCIES)
+                             for f in LETTER_FREQUENCIES)
+LOG_PROBABILITIES = tuple(math.log(p) for p in LETTER_PROBABILITIES)
+
+# Index of coincidence of English text and of random letters
+ENGLISH_IOC = sum(p * p for p in LETTER_PROBABILITIES)
+RANDOM_IOC = 1 / 26
+
+
+# Get text as bytes with one byte per character, so positions in the bytes
+# line up with positions in the text. Characters past latin-1 become "?".
+# Input: A string (or bytes) of text
+# Output: The text as bytes
+def to_bytes(text):
+    if isinstance(text, str):
+        return text.encode("latin-1", "replace")
+
+    return bytes(text)
+
+
+# Count the lowercase letters in some text
+# Input: The text as bytes
+# Output: A list of 26 counts, a through z
+def letter_counts(data):
+    return [data.count(letter) for letter in LETTERS]
+
+
+# Input: A list of 26 letter counts
+# Output: The chance that two letters picked at random are the same
+def index_of_coincidence(counts):
+    total = sum(counts)
+    if total < 2:
+        return 0.0
+
+    return sum(n * (n - 1) for n in counts) / (total * (total - 1))
+
+
+# How far the letter counts are from English once they are shifted back.
+# Smaller is more like English.
+# Input: A list of 26 letter counts and the shift to undo
+# Output: The chi-squared statistic
+def chi_squared(counts, shift=0):
+    total = sum(counts)
+    if not total:
+        return 0.0
+
+    score = 0.0
+    for letter, probability in enumerate(LETTER_PROBABILITIES):
+        expected = total * probability
+        observed = counts[(letter + shift) % 26]
+        score += (observed - expected) ** 2 / expected
+
+    return score
+
+
+# How likely the letter counts are to come from English once they are
+# shifted back. Larger is more like English.
+# Input: A list of 26 letter counts and the shift to undo
+# Output: The log likelihood
+def log_likelihood(counts, shift=0):
+    return sum(counts[(letter + shift) % 26] * log_probability
+               for letter, log_probability in enumerate(LOG_PROBABILITIES))
+
+
+# Input: A list of 26 letter counts and a shift
+# Output: The counts moved back by the shift, so count i is for the letter
+#         that was shift letters further along
+def rotate(counts, shift):
+    return counts[shift:] + counts[:shift]
+
+
+# A few well known public domain passages. Used to build n-gram tables
+# when no larger corpus is given; a corpus of a few MB of English gives
+# much better scores.
+SAMPLE_TEXT = """
+Four score and seven years ago our fathers brought forth on this continent,
+a new nation, conceived in Liberty, and dedicated to the proposition that all
+men are created equal. Now we are engaged in a great civil war, testing
+whether that nation, or any nation so conceived and so dedicated, can long
+endure. We are met on a great battle-field of that war. We have come to
+dedicate a portion of that field, as a final resting place for those who here
+gave their lives that that nation might live. It is altogether fitting and
+proper that we should do this. But, in a larger sense, we can not dedicate,
+we can not consecrate, we can not hallow this ground. The brave men, living
+and dead, who struggled here, have consecrated it, far above our poor power
+to add or detract. The world will little note, nor long remember what we say
+here, but it can never forget what they did here. It is for us the living,
+rather, to be dedicated here to the unfinished work which they who fought
+here have thus far so nobly advanced. It is rather for us to be here
+dedicated to the great task remaining before us, that from these honored dead
+we take increased devotion to that cause for which they gave the last full
+measure of devotion, that we here highly resolve that these dead shall not
+have died in vain, that this nation, under God, shall have a new birth of
+freedom, and that government of the people, by the people, for the people,
+shall not perish from the earth.
+
+It was the best of times, it was the worst of times, it was the age of
+wisdom, it was the age of foolishness, it was the epoch of belief, it was the
+epoch of incredulity, it was the season of Light, it was the season of
+Darkness, it was the spring of hope, it was the winter of despair, we had
+everything before us, we had nothing before us, we were all going direct to
+Heaven, we were all going direct the other way. In short, the period was so
+far like the present period, that some of its noisiest authorities insisted
+on its being received, for good or for evil, in the superlative degree of
+comparison only.
+
+It is a truth universally acknowledged, that a single man in possession of a
+good fortune, must be in want of a wife. However little known the feelings
+or views of such a man may be on his first entering a neighbourhood, this
+truth is so well fixed in the minds of the surrounding families, that he is
+considered the rightful property of some one or other of their daughters.
+My dear Mr. Bennet, said his lady to him one day, have you heard that
+Netherfield Park is let at last? Mr. Bennet replied that he had not. But it
+is, returned she; for Mrs. Long has just been here, and she told me all about
+it. Mr. Bennet made no answer. Do you not want to know who has taken it?
+cried his wife impatiently. You want to tell me, and I have no objection to
+hearing it. This was invitation enough.
+
+When in the Course of human events, it becomes necessary for one people to
+dissolve the political bands which have connected them with another, and to
+assume among the powers of the earth, the separate and equal station to which
+the Laws of Nature and of Nature's God entitle them, a decent respect to the
+opinions of mankind requires that they should declare the causes which impel
+them to the separation. We hold these truths to be self-evident, that all men
+are created equal, that they are endowed by their Creator with certain
+unalienable Rights, that among these are Life, Liberty and the pursuit of
+Happiness. That to secure these rights, Governments are instituted among
+Men, deriving their just powers from the consent of the governed.
+
+Call me Ishmael. Some years ago, never mind how long precisely, having little
+or no money in my purse, and nothing particular to interest me on shore, I
+thought I would sail about a little and see the watery part of the world. It
+is a way I have of driving off the spleen, and regulating the circulation.
+Whenever I find myself growing grim about the mouth; whenever it is a damp,
+drizzly November in my soul; whenever I find myself involuntarily pausing
+before coffin warehouses, and bringing up the rear of every funeral I meet;
+then, I account it high time to get to sea as soon as I can.
+
+Alice was beginning to get very tired of sitting by her sister on the bank,
+and of having nothing to do: once or twice she had peeped into the book her
+sister was reading, but it had no pictures or conversations in it, and what
+is the use of a book, thought Alice, without pictures or conversations? So
+she was considering in her own mind (as well as she could, for the hot day
+made her feel very sleepy and stupid), whether the pleasure of making a
+daisy-chain would be worth the trouble of getting up and picking the
+daisies, when suddenly a White Rabbit with pink eyes ran close by her.
+"""
@@ -0,0 +1,115 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: KeyCache.py                                                      #
+# Description: Keeps the work done to set up a key so the same key doesn't    #
+#              have to be set up again. Entries are kept in least recently    #
+#              used order and the oldest one is dropped once the cache is     #
+#              full. The cache counts its hits, misses and evictions so you   #
+#              can see how well it is doing.                                  #
+#                                                                             #
+#              Whatever is put in the cache is shared by everyone who asks    #
+#              for the same key, so it must never be changed once built.      #
+###############################################################################
+
+import collections
+import threading
+
+# How many key schedules are kept unless told otherwise
+DEFAULT_MAX_SIZE = 512
+
+
+class KeyCache:
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        if max_size < 1:
+            raise ValueError("The cache must hold at least 1 entry")
+
+        self.max_size = max_size
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Find the entry for a key, building it if it isn't in the cache. If the
+    # build fails nothing is stored and the error is passed on.
+    # Input: The cache key, usually (cipher, normalized key), and a function
+    #        with no arguments that builds the entry
+    # Output: The entry
+    def get(self, key, build):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        # Build outside the lock, two threads building the same key at once
+        # just end up storing the same thing twice
+        entry = build()
+
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self.trim()
+
+        return entry
+
+    # Drop the least recently used entries until the cache fits
+    # Input: None
+    # Output: None
+    def trim(self):
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    # Change how many entries the cache can hold
+    # Input: The new maximum size
+    # Output: None
+    def resize(self, max_size):
+        if max_size < 1:
+            raise ValueError("The cache must hold at least 1 entry")
+
+        with self.lock:
+            self.max_size = max_size
+            self.trim()
+
+    # Empty the cache and reset the counters
+    # Input: None
+    # Output: None
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    # Input: None
+    # Output: A dictionary with the size of the cache and its counters
+    def stats(self):
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# The key schedules of every cipher share one cache
+SCHEDULES = KeyCache()
+
+
+# Input: The new maximum size for the shared key schedule cache
+# Output: None
+def set_max_size(max_size):
+    SCHEDULES.resize(max_size)
+
+
+# Input: None
+# Output: The size and counters of the shared key schedule cache
+def stats():
+    return SCHEDULES.stats()
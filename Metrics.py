@@ -0,0 +1,187 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: Metrics.py                                                       #
+# Description: Timers and counters for one run of the cipher driver, written  #
+#              out as a JSON record at the end, and a cProfile hook for the   #
+#              part that does the work. Everything here is opt in: code that  #
+#              is handed None instead of a Metrics does no timing at all.     #
+###############################################################################
+
+import contextlib
+import copy
+import json
+import sys
+import time
+
+# How many lines of profile stats are printed when they go to the screen
+PROFILE_LINES = 25
+
+
+class Stage:
+    # Times the code inside a with block and adds it to a stage
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.monotonic()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.add_time(self.name, time.monotonic() - self.start)
+        return False
+
+
+class Metrics:
+    # Seconds spent in each stage, counters and per method timings of the
+    # cipher, for one run
+    def __init__(self, path="-"):
+        self.path = path
+        self.start = time.monotonic()
+        self.stages = {}
+        self.counters = {}
+        self.calls = {}
+
+    # Input: The name of the stage and seconds spent in it
+    # Output: None
+    def add_time(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    # Input: The name of the counter and how much to add
+    # Output: None
+    def add_count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    # Input: The name of the method, seconds spent and bytes handled
+    # Output: None
+    def add_call(self, name, seconds, size):
+        calls = self.calls.setdefault(name, {"calls": 0, "seconds": 0.0,
+                                             "bytes": 0})
+        calls["calls"] += 1
+        calls["seconds"] += seconds
+        calls["bytes"] += size
+
+    # Input: Anything else to put in the record
+    # Output: The record as a dictionary
+    def record(self, **fields):
+        fields.update(seconds=time.monotonic() - self.start,
+                      stages=self.stages, counters=self.counters,
+                      calls=self.calls)
+        return fields
+
+    # Write the record as one line of JSON, to stderr for "-" or added to
+    # the end of a file
+    # Input: Anything else to put in the record
+    # Output: None
+    def emit(self, **fields):
+        line = json.dumps(self.record(**fields), sort_keys=True)
+        if self.path == "-":
+            print(line, file=sys.stderr)
+        else:
+            with open(self.path, "a") as metrics_file:
+                metrics_file.write(line + "\n")
+
+
+# Time a stage if there are metrics, otherwise do nothing
+# Input: The Metrics (or None) and the name of the stage
+# Output: A context manager
+def stage(metrics, name):
+    if metrics is None:
+        return contextlib.nullcontext()
+
+    return Stage(metrics, name)
+
+
+# Add to a counter if there are metrics
+# Input: The Metrics (or None), the name of the counter and the amount
+# Output: None
+def count(metrics, name, amount=1):
+    if metrics is not None:
+        metrics.add_count(name, amount)
+
+
+# Wrap a method so every call is timed and the size of its first argument
+# counted
+# Input: The Metrics, the name to record it under and the method
+# Output: The wrapped method
+def timed(metrics, name, method):
+    def wrapper(data, *args):
+        start = time.monotonic()
+        result = method(data, *args)
+        metrics.add_call(name, time.monotonic() - start, len(data))
+        return result
+
+    return wrapper
+
+
+class TimedStream:
+    # An encryptor or decryptor with every update() and finalize() timed.
+    # Each cipher's stream calls its own helpers or tables, so timing here
+    # catches the work whichever way the cipher does it.
+    def __init__(self, metrics, name, stream):
+        self.update = timed(metrics, name + ".update", stream.update)
+        self.finalize_stream = stream.finalize
+        self.metrics = metrics
+        self.name = name + ".finalize"
+
+    # Input: None
+    # Output: Whatever the stream had left
+    def finalize(self):
+        start = time.monotonic()
+        result = self.finalize_stream()
+        self.metrics.add_call(self.name, time.monotonic() - start,
+                              len(result))
+        return result
+
+
+# Wrap a method that makes a stream so the stream it makes is timed
+# Input: The Metrics, the name to record it under and the method
+# Output: The wrapped method
+def timed_stream(metrics, name, method):
+    def wrapper():
+        return TimedStream(metrics, name, method())
+
+    return wrapper
+
+
+# Time the methods of a cipher that run files through it: the streams and
+# the *_into methods used with --mmap. Ciphers are shared through the
+# cache, so a copy is wrapped and the original is left alone. The wrappers
+# call the original's methods, so a method that uses another one (Playfair's
+# encrypt_into makes an encryptor) is only counted once.
+# Input: The cipher and the Metrics (or None)
+# Output: The cipher to use
+def instrument(cipher, metrics):
+    if metrics is None:
+        return cipher
+
+    timed_cipher = copy.copy(cipher)
+    for name in ("encryptor", "decryptor"):
+        setattr(timed_cipher, name,
+                timed_stream(metrics, name, getattr(cipher, name)))
+    for name in ("encrypt_into", "decrypt_into"):
+        setattr(timed_cipher, name,
+                timed(metrics, name, getattr(cipher, name)))
+
+    return timed_cipher
+
+
+# Run a function under cProfile and save the stats, or print the slowest
+# calls for "-"
+# Input: Where to put the stats, the function and its arguments
+# Output: What the function returned
+def run_profiled(path, function, *args):
+    # Only loaded when profiling, pstats takes a while to import
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *args)
+    finally:
+        if path == "-":
+            pstats.Stats(profiler, stream=sys.stderr) \
+                .sort_stats("cumulative").print_stats(PROFILE_LINES)
+        else:
+            profiler.dump_stats(path)
@@ -0,0 +1,292 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: NGrams.py                                                        #
+# Description: Scores how much a text reads like English by looking at runs   #
+#              of n letters (n-grams). Every n-gram gets the log of how often #
+#              it shows up in a corpus of English, and a text's score is the  #
+#              sum over all of its n-grams. Higher is more like English.      #
+#                                                                             #
+#              Letters are turned into codes 0 - 25, so an n-gram is a number #
+#              in base 26 and the table is a flat array indexed by it. Tables #
+#              can be saved to a file of float32s that is mapped into memory  #
+#              read only, so every process that loads it shares one copy.     #
+#                                                                             #
+#              python3 NGrams.py corpus.txt english.ngrams -n 2 3 4           #
+###############################################################################
+
+import English
+import argparse
+import array
+import collections
+import functools
+import itertools
+import math
+import mmap
+import operator
+import struct
+import sys
+
+# Byte table that turns a - z into 0 - 25
+TO_CODES = bytes.maketrans(English.LETTERS, bytes(range(26)))
+
+# Two codes read as one unsigned short, turned into the bigram's index
+PAIR_INDEX = [0] * (26 * 256 + 26)
+for _first in range(26):
+    for _second in range(26):
+        PAIR_INDEX[int.from_bytes(bytes((_first, _second)),
+                                  sys.byteorder)] = _first * 26 + _second
+
+# Index times 26 and times 26 * 26, to shift an index left by one or two
+# letters
+TIMES_26 = [index * 26 for index in range(26 * 26)]
+TIMES_676 = [index * 676 for index in range(26 * 26)]
+
+# Table file layout: the magic bytes, the number of tables, then for every
+# table its n, floor and where its log probabilities start in the file.
+# Log probabilities are little endian float32s.
+MAGIC = b"NGRAMS\x00\x01"
+COUNT_FORMAT = struct.Struct("<I")
+ENTRY_FORMAT = struct.Struct("<IfI")
+
+
+# Input: A string (or bytes) of text
+# Output: Only the letters of the text, lowercase, as bytes
+def letters_of(text):
+    return English.to_bytes(text).translate(English.TO_LOWER,
+                                            English.NOT_LETTERS)
+
+
+# Input: A string (or bytes) of text
+# Output: The letters of the text as bytes of codes 0 - 25
+def to_codes(text):
+    return letters_of(text).translate(TO_CODES)
+
+
+# Work out the bigram index of every other pair of codes. The codes are read
+# two at a time as unsigned shorts, so no Python code runs per letter.
+# Input: The codes as bytes and where the first pair starts
+# Output: A list with the index of the pairs at start, start + 2, ...
+def pair_indexes(codes, start):
+    stop = start + (len(codes) - start) // 2 * 2
+    return list(map(PAIR_INDEX.__getitem__,
+                    memoryview(codes[start:stop]).cast("H")))
+
+
+# Work out the table index of every n-gram in a run of codes. Bigrams,
+# trigrams and quadgrams are put together from the pairs starting at even
+# and at odd spots, so they come out in that order instead of text order.
+# Input: The codes (bytes or a list of 0 - 25) and n
+# Output: An iterator over the index of the n-gram starting at every spot
+def gram_indexes(codes, n):
+    codes = bytes(codes)
+    if n == 1:
+        return iter(codes)
+
+    if n > 4:
+        indexes = list(codes[:len(codes) - n + 1])
+        for k in range(1, n):
+            indexes = [i * 26 + c for i, c in zip(indexes, codes[k:])]
+        return iter(indexes)
+
+    runs = []
+    for start in (0, 1):
+        pairs = pair_indexes(codes, start)
+        if n == 2:
+            runs.append(pairs)
+        elif n == 3:
+            runs.append(map(operator.add, map(TIMES_26.__getitem__, pairs),
+                            codes[start + 2::2]))
+        else:
+            runs.append(map(operator.add, map(TIMES_676.__getitem__, pairs),
+                            pairs[1:]))
+
+    return itertools.chain(*runs)
+
+
+class NGramTable:
+    # Log10 probabilities of every n-gram. N-grams that never showed up in
+    # the corpus get the floor, a little less likely than one that did. The
+    # log probabilities are an array of doubles or a float32 view of a
+    # table file.
+    def __init__(self, n, log_probs, floor):
+        self.n = n
+        self.log_probs = log_probs
+        self.floor = floor
+        self.rows = None
+
+    # The quadgram table cut into rows of the 676 quadgrams that start with
+    # the same pair, found by the pair's two codes read as one unsigned
+    # short. The rows are views of the table, nothing is copied. Built the
+    # first time it is needed.
+    # Input: None
+    # Output: A list from the packed pair to its row
+    def pair_rows(self):
+        if self.rows is None:
+            view = memoryview(self.log_probs)
+            rows = [view[index * 676:(index + 1) * 676]
+                    for index in range(676)]
+            self.rows = list(map(rows.__getitem__, PAIR_INDEX))
+
+        return self.rows
+
+    # Quadgrams are two pairs of codes read as unsigned shorts. The first
+    # pair picks the row and the second the spot in it, which saves working
+    # out the quadgram's index.
+    # Input: Bytes (or a list) of codes 0 - 25
+    # Output: The score of the codes
+    def score_codes(self, codes):
+        if self.n != 4 or not isinstance(codes, (bytes, bytearray)):
+            return sum(map(self.log_probs.__getitem__,
+                           gram_indexes(codes, self.n)))
+
+        rows = self.pair_rows()
+        total = 0.0
+        for start in (0, 1):
+            stop = start + (len(codes) - start) // 2 * 2
+            pairs = memoryview(codes[start:stop]).cast("H")
+            total += sum(map(operator.getitem,
+                             map(rows.__getitem__, pairs[:-1]),
+                             map(PAIR_INDEX.__getitem__, pairs[1:])))
+
+        return total
+
+    # Input: A string (or bytes) of text, such as the output of any of the
+    #        ciphers
+    # Output: The score of the letters in the text
+    def score(self, text):
+        return self.score_codes(to_codes(text))
+
+    # The score divided by the number of n-grams, so texts of any length can
+    # be compared
+    # Input: A string (or bytes) of text
+    # Output: The average score of an n-gram in the text
+    def average(self, text):
+        codes = to_codes(text)
+        return self.score_codes(codes) / max(1, len(codes) - self.n + 1)
+
+
+# Count the n-grams of a corpus and turn the counts into a table
+# Input: The corpus as a string (or bytes) and n
+# Output: An NGramTable
+def build_table(text, n=4):
+    counts = collections.Counter(gram_indexes(to_codes(text), n))
+    total = max(1, sum(counts.values()))
+
+    floor = math.log10(0.01 / total)
+    log_probs = array.array("d", [floor]) * 26 ** n
+    for index, count in counts.items():
+        log_probs[index] = math.log10(count / total)
+
+    return NGramTable(n, log_probs, floor)
+
+
+# Save tables to a file that open_tables can map into memory
+# Input: A list of NGramTables, each with a different n, and the file name
+# Output: None
+def write_tables(tables, path):
+    offset = len(MAGIC) + COUNT_FORMAT.size + ENTRY_FORMAT.size * len(tables)
+
+    with open(path, "wb") as table_file:
+        table_file.write(MAGIC + COUNT_FORMAT.pack(len(tables)))
+        for table in tables:
+            table_file.write(ENTRY_FORMAT.pack(table.n, table.floor, offset))
+            offset += 4 * 26 ** table.n
+
+        for table in tables:
+            log_probs = array.array("f", table.log_probs)
+            if sys.byteorder == "big":
+                log_probs.byteswap()
+            log_probs.tofile(table_file)
+
+
+# Input: A file name
+# Output: True if the file is a table file from write_tables
+def is_table_file(path):
+    with open(path, "rb") as table_file:
+        return table_file.read(len(MAGIC)) == MAGIC
+
+
+# Map a table file into memory. The log probabilities are read straight out
+# of the mapping, so the operating system keeps one copy for every process
+# that opens the file. Each file is only opened once per process.
+# Input: The file name
+# Output: A dictionary from n to the NGramTable
+@functools.lru_cache(maxsize=None)
+def open_tables(path):
+    with open(path, "rb") as table_file:
+        mapping = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapping)
+    if bytes(view[:len(MAGIC)]) != MAGIC:
+        raise ValueError("{} is not an n-gram table file".format(path))
+
+    count, = COUNT_FORMAT.unpack_from(view, len(MAGIC))
+    tables = {}
+    for i in range(count):
+        n, floor, offset = ENTRY_FORMAT.unpack_from(
+            view, len(MAGIC) + COUNT_FORMAT.size + i * ENTRY_FORMAT.size)
+        log_probs = view[offset:offset + 4 * 26 ** n].cast("f")
+
+        # The file is little endian, a big endian machine needs its own copy
+        if sys.byteorder == "big":
+            log_probs = array.array("f", log_probs)
+            log_probs.byteswap()
+
+        tables[n] = NGramTable(n, log_probs, floor)
+
+    return tables
+
+
+# Get a table from wherever it is kept
+# Input: A table file, a file of English text to build the table from or
+#        None for the sample text, and n
+# Output: An NGramTable
+def load_table(source, n=4):
+    if source is None:
+        return default_table(n)
+
+    if is_table_file(source):
+        tables = open_tables(source)
+        if n not in tables:
+            raise ValueError("{} has no {}-gram table".format(source, n))
+        return tables[n]
+
+    with open(source, "rb") as corpus_file:
+        return build_table(corpus_file.read(), n)
+
+
+# Input: n
+# Output: A table built from the sample text that comes with English.py
+@functools.lru_cache(maxsize=None)
+def default_table(n=4):
+    return build_table(English.SAMPLE_TEXT, n)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build an n-gram table file from a corpus of English")
+    parser.add_argument("corpus", help="file of English text, - for stdin")
+    parser.add_argument("output", help="table file to write")
+    parser.add_argument("-n", type=int, nargs="+", default=[2, 3, 4],
+                        help="lengths of the n-grams to count")
+    args = parser.parse_args(argv)
+
+    if args.corpus == "-":
+        text = sys.stdin.buffer.read()
+    else:
+        with open(args.corpus, "rb") as corpus_file:
+            text = corpus_file.read()
+
+    tables = [build_table(text, n) for n in sorted(set(args.n))]
+    write_tables(tables, args.output)
+
+    for table in tables:
+        print("{}-grams: {} entries, sample text averages {:.3f}".format(
+            table.n, len(table.log_probs),
+            table.average(English.SAMPLE_TEXT)))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
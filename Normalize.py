@@ -0,0 +1,148 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: Normalize.py                                                     #
+# Description: Cleans up plain text before it is encrypted, the same way for  #
+#              every cipher. There are four policies:                         #
+#                                                                             #
+#              keep    each cipher handles the text the way it always has     #
+#              strip   letters are lowered and everything else is dropped     #
+#              reject  like strip, but anything other than letters and        #
+#                      whitespace is an error                                 #
+#              passthrough  only the letters are ciphered, keeping their      #
+#                      case, and everything else stays where it was (Caesar   #
+#                      and Vigenre)                                           #
+#                                                                             #
+#              The tables are built once, so cleaning up a text is a single   #
+#              translate over it.                                             #
+###############################################################################
+
+import English
+import itertools
+import re
+
+KEEP = "keep"
+STRIP = "strip"
+REJECT = "reject"
+PASSTHROUGH = "passthrough"
+POLICIES = (KEEP, STRIP, REJECT, PASSTHROUGH)
+
+UPPER = English.UPPER_LETTERS
+LOWER = English.LETTERS
+
+# Whitespace bytes, the ones bytes.split() breaks on. CipherInterface strips
+# the same ones.
+BYTE_WHITESPACE = b" \t\n\r\x0b\x0c"
+
+# Bytes that reject lets through (and then strips)
+ALLOWED = UPPER + LOWER + BYTE_WHITESPACE
+
+
+class LetterTable(dict):
+    # str table for strip. Letters are lowered, anything else is deleted,
+    # and only gets an entry the first time it shows up.
+    def __init__(self):
+        dict.__init__(self)
+        for upper, lower in zip(UPPER, LOWER):
+            self[upper] = lower
+            self[lower] = lower
+
+    def __missing__(self, character):
+        self[character] = None
+        return None
+
+
+LETTER_TABLE = LetterTable()
+
+# str table that deletes everything reject lets through, so whatever is
+# left is what it doesn't
+ALLOWED_TABLE = {c: None for c in ALLOWED}
+
+# Runs of anything that isn't a letter. Split keeps them, so they can be
+# put back between the letters.
+NOT_LETTER_RUNS = re.compile(b"([^A-Za-z]+)")
+STR_NOT_LETTER_RUNS = re.compile("([^A-Za-z]+)")
+
+
+# Tables for passthrough that move the letters along by a shift, a - z and
+# A - Z each wrapping around on their own, and leave everything else
+# Input: The shift
+# Output: A str translate table and the matching bytes table
+def build_shift_tables(shift):
+    shifted = LOWER[shift:] + LOWER[:shift] + UPPER[shift:] + UPPER[:shift]
+    return str.maketrans(LOWER.decode() + UPPER.decode(), shifted.decode()), \
+        bytes.maketrans(LOWER + UPPER, shifted)
+
+
+# Indexed by shift. UNSHIFT_TABLES undo the shift of the same index.
+SHIFT_TABLES = [build_shift_tables(shift) for shift in range(26)]
+UNSHIFT_TABLES = [SHIFT_TABLES[-shift % 26] for shift in range(26)]
+
+
+# Input: A policy name
+# Output: True if it is one of POLICIES
+def is_policy(policy):
+    return policy in POLICIES
+
+
+# Input: A string (or bytes) of text
+# Output: Only the letters, lowercase, in the same type as the text
+def strip(text):
+    # str.translate remembers what each ASCII character turns into, so
+    # ASCII text is as quick as bytes and is only copied once
+    if isinstance(text, str):
+        return text.translate(LETTER_TABLE)
+
+    return bytes(text).translate(English.TO_LOWER, English.NOT_LETTERS)
+
+
+# Input: A string (or bytes) of text
+# Output: The first character that isn't a letter or whitespace, or None
+def find_rejected(text):
+    if isinstance(text, str):
+        if text.isascii():
+            return find_rejected(text.encode("ascii"))
+        left = text.translate(ALLOWED_TABLE)
+        return left[0] if left else None
+
+    left = bytes(text).translate(None, ALLOWED)
+    return chr(left[0]) if left else None
+
+
+# Cipher only the letters of a text, for passthrough. The letters are run
+# together and given to the function in one go, then cut back up and put
+# where they were.
+# Input: A string (or bytes) of text and a function that takes the letters
+#        and gives back as many ciphered ones
+# Output: The text with its letters ciphered and the number of letters
+def pass_through(text, function):
+    if isinstance(text, str):
+        parts = STR_NOT_LETTER_RUNS.split(text)
+    else:
+        parts = NOT_LETTER_RUNS.split(bytes(text))
+
+    empty = parts[0][:0]
+    runs = parts[0::2]
+    letters = function(empty.join(runs))
+
+    ends = list(itertools.accumulate(map(len, runs)))
+    parts[0::2] = map(letters.__getitem__,
+                      map(slice, [0] + ends[:-1], ends))
+    return empty.join(parts), len(letters)
+
+
+# Clean up plain text with a policy
+# Input: A string (or bytes) of text and the policy
+# Output: The cleaned up text, the same type as the text. Raises ValueError
+#         if the policy is reject and the text has something it can't have.
+#         Keep and passthrough leave the text to the cipher.
+def normalize(text, policy=KEEP):
+    if policy in (KEEP, PASSTHROUGH):
+        return text
+
+    if policy == REJECT:
+        rejected = find_rejected(text)
+        if rejected is not None:
+            raise ValueError("Only letters and whitespace are allowed, "
+                             "found {!r}".format(rejected))
+
+    return strip(text)
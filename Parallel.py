@@ -0,0 +1,258 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: Parallel.py                                                      #
+# Description: Splits one large file into segments and runs them through a   #
+#              cipher on several cores at once. The file is read straight     #
+#              into shared memory so the workers read it in place instead of  #
+#              having it pickled over to them. Each segment is started in the #
+#              same state the serial cipher would be in at that point, so the #
+#              output is identical to running the file in one go.             #
+#                                                                             #
+#              Caesar: every letter is independent.                           #
+#              Vigenre: a segment starts at key letter offset % len(key).     #
+#              Playfair: decrypt splits on an even offset. Encrypt first      #
+#              works out, for every segment, whether its first letter starts  #
+#              a pair or finishes the last pair of the segment before it.     #
+#                                                                             #
+#              Only plain ASCII is split. Anything else is read as text, the  #
+#              way the serial run reads it, and run in one process.           #
+###############################################################################
+
+import Cipher
+import CipherInterface
+import Playfair
+import Vigenre
+import concurrent.futures
+import os
+from multiprocessing import shared_memory
+
+# Segments smaller than this aren't worth sending to another process
+MIN_SEGMENT_SIZE = 1 << 20
+
+
+# Work out where a segment of plain text hands over to the next one for
+# Playfair. If the segment ends with a letter on its own, that letter is
+# paired with the first letter of the next segment unless they're equal.
+# Input: The text, where the segment starts and ends, and whether its
+#        first letter was already used by the segment before it
+# Output: 1 if the first letter of the next segment gets used by this one,
+#         otherwise 0
+def playfair_exit(text, start, end, entry):
+    leftover = ""
+    for block in range(start + entry, end, Playfair.BLOCK_SIZE):
+        block_end = min(block + Playfair.BLOCK_SIZE, end)
+        piece = bytes(text[block:block_end]).decode("latin-1")
+        leftover = Playfair.split_pairs(leftover + piece)[1]
+
+    if leftover and end < len(text) and text[end] != ord(leftover):
+        return 1
+
+    return 0
+
+
+# Encrypt one segment of plain text with Playfair
+# Input: The cipher, the text, where the segment starts and ends, and
+#        whether its first letter was already used by the segment before it
+# Output: The cipher text for the pairs that start in this segment
+def playfair_segment(cipher, text, start, end, entry):
+    stream = cipher.encryptor()
+    out = [stream.update(text[block:min(block + Playfair.BLOCK_SIZE, end)])
+           for block in range(start + entry, end, Playfair.BLOCK_SIZE)]
+
+    # A letter left on its own pairs with the start of the next segment,
+    # or with an x if that letter is the same or there is nothing left
+    leftover = stream.leftover
+    if leftover:
+        pair = leftover + leftover
+        if end < len(text) and text[end] != ord(leftover):
+            pair = leftover + chr(text[end])
+        out.append(Playfair.lookup_pairs(cipher.encrypt_table,
+                                         pair).encode("latin-1"))
+
+    return b"".join(out)
+
+
+# Run the first pass of Playfair encryption for one segment. Runs in a
+# worker process.
+# Input: The shared memory name, the length of the text and the segment
+# Output: Where the segment hands over to the next one when its first
+#         letter is a pair start (0) and when it isn't (1)
+def find_exits(in_name, length, start, end):
+    shm = shared_memory.SharedMemory(name=in_name)
+    try:
+        with shm.buf[:length] as text:
+            exits = (playfair_exit(text, start, end, 0),
+                     playfair_exit(text, start, end, 1))
+    finally:
+        shm.close()
+
+    return exits
+
+
+# Encrypt or decrypt one segment. Runs in a worker process.
+# Input: The cipher name, key and mode, the names of the shared memory
+#        blocks, the length of the text, the segment, where its output goes
+#        and the state the segment starts in
+# Output: How many bytes were written for the segment
+def run_segment(name, key, mode, in_name, out_name, length, start, end,
+                out_start, entry):
+    cipher = Cipher.make_cipher(name, key)
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+
+    try:
+        with shm_in.buf[:length] as text:
+            if name == "playfair" and mode == "e":
+                result = playfair_segment(cipher, text, start, end, entry)
+            elif name == "vigenre":
+                function = Vigenre.encrypt_text if mode == "e" \
+                    else Vigenre.decrypt_text
+                result = function(text[start:end], cipher.shifts,
+                                  start % len(cipher.shifts))[0]
+            elif mode == "e":
+                result = cipher.encrypt(bytes(text[start:end]))
+            else:
+                result = cipher.decrpyt(bytes(text[start:end]))
+
+        with shm_out.buf[out_start:] as out:
+            written = CipherInterface.write_into(out, result)
+    finally:
+        shm_in.close()
+        shm_out.close()
+
+    return written
+
+
+# Work out the segments to split the text into
+# Input: The length of the text, the number of workers and whether the
+#        segments have to start on an even offset
+# Output: A list of (start, end) pairs
+def make_segments(length, workers, even):
+    size = max(MIN_SEGMENT_SIZE, -(-length // workers))
+    if even:
+        size += size % 2
+
+    return [(start, min(start + size, length))
+            for start in range(0, length, size)]
+
+
+# Read a file straight into a buffer, without a copy in between
+# Input: The open file, the buffer and how many bytes to read
+# Output: How many bytes were read, less if the file got shorter
+def read_into(input_file, buffer, size):
+    length = 0
+    while length < size:
+        with buffer[length:size] as rest:
+            count = input_file.readinto(rest)
+        if not count:
+            break
+        length += count
+
+    return length
+
+
+# Get the text in shared memory ready to split. The encrypt side strips
+# whitespace (and lowers for Playfair) up front, since where a segment
+# starts in the key or in the pairs depends on the letters that are left.
+# Nothing gets longer, so the text is cleaned up in place a block at a
+# time.
+# Input: The cipher name, the mode, the buffer and the length of the text
+# Output: The length of the text that is left
+def prepare(name, mode, buffer, length):
+    if mode != "e" or name not in ("vigenre", "playfair"):
+        return length
+
+    out = 0
+    for start in range(0, length, Cipher.BLOCK_SIZE):
+        with buffer[start:min(start + Cipher.BLOCK_SIZE, length)] as block:
+            block = bytes(block).translate(None,
+                                           CipherInterface.BYTE_WHITESPACE)
+        if name == "playfair":
+            block = block.lower()
+
+        buffer[out:out + len(block)] = block
+        out += len(block)
+
+    return out
+
+
+# Encrypt or decrypt a file using several processes
+# Input: The cipher name, the key, "e" or "d", the input and output file
+#        names and the number of worker processes
+# Output: None. The result is written to the output file
+def run_parallel(name, key, mode, in_file, out_file, workers=None):
+    name = name.lower()
+    workers = workers or os.cpu_count() or 1
+
+    # Check the key before starting any workers
+    cipher = Cipher.make_cipher(name, key)
+
+    # The file goes straight into shared memory, so it is only held once
+    size = os.path.getsize(in_file)
+    shm_in = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    shm_out = None
+
+    try:
+        with open(in_file, "rb") as input_file:
+            length = read_into(input_file, shm_in.buf, size)
+
+        # The serial run reads the file as text. Only plain ASCII comes out
+        # the same as bytes, anything else is run as text in this process.
+        with shm_in.buf[:length] as text:
+            plain_ascii = Cipher.same_as_text(text)
+        if not plain_ascii:
+            with open(in_file, "r") as input_file, \
+                    open(out_file, "w") as output_file:
+                stream = cipher.encryptor() if mode == "e" else \
+                    cipher.decryptor()
+                Cipher.run_stream(stream, input_file, output_file)
+            return
+
+        length = prepare(name, mode, shm_in.buf, length)
+
+        segments = make_segments(length, workers,
+                                 name == "playfair" and mode == "d")
+
+        # Room for the biggest output each segment could have
+        sizes = []
+        for start, end in segments:
+            if mode == "e":
+                sizes.append(cipher.max_encrypt_size(end - start) + 2)
+            else:
+                sizes.append(cipher.max_decrypt_size(end - start))
+        out_starts = [sum(sizes[:i]) for i in range(len(sizes))]
+
+        shm_out = shared_memory.SharedMemory(create=True,
+                                             size=max(sum(sizes), 1))
+
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            entries = [0] * len(segments)
+
+            if name == "playfair" and mode == "e":
+                # First pass: how each segment hands over for either start
+                exits = list(executor.map(
+                    find_exits, [shm_in.name] * len(segments),
+                    [length] * len(segments),
+                    [s for s, _ in segments], [e for _, e in segments]))
+
+                # Chain them together from the start of the text
+                for i in range(1, len(segments)):
+                    entries[i] = exits[i - 1][entries[i - 1]]
+
+            written = list(executor.map(
+                run_segment, [name] * len(segments), [key] * len(segments),
+                [mode] * len(segments), [shm_in.name] * len(segments),
+                [shm_out.name] * len(segments), [length] * len(segments),
+                [s for s, _ in segments], [e for _, e in segments],
+                out_starts, entries))
+
+        with open(out_file, "wb") as output_file:
+            for out_start, size in zip(out_starts, written):
+                with shm_out.buf[out_start:out_start + size] as out:
+                    output_file.write(out)
+    finally:
+        shm_in.close()
+        shm_in.unlink()
+        if shm_out is not None:
+            shm_out.close()
+            shm_out.unlink()
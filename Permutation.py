@@ -0,0 +1,192 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: Permutation.py                                                   #
+# Description: Helpers for the transposition ciphers. A permutation of the    #
+#              text is stored as a list of runs instead of one index per      #
+#              letter. Each run is (dst_start, src_start, src_step, count)    #
+#              and says that out[dst_start + i] = text[src_start + i * step]  #
+#              for i from 0 to count - 1. Every run is copied with a single   #
+#              slice, so a whole permutation costs a handful of slices.       #
+#                                                                             #
+#              Moves are the general form, (dst_start, dst_step, src_start,   #
+#              src_step, count) for out[dst_start + i * dst_step] =           #
+#              text[src_start + i * src_step]. Two permutations made of moves #
+#              can be composed into one, still a handful of moves.            #
+###############################################################################
+
+import math
+
+
+# Get a buffer we can slice letters in and out of
+# Input: A string or bytes-like object
+# Output: The buffer and a function that turns a buffer back into the same
+#         type as the input
+def to_buffer(text):
+    if isinstance(text, str):
+        # ASCII text can go through bytes, anything wider needs a list
+        if text.isascii():
+            return text.encode("ascii"), \
+                lambda out: out.decode("ascii")
+        return text, "".join
+
+    return bytes(text), bytes
+
+
+# Make an empty output buffer to copy runs into
+# Input: A buffer from to_buffer and the length of the output
+# Output: An empty buffer of that length
+def new_buffer(data, length):
+    if isinstance(data, str):
+        return [""] * length
+
+    return bytearray(length)
+
+
+# Apply a permutation, reading every run out of the text and writing it to
+# the next spot in the output
+# Input: The text, the runs of the permutation and the length of the output
+#        if the runs don't cover the whole text
+# Output: The permuted text
+def gather(text, runs, length=None):
+    data, finish = to_buffer(text)
+    if length is None:
+        length = len(data)
+    out = new_buffer(data, length)
+
+    for dst_start, src_start, src_step, count in runs:
+        src_stop = src_start + (count - 1) * src_step + 1
+        out[dst_start:dst_start + count] = \
+            data[src_start:src_stop:src_step]
+
+    return finish(out)
+
+
+# Undo a permutation by writing every run back to the spots it was read from
+# Input: The permuted text, the runs of the permutation and the length of
+#        the output if the runs don't cover the whole text
+# Output: The original text
+def scatter(text, runs, length=None):
+    data, finish = to_buffer(text)
+    if length is None:
+        length = len(data)
+    out = new_buffer(data, length)
+
+    for dst_start, src_start, src_step, count in runs:
+        src_stop = src_start + (count - 1) * src_step + 1
+        out[src_start:src_stop:src_step] = \
+            data[dst_start:dst_start + count]
+
+    return finish(out)
+
+
+# Input: The runs of a permutation for gather
+# Output: The same permutation as moves
+def gather_moves(runs):
+    return [(dst_start, 1, src_start, src_step, count)
+            for dst_start, src_start, src_step, count in runs]
+
+
+# Input: The runs of a permutation for scatter
+# Output: The same permutation as moves
+def scatter_moves(runs):
+    return [(src_start, src_step, dst_start, 1, count)
+            for dst_start, src_start, src_step, count in runs]
+
+
+# Apply moves to bytes
+# Input: The bytes, the moves and the length of the output
+# Output: The moved bytes
+def apply_moves(data, moves, length):
+    out = bytearray(length)
+    for dst_start, dst_step, src_start, src_step, count in moves:
+        if count:
+            out[dst_start:dst_start + (count - 1) * dst_step + 1:dst_step] = \
+                data[src_start:src_start + (count - 1) * src_step + 1:
+                     src_step]
+
+    return bytes(out)
+
+
+# Compose two permutations into one. Each move of the second reads from the
+# spots some moves of the first wrote to. Where a move of the first meets a
+# move of the second, the spots they share are themselves evenly spaced, so
+# the pair becomes a single move from the text straight to the output.
+# Input: The moves of the first permutation (text to middle) and of the
+#        second (middle to output)
+# Output: The moves from the text to the output
+def compose(first, second):
+    moves = []
+    for dst_two, dst_step_two, src_two, src_step_two, count_two in second:
+        for dst_one, dst_step_one, src_one, src_step_one, count_one in first:
+            # The second reads middle spots src_two + i * src_step_two and
+            # the first writes middle spots dst_one + t * dst_step_one.
+            # Find the i where they meet.
+            common = math.gcd(src_step_two, dst_step_one)
+            if (dst_one - src_two) % common:
+                continue
+
+            i_step = dst_step_one // common
+            t_step = src_step_two // common
+            i_first = (dst_one - src_two) // common * \
+                pow(t_step, -1, i_step) % i_step
+            t_first = (src_two + i_first * src_step_two - dst_one) // \
+                dst_step_one
+
+            # Keep i and t inside both moves
+            low = max(0, -(t_first // t_step))
+            high = min((count_two - 1 - i_first) // i_step,
+                       (count_one - 1 - t_first) // t_step)
+            if high < low:
+                continue
+
+            i_start = i_first + low * i_step
+            t_start = t_first + low * t_step
+            moves.append((dst_two + i_start * dst_step_two,
+                          dst_step_two * i_step,
+                          src_one + t_start * src_step_one,
+                          src_step_one * t_step,
+                          high - low + 1))
+
+    return moves
+
+
+# Make the moves that apply one permutation to several texts of the same
+# size laid end to end. Either every move is repeated once per text, or
+# every spot of a text becomes one move that steps from text to text,
+# whichever makes fewer slices.
+# Input: The moves for one text, the size of a text, the size of its
+#        output and the number of texts
+# Output: The moves for all of them
+def repeat_moves(moves, size, out_size, copies):
+    if len(moves) * copies <= out_size:
+        return [(dst_start + i * out_size, dst_step,
+                 src_start + i * size, src_step, count)
+                for i in range(copies)
+                for dst_start, dst_step, src_start, src_step, count in moves]
+
+    return [(dst_start + i * dst_step, out_size,
+             src_start + i * src_step, size, copies)
+            for dst_start, dst_step, src_start, src_step, count in moves
+            for i in range(count)]
+
+
+# Move the bytes of many texts. Texts of the same size share one
+# permutation, so each size is moved in one go.
+# Input: A list of bytes and a function that takes the size of a text and
+#        gives its moves and the size of its output
+# Output: A list of the moved bytes, in the same order
+def apply_moves_many(texts, layout):
+    sizes = {}
+    for i, text in enumerate(texts):
+        sizes.setdefault(len(text), []).append(i)
+
+    results = [None] * len(texts)
+    for size, members in sizes.items():
+        moves, out_size = layout(size)
+        out = apply_moves(b"".join(texts[i] for i in members),
+                          repeat_moves(moves, size, out_size, len(members)),
+                          out_size * len(members))
+        for n, i in enumerate(members):
+            results[i] = out[n * out_size:(n + 1) * out_size]
+
+    return results
@@ -0,0 +1,203 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: Pipeline.py                                                      #
+# Description: Runs a file through a cipher with reading, the cipher and      #
+#              writing all going at once. A reader thread fills a bounded     #
+#              queue with large blocks, the cipher works through them and     #
+#              fills a second queue, and a writer thread empties it. While    #
+#              one block is being read the one before it is being encrypted   #
+#              and the one before that written, so on slow disks the run      #
+#              takes about as long as the slowest stage instead of all three  #
+#              added up. Each stage reports how many MB/s it managed while    #
+#              busy.                                                          #
+###############################################################################
+
+import Metrics
+import Sizes
+import queue
+import threading
+import time
+
+# How many blocks can wait between two stages. 2 is double buffering, 3 is
+# triple buffering.
+DEFAULT_DEPTH = 3
+
+# Put on a queue after the last block
+END = None
+
+
+class StageStats:
+    # Bytes handled by one stage and the seconds it spent working on them,
+    # not counting time spent waiting on the queues
+    def __init__(self, name):
+        self.name = name
+        self.size = 0
+        self.seconds = 0.0
+
+    # Input: None
+    # Output: The MB/s of the stage while it was busy
+    def rate(self):
+        return self.size / max(self.seconds, 1e-9) / 1e6
+
+
+# Turn a block size like 4MB into a number of bytes
+# Input: The size as a string
+# Output: The number of bytes. Raises ValueError if it isn't a size above 0.
+def parse_size(size):
+    block_size = Sizes.parse_size(size)
+    if block_size < 1:
+        raise ValueError("The buffer size has to be at least 1 byte")
+
+    return block_size
+
+
+# Input: The queue depth
+# Output: The depth. Raises ValueError if it is below 1, a queue with no
+#         limit would let the reader run ahead through the whole file.
+def parse_depth(depth):
+    if depth < 1:
+        raise ValueError("The queue depth has to be at least 1")
+
+    return depth
+
+
+# Read the input into the queue. Runs in its own thread.
+# Input: The input file, the block size, the queue, the StageStats, a list
+#        to put an error in and the event that says to stop early
+# Output: None
+def read_blocks(input_file, block_size, blocks, stats, errors, stop):
+    try:
+        while not stop.is_set():
+            start = time.monotonic()
+            chunk = input_file.read(block_size)
+            stats.seconds += time.monotonic() - start
+
+            if not chunk:
+                break
+
+            stats.size += len(chunk)
+            blocks.put(chunk)
+    except Exception as error:
+        errors.append(error)
+    finally:
+        blocks.put(END)
+
+
+# Write what is in the queue to the output. Runs in its own thread. After
+# an error the rest of the queue is still taken so the cipher never waits
+# on a full queue.
+# Input: The output file, the queue, the StageStats and a list to put an
+#        error in
+# Output: None
+def write_blocks(output_file, blocks, stats, errors):
+    while True:
+        chunk = blocks.get()
+        if chunk is END:
+            break
+        if errors:
+            continue
+
+        try:
+            start = time.monotonic()
+            output_file.write(chunk)
+            stats.seconds += time.monotonic() - start
+            stats.size += len(chunk)
+        except Exception as error:
+            errors.append(error)
+
+    try:
+        output_file.flush()
+    except Exception as error:
+        errors.append(error)
+
+
+# Run a file through an encryptor or decryptor with reading, the cipher and
+# writing overlapped
+# Input: The stream from the cipher, the open input and output files, the
+#        block size, how many blocks can wait between two stages and the
+#        Metrics (or None)
+# Output: The StageStats of reading, the cipher and writing, and the
+#         seconds the whole run took
+def run_pipeline(stream, input_file, output_file, block_size,
+                 depth=DEFAULT_DEPTH, metrics=None):
+    read_stats = StageStats("read")
+    transform_stats = StageStats("transform")
+    write_stats = StageStats("write")
+
+    read_queue = queue.Queue(depth)
+    write_queue = queue.Queue(depth)
+    read_errors = []
+    write_errors = []
+    stop = threading.Event()
+
+    reader = threading.Thread(target=read_blocks,
+                              args=(input_file, block_size, read_queue,
+                                    read_stats, read_errors, stop))
+    writer = threading.Thread(target=write_blocks,
+                              args=(output_file, write_queue, write_stats,
+                                    write_errors))
+
+    start = time.monotonic()
+    reader.start()
+    writer.start()
+
+    read_all = False
+    try:
+        while True:
+            chunk = read_queue.get()
+            if chunk is END:
+                read_all = True
+                break
+
+            began = time.monotonic()
+            out = stream.update(chunk)
+            transform_stats.seconds += time.monotonic() - began
+            transform_stats.size += len(chunk)
+            if out:
+                write_queue.put(out)
+
+        began = time.monotonic()
+        out = stream.finalize()
+        transform_stats.seconds += time.monotonic() - began
+
+        # Streams that were never given anything finish with an empty str
+        if out:
+            write_queue.put(out)
+    except BaseException:
+        # Let the reader finish so it isn't left waiting on a full queue.
+        # Once END has been taken there is nothing left to wait for.
+        stop.set()
+        while not read_all and read_queue.get() is not END:
+            pass
+        raise
+    finally:
+        write_queue.put(END)
+        reader.join()
+        writer.join()
+
+    if read_errors:
+        raise read_errors[0]
+    if write_errors:
+        raise write_errors[0]
+
+    stages = (read_stats, transform_stats, write_stats)
+    if metrics is not None:
+        for stats in stages:
+            metrics.add_time(stats.name, stats.seconds)
+        Metrics.count(metrics, "bytes_in", read_stats.size)
+        Metrics.count(metrics, "bytes_out", write_stats.size)
+
+    return stages, time.monotonic() - start
+
+
+# Input: The StageStats, the seconds the run took and the file to print to
+# Output: None
+def print_report(stages, seconds, output):
+    for stats in stages:
+        print("{:>9}: {:10.2f} MB/s ({:.1f} MB in {:.3f}s busy)".format(
+            stats.name, stats.rate(), stats.size / 1e6, stats.seconds),
+            file=output)
+
+    print("{:>9}: {:10.2f} MB/s ({:.3f}s wall)".format(
+        "overall", stages[0].size / max(seconds, 1e-9) / 1e6, seconds),
+        file=output)
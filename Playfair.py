@@ -8,12 +8,344 @@
 ###############################################################################
 
 import CipherInterface
+import KeyCache
+import Normalize
+import re
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+# Finds every spot where a letter is followed by the same letter
+DOUBLED = re.compile(r"(?=(.)\1)", re.DOTALL)
+
+# Splits text into pairs of two characters
+PAIRS = re.compile(r"..", re.DOTALL)
+
+# How much of the text is split into pairs at a time
+BLOCK_SIZE = 1 << 16
+
+
+class PairTable(dict):
+    # A pair with a letter that isn't in the matrix doesn't produce anything
+    def __missing__(self, pair):
+        return ""
+
+
+# Create the pairs of plain text. Pairs are taken two letters at a time,
+# except when the two letters are equal: then the first letter is paired
+# with an x and we only move forward by 1 letter. Only the spots where a
+# letter is doubled need any work, everything between them is already in
+# pairs. A letter paired with an x is written twice, which the pair table
+# reads as letter + x.
+# Input: A string of plain text
+# Output: The pairs joined into one string, and the letter left on its own
+#         at the end (empty if there isn't one)
+def split_pairs(plain):
+    pieces = []
+    start = 0
+
+    for doubled in DOUBLED.finditer(plain):
+        i = doubled.start()
+
+        # Doubled letters that straddle two pairs don't matter
+        if i < start or (i - start) % 2:
+            continue
+
+        pieces.append(plain[start:i])
+        pieces.append(plain[i] + plain[i])
+        start = i + 1
+
+    # Letters after the last doubled letter are already in pairs
+    if (len(plain) - start) % 2:
+        pieces.append(plain[start:-1])
+        return "".join(pieces), plain[-1]
+
+    pieces.append(plain[start:])
+    return "".join(pieces), ""
+
+
+# Look up every pair in a pair table
+# Input: The pair table and the pairs joined into one string
+# Output: The translated pairs joined into one string
+def lookup_pairs(table, pairs):
+    return "".join(map(table.__getitem__, PAIRS.findall(pairs)))
+
+
+# Pairs are worked out on str, bytes are read and written as latin-1
+# Input: A chunk of text
+# Output: The chunk as a str
+def to_text(chunk):
+    if isinstance(chunk, str):
+        return chunk
+
+    return bytes(chunk).decode("latin-1")
+
+
+class PlainPairStream:
+    # Incremental encrypt. A letter left on its own at the end of a chunk is
+    # carried over to pair with the first letter of the next chunk, and only
+    # gets an x once there is nothing after it. Chunks are cleaned up with
+    # normalize if one is given, otherwise whitespace is stripped and
+    # letters lowered.
+    def __init__(self, table, normalize=None):
+        self.table = table
+        self.normalize = normalize
+        self.leftover = ""
+        self.is_bytes = False
+
+    # Input: The next chunk of plain text
+    # Output: The cipher text that is ready
+    def update(self, chunk):
+        self.is_bytes = not isinstance(chunk, str)
+        if self.normalize is not None:
+            plain = self.normalize(chunk)
+        elif self.is_bytes:
+            plain = bytes(chunk).translate(
+                None, CipherInterface.BYTE_WHITESPACE).lower()
+        else:
+            plain = chunk.translate(CipherInterface.WHITESPACE).lower()
+
+        pairs, self.leftover = split_pairs(self.leftover + to_text(plain))
+        return self.finish(lookup_pairs(self.table, pairs))
+
+    # Input: None
+    # Output: The rest of the cipher text
+    def finalize(self):
+        pairs = self.leftover + self.leftover
+        self.leftover = ""
+        return self.finish(lookup_pairs(self.table, pairs))
+
+    def finish(self, text):
+        if self.is_bytes:
+            return text.encode("latin-1")
+        return text
+
+
+class CipherPairStream:
+    # Incremental decrypt. Cipher text is split into pairs of characters as
+    # it is, so the only thing carried between chunks is an odd character.
+    # One left over at the very end has nothing to pair with.
+    def __init__(self, table):
+        self.table = table
+        self.leftover = ""
+        self.is_bytes = False
+
+    # Input: The next chunk of cipher text
+    # Output: The plain text that is ready
+    def update(self, chunk):
+        self.is_bytes = not isinstance(chunk, str)
+        cipher = self.leftover + to_text(chunk)
+
+        self.leftover = ""
+        if len(cipher) % 2:
+            self.leftover = cipher[-1]
+            cipher = cipher[:-1]
+
+        return self.finish(lookup_pairs(self.table, cipher))
+
+    # Input: None
+    # Output: The rest of the plain text, always empty for this stream
+    def finalize(self):
+        self.leftover = ""
+        return self.finish("")
+
+    def finish(self, text):
+        if self.is_bytes:
+            return text.encode("latin-1")
+        return text
+
+
+# Feed a whole text through a stream a block at a time, so no step has to
+# hold more than a block of pairs at once. Even an empty text gets one
+# update so the stream knows whether it is working with str or bytes.
+# Input: The stream and the text
+# Output: Everything the stream produced, joined together
+def run_in_blocks(stream, text):
+    out = [stream.update(text[start:start + BLOCK_SIZE])
+           for start in range(0, max(len(text), 1), BLOCK_SIZE)]
+    out.append(stream.finalize())
+
+    return out[-1][:0].join(out)
+
+
+# Find the coords of two letters in the matrix. The matrix is searched one
+# row at a time and stops at the end of the first row where both letters
+# have been seen.
+# Input: The key matrix and the two letters
+# Output: The coords of both letters, or None if one wasn't found
+def locate(matrix, letter_one, letter_two):
+    letter_one_coords = (-1, -1)
+    letter_two_coords = (-1, -1)
+
+    for i in range(0, 5):
+        for j in range(0, 5):
+            if matrix[i][j] == letter_one:
+                letter_one_coords = (i, j)
+            if matrix[i][j] == letter_two:
+                letter_two_coords = (i, j)
+
+        if letter_one_coords != (-1, -1) and letter_two_coords != (-1, -1):
+            return letter_one_coords, letter_two_coords
+
+    return None
+
+
+# Encrypt a single pair of letters
+# Input: The key matrix and the coords of both letters
+# Output: The two letters of cipher text
+def encrypt_pair(matrix, letter_one_coords, letter_two_coords):
+    # Same row, move 1 column right of each letter and wrap to column 0
+    if letter_one_coords[0] == letter_two_coords[0]:
+        row = letter_one_coords[0]
+        return matrix[row][(letter_one_coords[1] + 1) % 5] + \
+            matrix[row][(letter_two_coords[1] + 1) % 5]
+
+    # Same column, move 1 row down of each letter and wrap to row 0
+    if letter_one_coords[1] == letter_two_coords[1]:
+        col = letter_one_coords[1]
+        return matrix[(letter_one_coords[0] + 1) % 5][col] + \
+            matrix[(letter_two_coords[0] + 1) % 5][col]
+
+    # Different row and column
+    return matrix[letter_one_coords[0]][letter_two_coords[1]] + \
+        matrix[letter_two_coords[0]][letter_one_coords[1]]
+
+
+# Decrypt a single pair of letters
+# Input: The key matrix and the coords of both letters
+# Output: The two letters of plain text
+def decrypt_pair(matrix, letter_one_coords, letter_two_coords):
+    # Same row, move 1 column left of each letter and wrap to column 4
+    if letter_one_coords[0] == letter_two_coords[0]:
+        row = letter_one_coords[0]
+        return matrix[row][(letter_one_coords[1] - 1) % 5] + \
+            matrix[row][(letter_two_coords[1] - 1) % 5]
+
+    # Same column, move 1 row up of each letter and wrap to row 4
+    if letter_one_coords[1] == letter_two_coords[1]:
+        col = letter_one_coords[1]
+        return matrix[(letter_one_coords[0] - 1) % 5][col] + \
+            matrix[(letter_two_coords[0] - 1) % 5][col]
+
+    # Different row and column
+    return matrix[letter_one_coords[0]][letter_two_coords[1]] + \
+        matrix[letter_two_coords[0]][letter_one_coords[1]]
+
+
+# Determine which letters of the key should be in the matrix
+# Prevent duplicates, replace j with i
+# Input: The key
+# Output: The letters that start the matrix, in order
+def key_letters(key):
+    seen = []
+
+    for c in key:
+        if c not in seen:
+            if c == "j":
+                c = "i"
+            seen.append(c)
+
+    return seen
+
+
+# Keys that build the same matrix share one cache entry. The matrix only
+# depends on the letters that start it and on which letters are in the key,
+# so repeated letters make no difference. Case and j do: capitals go into
+# the matrix as they are, and j is only turned into i after the check for
+# duplicates.
+# Input: The key
+# Output: The cache key
+def schedule_key(key):
+    return "playfair", "".join(key_letters(key)), "".join(sorted(set(key)))
+
+
+# Build the 5x5 matrix based on the key
+# Input: User defined key
+# Output: The matrix as a tuple of rows
+def make_matrix(key):
+    matrix = [[0 for x in range(5)] for y in range(5)]
+    seen = key_letters(key)
+
+    # Build matrix with key
+    x = 0
+    for i in range(0, 5):
+        for j in range(0, 5):
+            # If seen still contains characters, pop and place them.
+            # Otherwise build the matrix in alphabetical order with letters
+            # that haven't appeared earlier in the matrix.
+            # Always exclude in the matrix j, i takes its place.
+            if seen:
+                matrix[i][j] = seen.pop(0)
+            else:
+                for k in range(x, 26):
+                    letter = chr(k + 97)
+                    if letter not in key and letter != "j":
+                        matrix[i][j] = letter
+                        x = k + 1
+                        break
+
+    return tuple(tuple(row) for row in matrix)
+
+
+# Work out the answer for every possible pair of letters up front so that
+# encrypting and decrypting is one dictionary lookup per pair
+# Input: The key matrix
+# Output: Where each letter sits in the matrix, and the encrypt and decrypt
+#         pair tables
+def make_tables(matrix):
+    # Where each letter sits in the matrix
+    index = {}
+    for i in range(0, 5):
+        for j in range(0, 5):
+            index.setdefault(matrix[i][j], (i, j))
+
+    # Plain text pairs. A pair of the same letter twice stands for that
+    # letter followed by the x that gets put between doubled letters.
+    encrypt_table = PairTable()
+    for first in LETTERS:
+        for second in LETTERS:
+            letter_one = first
+            letter_two = second if first != second else "x"
+
+            # Handles j appearing in the plain text
+            # j is not in the matrix but will be represented by i
+            if letter_one == "j":
+                letter_one = "i"
+            if letter_two == "j":
+                letter_two = "i"
+
+            coords = locate(matrix, letter_one, letter_two)
+            if coords:
+                encrypt_table[first + second] = encrypt_pair(matrix, *coords)
+
+    # Cipher text pairs can only be made of letters in the matrix
+    decrypt_table = PairTable()
+    in_matrix = set(index)
+    for letter_one in in_matrix:
+        for letter_two in in_matrix:
+            coords = locate(matrix, letter_one, letter_two)
+            if coords:
+                decrypt_table[letter_one + letter_two] = \
+                    decrypt_pair(matrix, *coords)
+
+    return index, encrypt_table, decrypt_table
+
+
+# Everything the cipher needs for one key. The result is shared through the
+# key schedule cache, so it is never changed after this.
+# Input: User defined key
+# Output: The matrix, the letter index and the two pair tables
+def compile_key(key):
+    matrix = make_matrix(key)
+    return (matrix,) + make_tables(matrix)
 
 
 class Playfair(CipherInterface.CipherInterface):
     def __init__(self):
         self.key = ""
         self.matrix = [[0 for x in range(5)] for y in range(5)]
+        self.index = {}
+        self.encrypt_table = PairTable()
+        self.decrypt_table = PairTable()
 
     # Determine if the key is valid or not
     # Input: User defined key
@@ -34,252 +366,43 @@ class Playfair(CipherInterface.CipherInterface):
 
         return True
 
-    # Build the 5x5 matrix based on the key
+    # Build the 5x5 matrix based on the key. The matrix and pair tables for
+    # a key are built once and then shared through the key schedule cache.
     # Input: User defined key
     # Output: None. Sets the matrix for the object
     def construct_key_matrix(self, key):
-        matrix = self.matrix
-
-        # Determine which letters of the key should be in the matrix
-        # Prevent duplicates, replace j with i
-        seen = []
-
-        for c in key:
-            if c not in seen:
-                if c == "j":
-                    c = "i"
-                seen.append(c)
-
-        # Build matrix with key
-        x = 0
-        for i in range(0, 5):
-            for j in range(0, 5):
-                # If seen still contains characters, pop and place them.
-                # Otherwise build the matrix in alphabetical order with letters
-                # that haven't appeared earlier in the matrix.
-                # Always exclude in the matrix j, i takes its place.
-                if seen:
-                    matrix[i][j] = seen.pop(0)
-                else:
-                    for k in range(x, 26):
-                        letter = chr(k + 97)
-                        if letter not in key and letter != "j":
-                            matrix[i][j] = letter
-                            x = k + 1
-                            break
-
-        self.matrix = matrix
+        matrix, self.index, self.encrypt_table, self.decrypt_table = \
+            KeyCache.SCHEDULES.get(schedule_key(key),
+                                   lambda: compile_key(key))
+        self.matrix = [list(row) for row in matrix]
 
     # Encrypt the given plain text based on the matrix
-    # Input: A string of plain text
+    # Input: A string (or bytes) of plain text
     # Output: The resulting cipher text
     def encrypt(self, plain_text):
-        plain = "".join(plain_text.split()).lower()
-        matrix = self.matrix
-
-        # Create the pairs of plain text
-        plain_pairs = []
-        while plain:
-            # Grab the first two letters of the plain text
-            first_two_letters = plain[:2]
-
-            # If there was only 1 letter left in the plain text, append an x
-            # so that it becomes a pair
-            if len(first_two_letters) == 1:
-                first_two_letters += "x"
-
-            # If the two letters in the pair are equal, make the second letter
-            # an x and only move forward by 1 letter.
-            # Otherwise, add the pair to the list of pairs
-            if first_two_letters[0] == first_two_letters[1]:
-                plain_pairs.append(first_two_letters[0] + "x")
-                plain = plain[1:]
-            else:
-                plain_pairs.append(first_two_letters)
-                plain = plain[2:]
-
-        cipher = []
-        for pair in plain_pairs:
-            letter_one = pair[0]
-            letter_two = pair[1]
-
-            # Handles j appearing in the plain text
-            # j is not in the matrix but will be represented by i
-            if letter_one == "j":
-                letter_one = "i"
-            if letter_two == "j":
-                letter_two = "i"
-
-            letter_one_coords = (-1, -1)
-            letter_two_coords = (-1, -1)
-
-            for i in range(0, 5):
-                for j in range(0, 5):
-                    # Find the coords of the letters
-                    if matrix[i][j] == letter_one:
-                        letter_one_coords = (i, j)
-                    if matrix[i][j] == letter_two:
-                        letter_two_coords = (i, j)
-
-                # If both coords have been found, do the build the cipher text
-                # and break from the loop
-                if letter_one_coords != (-1, -1) \
-                        and letter_two_coords != (-1, -1):
-                    # Same row
-                    if letter_one_coords[0] == letter_two_coords[0]:
-                        # Stay in same row, move 1 column right of first letter
-                        col_to_move = letter_one_coords[1] + 1
-
-                        # Wrap to column 0 if at the end
-                        if col_to_move == 5:
-                            col_to_move = 0
-
-                        # Append letter right of first plain text
-                        cipher.append(
-                            matrix[letter_one_coords[0]][col_to_move])
-
-                        # Stay in same row, move 1 column right of second
-                        # letter
-                        col_to_move = letter_two_coords[1] + 1
-
-                        # Wrap to column 0 if at the end
-                        if col_to_move == 5:
-                            col_to_move = 0
-
-                        # Append letter right of second plain text
-                        cipher.append(
-                            matrix[letter_one_coords[0]][col_to_move])
-
-                    # Same column
-                    elif letter_one_coords[1] == letter_two_coords[1]:
-                        # Stay in the same column, move 1 row down of first
-                        row_to_move = letter_one_coords[0] + 1
-
-                        # Wrap to row 0 if at the end
-                        if row_to_move == 5:
-                            row_to_move = 0
-
-                        # Append letter down of the first plain text
-                        cipher.append(
-                            matrix[row_to_move][letter_one_coords[1]])
-
-                        # Stay in the same column, move 1 row down of second
-                        row_to_move = letter_two_coords[0] + 1
-
-                        # Wrap to row 0 if at the end
-                        if row_to_move == 5:
-                            row_to_move = 0
-
-                        # Append letter down of the second plain text
-                        cipher.append(
-                            matrix[row_to_move][letter_two_coords[1]])
-
-                    # Different row and column
-                    else:
-                        cipher.append(
-                            matrix[letter_one_coords[0]][letter_two_coords[1]])
-                        cipher.append(
-                            matrix[letter_two_coords[0]][letter_one_coords[1]])
-                    break
-
-        # Join the cipher list to make the cipher text string
-        cipher_text = "".join(cipher)
-        return cipher_text
+        return run_in_blocks(self.encryptor(), plain_text)
 
     # Decrypt the given cipher text based on the matrix
-    # Input: A string of cipher text
+    # Input: A string (or bytes) of cipher text
     # Output: The resulting plain text
     def decrpyt(self, cipher_text):
-        cipher = cipher_text
-        matrix = self.matrix
-
-        # Create the pairs of cipher text
-        cipher_pairs = []
-        while cipher:
-            # Grab the first two letters of the cipher text
-            first_two_letters = cipher[:2]
-
-            # Append the letters to the list of pairs and set the cipher
-            cipher_pairs.append(first_two_letters)
-            cipher = cipher[2:]
-
-        plain = []
-        for pair in cipher_pairs:
-            letter_one = pair[0]
-            letter_two = pair[1]
-
-            letter_one_coords = (-1, -1)
-            letter_two_coords = (-1, -1)
-
-            for i in range(0, 5):
-                for j in range(0, 5):
-                    # Find the coords of the letters
-                    if matrix[i][j] == letter_one:
-                        letter_one_coords = (i, j)
-                    if matrix[i][j] == letter_two:
-                        letter_two_coords = (i, j)
-
-                # If both coords have been found, do the build the cipher text
-                # and break from the loop
-                if letter_one_coords != (-1, -1) \
-                        and letter_two_coords != (-1, -1):
-                    # Same row
-                    if letter_one_coords[0] == letter_two_coords[0]:
-                        # Stay in same row, move 1 column right of first letter
-                        col_to_move = letter_one_coords[1] - 1
-
-                        # Wrap to column 0 if at the end
-                        if col_to_move == -1:
-                            col_to_move = 4
-
-                        # Append letter right of first plain text
-                        plain.append(
-                            matrix[letter_one_coords[0]][col_to_move])
-
-                        # Stay in same row, move 1 column right of second
-                        # letter
-                        col_to_move = letter_two_coords[1] - 1
-
-                        # Wrap to column 0 if at the end
-                        if col_to_move == -1:
-                            col_to_move = 4
-
-                        # Append letter right of second plain text
-                        plain.append(
-                            matrix[letter_one_coords[0]][col_to_move])
-
-                    # Same column
-                    elif letter_one_coords[1] == letter_two_coords[1]:
-                        # Stay in the same column, move 1 row down of first
-                        row_to_move = letter_one_coords[0] - 1
-
-                        # Wrap to row 0 if at the end
-                        if row_to_move == -1:
-                            row_to_move = 4
-
-                        # Append letter down of the first plain text
-                        plain.append(
-                            matrix[row_to_move][letter_one_coords[1]])
-
-                        # Stay in the same column, move 1 row down of second
-                        row_to_move = letter_two_coords[0] - 1
-
-                        # Wrap to row 0 if at the end
-                        if row_to_move == -1:
-                            row_to_move = 4
-
-                        # Append letter down of the second plain text
-                        plain.append(
-                            matrix[row_to_move][letter_two_coords[1]])
-
-                    # Different row and column
-                    else:
-                        plain.append(
-                            matrix[letter_one_coords[0]][letter_two_coords[1]])
-                        plain.append(
-                            matrix[letter_two_coords[0]][letter_one_coords[1]])
-                    break
-
-        # Join the plain text list to make the plain text string
-        plain_text = "".join(plain)
-        return plain_text
+        return run_in_blocks(self.decryptor(), cipher_text)
+
+    # Every letter can end up paired with an x
+    # Input: The size of the plain text
+    # Output: The largest the cipher text can be
+    def max_encrypt_size(self, length):
+        return 2 * length
+
+    # Input: None
+    # Output: An object with update() and finalize()
+    def encryptor(self):
+        if self.policy == Normalize.KEEP:
+            return PlainPairStream(self.encrypt_table)
+
+        return PlainPairStream(self.encrypt_table, self.normalize)
+
+    # Input: None
+    # Output: An object with update() and finalize()
+    def decryptor(self):
+        return CipherPairStream(self.decrypt_table)
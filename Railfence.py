@@ -8,10 +8,38 @@
 #               and reading along the columns.                                #
 ###############################################################################
 
+import Alphabet
 import CipherInterface
+import Normalize
+import Permutation
+import functools
+
+
+# Work out where every letter goes. Letters are dealt onto the rails in turn,
+# so rail i holds the letters at i, i + key, i + 2 * key, ... and the first
+# length % key rails get one extra letter. The cipher text is the rails one
+# after another. The result only depends on the key and the length, so it
+# is cached for texts of the same size.
+# Input: The number of rails and the length of the text
+# Output: The runs of the permutation, one per rail
+@functools.lru_cache(maxsize=64)
+def rail_runs(key, length):
+    letters_per_row = length // key
+    remainder = length % key
+
+    runs = []
+    start = 0
+    for i in range(0, min(key, length)):
+        count = letters_per_row + (1 if i < remainder else 0)
+        runs.append((start, i, key, count))
+        start += count
+
+    return tuple(runs)
 
 
 class Railfence(CipherInterface.CipherInterface):
+    alphabets = Alphabet.ALPHABETS
+
     def __init__(self):
         self.key = ""
 
@@ -21,7 +49,7 @@ class Railfence(CipherInterface.CipherInterface):
     def set_key(self, key):
 
         # Valid key for railfence is any integer digit > 0
-        if key.isdigit() and key != "0":
+        if key.isdigit() and int(key) > 0:
 
             self.key = int(key)
 
@@ -31,81 +59,81 @@ class Railfence(CipherInterface.CipherInterface):
             return False
 
     # Encrypt the given plain text based on the key
-    # Input: A string of plain text
+    # Input: A string (or bytes) of plain text
     # Output: The resulting cipher text
     def encrypt(self, plain_text):
-        plain = plain_text
-        cipher_text = ""
-        key = self.key
-
-        # Create the rails
-        rails = []
-        for i in range(0, key):
-            rails.append("")
-
-        # Add letters to the rails
-        i = 0
-        for c in plain:
-            # Don't encrypt spaces
-            if c == " ":
-                continue
-
-            # Add letter to the specified rail
-            rails[i] += c
-
-            # Move to next rail
-            i += 1
-            if i == key:
-                i = 0
+        # Don't encrypt spaces, unless every byte is a symbol
+        if self.alphabet == Alphabet.BYTES:
+            plain = CipherInterface.raw_bytes(plain_text)
+        elif self.policy != Normalize.KEEP:
+            plain = self.normalize(plain_text)
+        elif isinstance(plain_text, str):
+            plain = plain_text.replace(" ", "")
+        else:
+            plain = bytes(plain_text).replace(b" ", b"")
 
         # Build cipher text by combining the rails
-        for i in rails:
-            cipher_text += i
-
-        return cipher_text
+        return Permutation.gather(plain, rail_runs(self.key, len(plain)))
 
     # Decrypt the given cipher text based on the key
-    # Input: A string of cipher text
+    # Input: A string (or bytes) of cipher text
     # Output: The resulting plain text
     def decrpyt(self, cipher_text):
-        cipher = cipher_text
-        plain_text = ""
-        key = self.key
-
-        # Find out how many letters are going to be in the rails
-        length_of_cipher = len(cipher)
-        letters_per_row = int(length_of_cipher / key)
-        remainder = length_of_cipher % key
-
-        # Create the rails
-        rails = []
-        for i in range(0, key):
-            # Determines if a row should have an extra letter or not
-            if remainder > 0:
-                letter_for_remainder = 1
-                remainder -= 1
-            else:
-                letter_for_remainder = 0
-
-            # Set rail equal to the first letters_per_row + remainder in the
-            # cipher
-            rails.append(cipher[:letters_per_row + letter_for_remainder])
-
-            # Cipher removes the characters that were added
-            cipher = cipher[letters_per_row + letter_for_remainder:]
-
-        # Loop through rails to build the plain text
-        j = 0
-        for i in range(0, length_of_cipher):
-            # Get the first element of the rail into plain text
-            plain_text += rails[j][:1]
-
-            # Remove the first element from the rail
-            rails[j] = rails[j][1:]
-
-            # Move through each rail
-            j += 1
-            if j == key:
-                j = 0
-
-        return plain_text
+        if self.alphabet == Alphabet.BYTES:
+            cipher_text = CipherInterface.raw_bytes(cipher_text)
+
+        # Split the cipher text back into rails and read along the columns
+        return Permutation.scatter(cipher_text,
+                                   rail_runs(self.key, len(cipher_text)))
+
+    # Encrypt many texts, moving all the texts of the same length at once
+    # Input: A list of strings (or bytes) of plain text
+    # Output: A list of the cipher texts, in the same order
+    def encrypt_many(self, plain_texts):
+        if self.alphabet == Alphabet.BYTES:
+            plain_texts = list(map(CipherInterface.raw_bytes, plain_texts))
+        elif self.policy != Normalize.KEEP:
+            plain_texts = [self.normalize(text) for text in plain_texts]
+
+        texts, is_str = CipherInterface.as_byte_texts(plain_texts)
+        if texts is None:
+            return CipherInterface.CipherInterface.encrypt_many(self,
+                                                                plain_texts)
+
+        if self.alphabet == Alphabet.LETTERS and \
+                self.policy == Normalize.KEEP:
+            texts = [text.replace(b" ", b"") for text in texts]
+
+        return CipherInterface.from_byte_texts(
+            Permutation.apply_moves_many(
+                texts, lambda length: (Permutation.gather_moves(
+                    rail_runs(self.key, length)), length)), is_str)
+
+    # Decrypt many texts, moving all the texts of the same length at once
+    # Input: A list of strings (or bytes) of cipher text
+    # Output: A list of the plain texts, in the same order
+    def decrypt_many(self, cipher_texts):
+        if self.alphabet == Alphabet.BYTES:
+            cipher_texts = list(map(CipherInterface.raw_bytes, cipher_texts))
+
+        texts, is_str = CipherInterface.as_byte_texts(cipher_texts)
+        if texts is None:
+            return CipherInterface.CipherInterface.decrypt_many(self,
+                                                                cipher_texts)
+
+        return CipherInterface.from_byte_texts(
+            Permutation.apply_moves_many(
+                texts, lambda length: (Permutation.scatter_moves(
+                    rail_runs(self.key, length)), length)), is_str)
+
+    # Input: "e" or "d"
+    # Output: Spaces are deleted when encrypting (not over the bytes
+    #         alphabet), nothing is filled in and the rails give the moves
+    def transposition(self, mode):
+        if mode == "e":
+            delete = b" " if self.alphabet == Alphabet.LETTERS else b""
+            return None, delete, lambda length: (
+                b"", Permutation.gather_moves(rail_runs(self.key, length)))
+
+        return None, b"", lambda length: (
+            b"", Permutation.scatter_moves(rail_runs(self.key, length)))
@@ -0,0 +1,750 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: Reference.py                                                     #
+# Description: The ciphers exactly as they were first written, one character  #
+#              at a time, quirks and all: Playfair's x between doubled        #
+#              letters and at the end, j read as i, RowTransposition filling  #
+#              its last row with x, Vigenre only lowering the key. The faster #
+#              engines in the other files have to give the same results,      #
+#              Differential.py checks that they do.                           #
+#                                                                             #
+#              Frozen: don't speed these up or fix them. A change in          #
+#              behaviour belongs in the cipher files, and if it is meant to   #
+#              differ from here the harness needs to be told.                 #
+###############################################################################
+
+import math
+
+
+class Caesar:
+    def __init__(self):
+        self.key = ""
+
+    # Determine if the key is valid or not
+    # Input: User defined key
+    # Output: True of False if the key is valid
+    def set_key(self, key):
+
+        # Valid key for Caesar is any integer digit > 0
+        # Also if the key mod 26 is 0, it is invalid
+        # A key of 0 or a multiple of 26 means no encrpytion happens
+        if key.isdigit() and key != "0" and int(key) % 26 != 0:
+
+            self.key = int(key) % 26
+
+            return True
+        else:
+            # If the user didn't give a correct key, return false
+            return False
+
+    # Encrypt the given plain text based on the key
+    # Input: A string of plain text
+    # Output: The resulting cipher text
+    def encrypt(self, plain_text):
+        # Convert to lowercase so AbC will react the same as abc, etc.
+        plain = plain_text.lower()
+        cipher_text = ""
+        key = self.key
+
+        # Go through each letter in the plain text, convert to ascii, and
+        # increment by the key
+        for c in plain:
+            # Don't encrypt spaces
+            if c == " ":
+                continue
+
+            letter_ascii = ord(c)
+            letter_ascii += key
+
+            # Going out of bounds on the letter ascii > (z = 122), loop back to
+            # beginning. EX: ascii of 123-26 = 97 = a
+            if letter_ascii > 122:
+                letter_ascii -= 26
+
+            # Build the cipher text
+            cipher_text += chr(letter_ascii)
+
+        return cipher_text
+
+    # Decrypt the given cipher text based on the key
+    # Input: A string of cipher text
+    # Output: The resulting plain text
+    def decrpyt(self, cipher_text):
+        cipher = cipher_text.lower()
+        plain_text = ""
+        key = self.key
+
+        # Go through each letter in the cipher text, convert to ascii, and
+        # decrement by the key
+        for c in cipher:
+            letter_ascii = ord(c)
+            letter_ascii -= key
+
+            # Going out of bounds on the letter ascii < (a = 97), loop back to
+            # end. EX: ascii of 96+26 = 122 = z
+            if letter_ascii < 97:
+                letter_ascii += 26
+
+            # Build the plain text
+            plain_text += chr(letter_ascii)
+
+        return plain_text
+
+
+class Vigenre:
+    def __init__(self):
+        self.key = ""
+        self.matrix = [[]]
+
+    # Build the 26x26 matrix
+    # Input: None
+    # Output: None. Sets the matrix for the object.
+    def build_rows(self):
+        self.matrix = [[0 for x in range(26)] for y in range(26)]
+        for i in range(0, 26):
+            for j in range(0, 26):
+                char_to_add = j + i + 97
+                if char_to_add > 122:
+                    char_to_add -= 26
+                self.matrix[i][j] = (chr(char_to_add))
+
+        return
+
+    # Determine if the key is valid or not
+    # Input: User defined key
+    # Output: True of False if the key is valid
+    def set_key(self, key):
+        key = key.lower()
+
+        # Check if key is a-z lowercase
+        for c in key:
+            if 97 <= ord(c) <= 122:
+                continue
+            else:
+                # If the user didn't give a correct key, return false
+                return False
+
+        # If we make it out of the loop without returning, key is fine
+        self.key = key
+        return True
+
+    # The key needs to be modified to be the same length as the text
+    # Input: A string of text
+    # Output: A key matching the length of the input
+    def modify_key(self, in_text):
+        key = self.key
+        text = in_text
+
+        length_of_key = len(key)
+        length_of_text = len(text)
+
+        # If the key is smaller than the plain text, duplicate it until it is
+        # equal or greater than the size of the plain text
+        while length_of_key < length_of_text:
+            key += self.key
+            length_of_key = len(key)
+
+        # If the key is greater than the plain text, remove letters from the
+        # back to make the lengths equal
+        if length_of_key > length_of_text:
+            num_to_remove = length_of_key - length_of_text
+            key = key[:-num_to_remove]
+
+        return key
+
+    # Encrypt the given plain text based on the key
+    # Input: A string of plain text
+    # Output: The resulting cipher text
+    def encrypt(self, plain_text):
+        cipher_text = ""
+
+        # Strip all whitespace from the plain text
+        plain = "".join(plain_text.split())
+
+        # Modify key to match plain text length
+        key = self.modify_key(plain)
+
+        # Find the spot in the matrix to begin encryption
+        for i in range(0, len(plain)):
+            # Row - Subtract 97 to find proper spot in the matrix
+            matrix_index_for_key = ord(key[i]) - 97
+
+            # Column - Subtract 97 to find proper spot in the matrix
+            matrix_index_for_plain = ord(plain[i]) - 97
+
+            # Build cipher text
+            cipher_text += \
+                self.matrix[matrix_index_for_key][matrix_index_for_plain]
+
+        return cipher_text
+
+    # Decrypt the given cipher text based on the key
+    # Input: A string of cipher text
+    # Output: The resulting plain text
+    def decrpyt(self, cipher_text):
+        key = self.modify_key(cipher_text)
+        cipher = cipher_text
+        plain_text = ""
+
+        # Find the spot in the matrix to begin encryption
+        for i in range(0, len(key)):
+            # The letter of the cipher text we need to find in the matrix
+            letter = cipher[i]
+
+            # Row - Subtract 97 to find proper spot in the matrix
+            matrix_index_for_key = ord(key[i]) - 97
+
+            # Look through the matrix at row found in previous step for the
+            # letter of the cipher text
+            for j in range(0, 26):
+                # When the letter is found, use the index it is at to determine
+                # which letter of plain text it maps to
+                if self.matrix[matrix_index_for_key][j] == letter:
+                    # Build the plain text
+                    plain_text += chr(j+97)
+
+                    break
+
+        return plain_text
+
+
+class Playfair:
+    def __init__(self):
+        self.key = ""
+        self.matrix = [[0 for x in range(5)] for y in range(5)]
+
+    # Determine if the key is valid or not
+    # Input: User defined key
+    # Output: True of False if the key is valid
+    def set_key(self, key):
+        key = key.lower()
+
+        # Check if key is a-z lowercase
+        for c in key:
+            if 97 <= ord(c) <= 122:
+                continue
+            else:
+                # If the user didn't give a correct key, return false
+                return False
+
+        # If we make it out of the loop without returning, key is fine
+        self.key = key
+
+        return True
+
+    # Build the 5x5 matrix based on the key
+    # Input: User defined key
+    # Output: None. Sets the matrix for the object
+    def construct_key_matrix(self, key):
+        matrix = self.matrix
+
+        # Determine which letters of the key should be in the matrix
+        # Prevent duplicates, replace j with i
+        seen = []
+
+        for c in key:
+            if c not in seen:
+                if c == "j":
+                    c = "i"
+                seen.append(c)
+
+        # Build matrix with key
+        x = 0
+        for i in range(0, 5):
+            for j in range(0, 5):
+                # If seen still contains characters, pop and place them.
+                # Otherwise build the matrix in alphabetical order with letters
+                # that haven't appeared earlier in the matrix.
+                # Always exclude in the matrix j, i takes its place.
+                if seen:
+                    matrix[i][j] = seen.pop(0)
+                else:
+                    for k in range(x, 26):
+                        letter = chr(k + 97)
+                        if letter not in key and letter != "j":
+                            matrix[i][j] = letter
+                            x = k + 1
+                            break
+
+        self.matrix = matrix
+
+    # Encrypt the given plain text based on the matrix
+    # Input: A string of plain text
+    # Output: The resulting cipher text
+    def encrypt(self, plain_text):
+        plain = "".join(plain_text.split()).lower()
+        matrix = self.matrix
+
+        # Create the pairs of plain text
+        plain_pairs = []
+        while plain:
+            # Grab the first two letters of the plain text
+            first_two_letters = plain[:2]
+
+            # If there was only 1 letter left in the plain text, append an x
+            # so that it becomes a pair
+            if len(first_two_letters) == 1:
+                first_two_letters += "x"
+
+            # If the two letters in the pair are equal, make the second letter
+            # an x and only move forward by 1 letter.
+            # Otherwise, add the pair to the list of pairs
+            if first_two_letters[0] == first_two_letters[1]:
+                plain_pairs.append(first_two_letters[0] + "x")
+                plain = plain[1:]
+            else:
+                plain_pairs.append(first_two_letters)
+                plain = plain[2:]
+
+        cipher = []
+        for pair in plain_pairs:
+            letter_one = pair[0]
+            letter_two = pair[1]
+
+            # Handles j appearing in the plain text
+            # j is not in the matrix but will be represented by i
+            if letter_one == "j":
+                letter_one = "i"
+            if letter_two == "j":
+                letter_two = "i"
+
+            letter_one_coords = (-1, -1)
+            letter_two_coords = (-1, -1)
+
+            for i in range(0, 5):
+                for j in range(0, 5):
+                    # Find the coords of the letters
+                    if matrix[i][j] == letter_one:
+                        letter_one_coords = (i, j)
+                    if matrix[i][j] == letter_two:
+                        letter_two_coords = (i, j)
+
+                # If both coords have been found, do the build the cipher text
+                # and break from the loop
+                if letter_one_coords != (-1, -1) \
+                        and letter_two_coords != (-1, -1):
+                    # Same row
+                    if letter_one_coords[0] == letter_two_coords[0]:
+                        # Stay in same row, move 1 column right of first letter
+                        col_to_move = letter_one_coords[1] + 1
+
+                        # Wrap to column 0 if at the end
+                        if col_to_move == 5:
+                            col_to_move = 0
+
+                        # Append letter right of first plain text
+                        cipher.append(
+                            matrix[letter_one_coords[0]][col_to_move])
+
+                        # Stay in same row, move 1 column right of second
+                        # letter
+                        col_to_move = letter_two_coords[1] + 1
+
+                        # Wrap to column 0 if at the end
+                        if col_to_move == 5:
+                            col_to_move = 0
+
+                        # Append letter right of second plain text
+                        cipher.append(
+                            matrix[letter_one_coords[0]][col_to_move])
+
+                    # Same column
+                    elif letter_one_coords[1] == letter_two_coords[1]:
+                        # Stay in the same column, move 1 row down of first
+                        row_to_move = letter_one_coords[0] + 1
+
+                        # Wrap to row 0 if at the end
+                        if row_to_move == 5:
+                            row_to_move = 0
+
+                        # Append letter down of the first plain text
+                        cipher.append(
+                            matrix[row_to_move][letter_one_coords[1]])
+
+                        # Stay in the same column, move 1 row down of second
+                        row_to_move = letter_two_coords[0] + 1
+
+                        # Wrap to row 0 if at the end
+                        if row_to_move == 5:
+                            row_to_move = 0
+
+                        # Append letter down of the second plain text
+                        cipher.append(
+                            matrix[row_to_move][letter_two_coords[1]])
+
+                    # Different row and column
+                    else:
+                        cipher.append(
+                            matrix[letter_one_coords[0]][letter_two_coords[1]])
+                        cipher.append(
+                            matrix[letter_two_coords[0]][letter_one_coords[1]])
+                    break
+
+        # Join the cipher list to make the cipher text string
+        cipher_text = "".join(cipher)
+        return cipher_text
+
+    # Decrypt the given cipher text based on the matrix
+    # Input: A string of cipher text
+    # Output: The resulting plain text
+    def decrpyt(self, cipher_text):
+        cipher = cipher_text
+        matrix = self.matrix
+
+        # Create the pairs of cipher text
+        cipher_pairs = []
+        while cipher:
+            # Grab the first two letters of the cipher text
+            first_two_letters = cipher[:2]
+
+            # Append the letters to the list of pairs and set the cipher
+            cipher_pairs.append(first_two_letters)
+            cipher = cipher[2:]
+
+        plain = []
+        for pair in cipher_pairs:
+            letter_one = pair[0]
+            letter_two = pair[1]
+
+            letter_one_coords = (-1, -1)
+            letter_two_coords = (-1, -1)
+
+            for i in range(0, 5):
+                for j in range(0, 5):
+                    # Find the coords of the letters
+                    if matrix[i][j] == letter_one:
+                        letter_one_coords = (i, j)
+                    if matrix[i][j] == letter_two:
+                        letter_two_coords = (i, j)
+
+                # If both coords have been found, do the build the cipher text
+                # and break from the loop
+                if letter_one_coords != (-1, -1) \
+                        and letter_two_coords != (-1, -1):
+                    # Same row
+                    if letter_one_coords[0] == letter_two_coords[0]:
+                        # Stay in same row, move 1 column right of first letter
+                        col_to_move = letter_one_coords[1] - 1
+
+                        # Wrap to column 0 if at the end
+                        if col_to_move == -1:
+                            col_to_move = 4
+
+                        # Append letter right of first plain text
+                        plain.append(
+                            matrix[letter_one_coords[0]][col_to_move])
+
+                        # Stay in same row, move 1 column right of second
+                        # letter
+                        col_to_move = letter_two_coords[1] - 1
+
+                        # Wrap to column 0 if at the end
+                        if col_to_move == -1:
+                            col_to_move = 4
+
+                        # Append letter right of second plain text
+                        plain.append(
+                            matrix[letter_one_coords[0]][col_to_move])
+
+                    # Same column
+                    elif letter_one_coords[1] == letter_two_coords[1]:
+                        # Stay in the same column, move 1 row down of first
+                        row_to_move = letter_one_coords[0] - 1
+
+                        # Wrap to row 0 if at the end
+                        if row_to_move == -1:
+                            row_to_move = 4
+
+                        # Append letter down of the first plain text
+                        plain.append(
+                            matrix[row_to_move][letter_one_coords[1]])
+
+                        # Stay in the same column, move 1 row down of second
+                        row_to_move = letter_two_coords[0] - 1
+
+                        # Wrap to row 0 if at the end
+                        if row_to_move == -1:
+                            row_to_move = 4
+
+                        # Append letter down of the second plain text
+                        plain.append(
+                            matrix[row_to_move][letter_two_coords[1]])
+
+                    # Different row and column
+                    else:
+                        plain.append(
+                            matrix[letter_one_coords[0]][letter_two_coords[1]])
+                        plain.append(
+                            matrix[letter_two_coords[0]][letter_one_coords[1]])
+                    break
+
+        # Join the plain text list to make the plain text string
+        plain_text = "".join(plain)
+        return plain_text
+
+
+class Railfence:
+    def __init__(self):
+        self.key = ""
+
+    # Determine if the key is valid or not
+    # Input: User defined key
+    # Output: True of False if the key is valid
+    def set_key(self, key):
+
+        # Valid key for railfence is any integer digit > 0
+        if key.isdigit() and key != "0":
+
+            self.key = int(key)
+
+            return True
+        else:
+            # If the user didn't give a correct key, return false
+            return False
+
+    # Encrypt the given plain text based on the key
+    # Input: A string of plain text
+    # Output: The resulting cipher text
+    def encrypt(self, plain_text):
+        plain = plain_text
+        cipher_text = ""
+        key = self.key
+
+        # Create the rails
+        rails = []
+        for i in range(0, key):
+            rails.append("")
+
+        # Add letters to the rails
+        i = 0
+        for c in plain:
+            # Don't encrypt spaces
+            if c == " ":
+                continue
+
+            # Add letter to the specified rail
+            rails[i] += c
+
+            # Move to next rail
+            i += 1
+            if i == key:
+                i = 0
+
+        # Build cipher text by combining the rails
+        for i in rails:
+            cipher_text += i
+
+        return cipher_text
+
+    # Decrypt the given cipher text based on the key
+    # Input: A string of cipher text
+    # Output: The resulting plain text
+    def decrpyt(self, cipher_text):
+        cipher = cipher_text
+        plain_text = ""
+        key = self.key
+
+        # Find out how many letters are going to be in the rails
+        length_of_cipher = len(cipher)
+        letters_per_row = int(length_of_cipher / key)
+        remainder = length_of_cipher % key
+
+        # Create the rails
+        rails = []
+        for i in range(0, key):
+            # Determines if a row should have an extra letter or not
+            if remainder > 0:
+                letter_for_remainder = 1
+                remainder -= 1
+            else:
+                letter_for_remainder = 0
+
+            # Set rail equal to the first letters_per_row + remainder in the
+            # cipher
+            rails.append(cipher[:letters_per_row + letter_for_remainder])
+
+            # Cipher removes the characters that were added
+            cipher = cipher[letters_per_row + letter_for_remainder:]
+
+        # Loop through rails to build the plain text
+        j = 0
+        for i in range(0, length_of_cipher):
+            # Get the first element of the rail into plain text
+            plain_text += rails[j][:1]
+
+            # Remove the first element from the rail
+            rails[j] = rails[j][1:]
+
+            # Move through each rail
+            j += 1
+            if j == key:
+                j = 0
+
+        return plain_text
+
+
+class RowTransposition:
+    def __init__(self):
+        self.key = ""
+
+    # Determine if the key is valid or not
+    # Input: User defined key
+    # Output: True of False if the key is valid
+    def set_key(self, key):
+        # Key should be between 2 and 9 characters
+        if key.isdigit() and 1 < len(key) < 10:
+
+            key_list = []
+
+            for c in key:
+                # There should be no 0s in the eky
+                if c == "0":
+                    return False
+
+                if c in key_list:
+                    # Key should not have duplicates
+                    # If a duplicate was found, invalid key
+                    return False
+                else:
+                    # Build the key
+                    key_list.append(c)
+
+            # Makes sure the key has a 1,2,3... somewhere in it
+            # Goes from 1 to length of list + 1 to check all values present
+            for i in range(1, len(key_list) + 1):
+                found = False
+
+                # Search key_list to see if it contains the number
+                for j in key_list:
+                    if int(j) == i:
+                        found = True
+                        break
+
+                # Return false if the number was not found
+                # Invalid key
+                if not found:
+                    return False
+
+            # Makes sure the key is greater than length of 1
+            # If we haven't returned false by now, valid key
+            if len(key_list) > 1:
+                self.key = "".join(key_list)
+                return True
+        else:
+            # Key had a non digit or was not of proper size
+            return False
+
+    # Encrypt the given plain text based on the key
+    # Input: A string of plain text
+    # Output: The resulting cipher text
+    def encrypt(self, plain_text):
+        key = self.key
+        plain = list(plain_text.lower().replace(" ", ""))
+        num_rows = math.ceil(len(plain) / len(key))
+
+        # Make sure all rows will be filled equally
+        while len(plain) % (len(key) * num_rows) != 0:
+            plain.append("x")
+
+        length_of_plain = len(plain)
+
+        # Create the rows from plain text
+        rows = [[0 for x in range(int(length_of_plain / num_rows))]
+                for y in range(num_rows)]
+
+        for i in range(0, num_rows):
+            for j in range(0, len(key)):
+                rows[i][j] = plain.pop(0)
+
+        # Create the columns from the rows
+        cols = [[0 for x in range(num_rows)]
+                for y in range(int(length_of_plain / num_rows))]
+
+        for i in range(len(key)):
+            for j in range(num_rows):
+                cols[i][j] = rows[j][i]
+
+        # Order the columns should be arranged
+        key_order = []
+        for i in range(1, len(key) + 1):
+            for j in range(0, len(key)):
+                if i == int(key[j]):
+                    key_order.append(j)
+
+        # Create cipher text
+        cipher_list = []
+        for c in key_order:
+            num = int(c)
+            cipher_list.append(cols[num])
+
+        for i in range(len(cipher_list)):
+            cipher_list[i] = "".join(cipher_list[i])
+
+        cipher_text = "".join(cipher_list)
+
+        return cipher_text
+
+    # Decrypt the given cipher text based on the key
+    # Input: A string of cipher text
+    # Output: The resulting plain text
+    def decrpyt(self, cipher_text):
+        key = self.key
+        cipher = list(cipher_text)
+        num_rows = int(len(cipher) / len(key))
+        length_of_cipher = len(cipher)
+
+        # Create the columns
+        cols = [[0 for x in range(num_rows)]
+                for y in range(int(length_of_cipher / num_rows))]
+
+        for i in range(len(key)):
+            for j in range(num_rows):
+                cols[i][j] = cipher.pop(0)
+
+        # Build list with cipher text
+        cipher_list = []
+        for c in key:
+            num = int(c)
+            cipher_list.append(cols[num - 1])
+
+        # Create the rows from cipher list
+        rows = [[0 for x in range(int(length_of_cipher / num_rows))]
+                for y in range(num_rows)]
+
+        for i in range(0, num_rows):
+            for j in range(0, len(key)):
+                rows[i][j] = cipher_list[j][i]
+
+        # Build the plain text
+        for i in range(len(rows)):
+            rows[i] = "".join(rows[i])
+
+        plain_text = "".join(rows)
+
+        return plain_text
+
+
+# The classes by the name used on the command line
+CIPHERS = {
+    "caesar": Caesar,
+    "vigenre": Vigenre,
+    "playfair": Playfair,
+    "railfence": Railfence,
+    "rowtransposition": RowTransposition,
+}
+
+
+# Set a reference cipher up the way the original driver did
+# Input: The name of the cipher and the key
+# Output: The cipher, or None if the key isn't valid
+def make_reference(name, key):
+    cipher = CIPHERS[name]()
+    if not cipher.set_key(key):
+        return None
+
+    if name == "playfair":
+        cipher.construct_key_matrix(key)
+    elif name == "vigenre":
+        cipher.build_rows()
+
+    return cipher
@@ -7,11 +7,69 @@
 #              to be in order but the numbers have to increase up to the max. #
 ###############################################################################
 
+import Alphabet
 import CipherInterface
+import English
+import KeyCache
+import Normalize
+import Permutation
+import functools
 import math
 
+# Order the columns should be arranged. Only depends on the key, so it is
+# kept in the key schedule cache.
+# Input: The key
+# Output: A tuple with the column for 1, then the column for 2 and so on
+def key_order(key):
+    def build():
+        order = []
+        for i in range(1, len(key) + 1):
+            order.append(key.index(str(i)))
+        return tuple(order)
+
+    return KeyCache.SCHEDULES.get(("rowtransposition", key), build)
+
+
+# Work out where every letter goes. The text is laid out in rows of
+# len(key) letters, so column j holds the letters at j, j + len(key), ...
+# The cipher text is the columns in key order: the column with a 1 in the
+# key first, then the column with a 2 and so on. The result only depends on
+# the key and the number of rows, so it is cached for texts of the same
+# size.
+# Input: The key and the number of rows
+# Output: The runs of the permutation, one per column
+@functools.lru_cache(maxsize=64)
+def column_runs(key, num_rows):
+    runs = []
+    if num_rows:
+        for i, col in enumerate(key_order(key)):
+            runs.append((i * num_rows, col, len(key), num_rows))
+
+    return tuple(runs)
+
+
+# Over the bytes alphabet the last row isn't filled, so the text keeps its
+# length. The first length % len(key) columns get one more byte than the
+# rest, and the cipher text is still the columns in key order.
+# Input: The key and the length of the text
+# Output: The runs of the permutation, one per column
+@functools.lru_cache(maxsize=64)
+def short_row_runs(key, length):
+    num_rows, remainder = divmod(length, len(key))
+
+    runs = []
+    start = 0
+    for col in key_order(key):
+        count = num_rows + (1 if col < remainder else 0)
+        runs.append((start, col, len(key), count))
+        start += count
+
+    return tuple(runs)
+
 
 class RowTransposition(CipherInterface.CipherInterface):
+    alphabets = Alphabet.ALPHABETS
+
     def __init__(self):
         self.key = ""
 
@@ -63,90 +121,139 @@ class RowTransposition(CipherInterface.CipherInterface):
             return False
 
     # Encrypt the given plain text based on the key
-    # Input: A string of plain text
+    # Input: A string (or bytes) of plain text
     # Output: The resulting cipher text
     def encrypt(self, plain_text):
         key = self.key
-        plain = list(plain_text.lower().replace(" ", ""))
-        num_rows = math.ceil(len(plain) / len(key))
-
-        # Make sure all rows will be filled equally
-        while len(plain) % (len(key) * num_rows) != 0:
-            plain.append("x")
-
-        length_of_plain = len(plain)
-
-        # Create the rows from plain text
-        rows = [[0 for x in range(int(length_of_plain / num_rows))]
-                for y in range(num_rows)]
-
-        for i in range(0, num_rows):
-            for j in range(0, len(key)):
-                rows[i][j] = plain.pop(0)
 
-        # Create the columns from the rows
-        cols = [[0 for x in range(num_rows)]
-                for y in range(int(length_of_plain / num_rows))]
+        if self.alphabet == Alphabet.BYTES:
+            plain = CipherInterface.raw_bytes(plain_text)
+            return Permutation.gather(plain, short_row_runs(key, len(plain)))
+        fill = "x" if isinstance(plain_text, str) else b"x"
 
-        for i in range(len(key)):
-            for j in range(num_rows):
-                cols[i][j] = rows[j][i]
-
-        # Order the columns should be arranged
-        key_order = []
-        for i in range(1, len(key) + 1):
-            for j in range(0, len(key)):
-                if i == int(key[j]):
-                    key_order.append(j)
+        if self.policy != Normalize.KEEP:
+            plain = self.normalize(plain_text)
+        elif isinstance(plain_text, str):
+            plain = plain_text.lower().replace(" ", "")
+        else:
+            # Lower and drop spaces in one pass
+            plain = bytes(plain_text).translate(English.TO_LOWER, b" ")
 
-        # Create cipher text
-        cipher_list = []
-        for c in key_order:
-            num = int(c)
-            cipher_list.append(cols[num])
+        if not plain:
+            return plain
 
-        for i in range(len(cipher_list)):
-            cipher_list[i] = "".join(cipher_list[i])
+        num_rows = math.ceil(len(plain) / len(key))
 
-        cipher_text = "".join(cipher_list)
+        # Make sure all rows will be filled equally
+        plain += fill * (len(key) * num_rows - len(plain))
 
-        return cipher_text
+        # Create cipher text from the columns in key order
+        return Permutation.gather(plain, column_runs(key, num_rows))
 
     # Decrypt the given cipher text based on the key
-    # Input: A string of cipher text
+    # Input: A string (or bytes) of cipher text
     # Output: The resulting plain text
     def decrpyt(self, cipher_text):
         key = self.key
-        cipher = list(cipher_text)
-        num_rows = int(len(cipher) / len(key))
-        length_of_cipher = len(cipher)
-
-        # Create the columns
-        cols = [[0 for x in range(num_rows)]
-                for y in range(int(length_of_cipher / num_rows))]
 
-        for i in range(len(key)):
-            for j in range(num_rows):
-                cols[i][j] = cipher.pop(0)
+        if self.alphabet == Alphabet.BYTES:
+            cipher = CipherInterface.raw_bytes(cipher_text)
+            return Permutation.scatter(cipher,
+                                       short_row_runs(key, len(cipher)))
+        num_rows = len(cipher_text) // len(key)
+
+        # Put every column back where the key says it came from. Anything
+        # past the last full row is left out.
+        return Permutation.scatter(cipher_text, column_runs(key, num_rows),
+                                   num_rows * len(key))
+
+    # Encrypt many texts. Once the last rows are filled, texts of the same
+    # length share one permutation and are moved all at once.
+    # Input: A list of strings (or bytes) of plain text
+    # Output: A list of the cipher texts, in the same order
+    def encrypt_many(self, plain_texts):
+        key = self.key
 
-        # Build list with cipher text
-        cipher_list = []
-        for c in key:
-            num = int(c)
-            cipher_list.append(cols[num - 1])
+        if self.alphabet == Alphabet.BYTES:
+            return Permutation.apply_moves_many(
+                list(map(CipherInterface.raw_bytes, plain_texts)),
+                lambda length: (Permutation.gather_moves(
+                    short_row_runs(key, length)), length))
+
+        if self.policy != Normalize.KEEP:
+            plain_texts = [self.normalize(text) for text in plain_texts]
+
+        texts, is_str = CipherInterface.as_byte_texts(plain_texts)
+        if texts is None:
+            return CipherInterface.CipherInterface.encrypt_many(self,
+                                                                plain_texts)
+
+        if self.policy == Normalize.KEEP:
+            texts = [text.translate(English.TO_LOWER, b" ")
+                     for text in texts]
+        texts = [text + b"x" * (-len(text) % len(key)) for text in texts]
+
+        return CipherInterface.from_byte_texts(
+            Permutation.apply_moves_many(
+                texts, lambda length: (Permutation.gather_moves(
+                    column_runs(key, length // len(key))), length)), is_str)
+
+    # Decrypt many texts, moving all the texts of the same length at once
+    # Input: A list of strings (or bytes) of cipher text
+    # Output: A list of the plain texts, in the same order
+    def decrypt_many(self, cipher_texts):
+        key = self.key
 
-        # Create the rows from cipher list
-        rows = [[0 for x in range(int(length_of_cipher / num_rows))]
-                for y in range(num_rows)]
+        if self.alphabet == Alphabet.BYTES:
+            return Permutation.apply_moves_many(
+                list(map(CipherInterface.raw_bytes, cipher_texts)),
+                lambda length: (Permutation.scatter_moves(
+                    short_row_runs(key, length)), length))
+
+        texts, is_str = CipherInterface.as_byte_texts(cipher_texts)
+        if texts is None:
+            return CipherInterface.CipherInterface.decrypt_many(self,
+                                                                cipher_texts)
+
+        def layout(length):
+            num_rows = length // len(key)
+            return Permutation.scatter_moves(column_runs(key, num_rows)), \
+                num_rows * len(key)
+
+        return CipherInterface.from_byte_texts(
+            Permutation.apply_moves_many(texts, layout), is_str)
+
+    # The last row is filled up with x, except over the bytes alphabet
+    # Input: The size of the plain text
+    # Output: The largest the cipher text can be
+    def max_encrypt_size(self, length):
+        if self.alphabet == Alphabet.BYTES:
+            return length
+
+        return length + len(self.key) - 1
+
+    # Input: "e" or "d"
+    # Output: Letters are lowered and spaces deleted when encrypting, which
+    #         also fills the last row with x. Decrypting leaves out anything
+    #         past the last full row.
+    def transposition(self, mode):
+        key = self.key
 
-        for i in range(0, num_rows):
-            for j in range(0, len(key)):
-                rows[i][j] = cipher_list[j][i]
+        # The bytes alphabet moves every byte and fills nothing in
+        if self.alphabet == Alphabet.BYTES:
+            moves = Permutation.gather_moves if mode == "e" else \
+                Permutation.scatter_moves
+            return None, b"", lambda length: (
+                b"", moves(short_row_runs(key, length)))
 
-        # Build the plain text
-        for i in range(len(rows)):
-            rows[i] = "".join(rows[i])
+        if mode == "e":
+            def layout(length):
+                num_rows = math.ceil(length / len(key))
+                return b"x" * (num_rows * len(key) - length), \
+                    Permutation.gather_moves(column_runs(key, num_rows))
 
-        plain_text = "".join(rows)
+            return English.TO_LOWER, b" ", layout
 
-        return plain_text
+        return None, b"", lambda length: (
+            b"", Permutation.scatter_moves(
+                column_runs(key, length // len(key))))
@@ -0,0 +1,421 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: Server.py                                                        #
+# Description: Keeps the ciphers loaded in one long running process so small #
+#              messages don't pay for starting Python every time. Listens on  #
+#              a Unix socket or a localhost TCP port.                         #
+#                                                                             #
+#              Every message is a 4 byte big endian length followed by that  #
+#              many bytes. A request is a 2 byte header length, a JSON header #
+#              and the data:                                                  #
+#                  {"cipher": "caesar", "key": "3", "mode": "e"}              #
+#                  {"op": "stats"}                                            #
+#              A response is 1 status byte (0 ok, 1 error) and the result,    #
+#              or the error message.                                          #
+#                                                                             #
+#              Small requests for the same cipher, key and mode that arrive   #
+#              together are run as one batch. Large ones go to a pool of      #
+#              processes so the server keeps answering everyone else.         #
+#                                                                             #
+#              python3 Server.py --unix /tmp/cipher.sock                      #
+#              python3 Server.py --port 8765 --workers 4                      #
+###############################################################################
+
+import Cipher
+import KeyCache
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+import time
+
+# Frame headers
+LENGTH = struct.Struct("!I")
+HEADER_LENGTH = struct.Struct("!H")
+
+# Response status
+OK = 0
+ERROR = 1
+
+# Nothing bigger than this is read off the socket
+MAX_FRAME_SIZE = 1 << 30
+
+# Data at least this large is worked on in the process pool
+LARGE_SIZE = 256 << 10
+
+# How long a request waits for others to join its batch, in seconds
+BATCH_WINDOW = 0.001
+
+# A batch is run straight away once it holds this many bytes
+MAX_BATCH_SIZE = 1 << 20
+
+# How many latencies are kept for the percentiles
+LATENCY_SAMPLES = 100000
+
+
+# Run a list of messages through one cipher. Runs on the event loop for
+# small batches and in a worker process for large ones.
+# Input: The cipher name, the key, "e" or "d" and the list of messages
+# Output: A list with (OK, result) or (ERROR, message) for every message
+def run_batch(name, key, mode, payloads):
+    try:
+        cipher = Cipher.make_cipher(name, key)
+    except ValueError as error:
+        return [(ERROR, str(error))] * len(payloads)
+
+    # The whole batch goes through the cipher at once, only if that fails
+    # is it run a message at a time to find the ones to blame
+    many = cipher.encrypt_many if mode == "e" else cipher.decrypt_many
+    try:
+        return [(OK, result) for result in many(payloads)]
+    except Exception:
+        pass
+
+    function = cipher.encrypt if mode == "e" else cipher.decrpyt
+
+    results = []
+    for data in payloads:
+        try:
+            results.append((OK, function(data)))
+        except Exception as error:
+            results.append((ERROR, str(error)))
+
+    return results
+
+
+# Work out a percentile from a list of samples
+# Input: The samples and the percentile, 0 to 100
+# Output: The sample at that percentile, 0 if there are none
+def percentile(samples, percent):
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1,
+                       round(percent / 100 * (len(ordered) - 1)))]
+
+
+class Stats:
+    # Request counts and latencies for the stats request and the reports
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched = 0
+        self.latencies = collections.deque(maxlen=LATENCY_SAMPLES)
+
+    # Input: How long the request took in seconds and whether it failed
+    # Output: None
+    def record(self, seconds, failed):
+        self.requests += 1
+        self.errors += failed
+        self.latencies.append(seconds)
+
+    # Input: None
+    # Output: A dictionary of everything measured so far
+    def report(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "requests_per_sec": self.requests / elapsed,
+            "p50_ms": percentile(self.latencies, 50) * 1000,
+            "p99_ms": percentile(self.latencies, 99) * 1000,
+            "batches": self.batches,
+            "mean_batch_size": self.batched / max(self.batches, 1),
+            "uptime_sec": elapsed,
+            "ciphers": Cipher.CIPHERS.stats(),
+            "key_schedules": KeyCache.stats(),
+        }
+
+
+class Batcher:
+    # Collects requests for the same cipher, key and mode that arrive within
+    # BATCH_WINDOW of each other and runs them with one call
+    def __init__(self, pool, stats):
+        self.pool = pool
+        self.stats = stats
+        self.pending = {}
+
+    # Input: The cipher name, the key, "e" or "d" and the data
+    # Output: (OK, result) or (ERROR, message)
+    async def submit(self, name, key, mode, data):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        group_id = (name, key, mode)
+
+        # Big messages aren't worth waiting for company
+        if len(data) >= LARGE_SIZE:
+            self.run(group_id, [(data, future)])
+            return await future
+
+        group = self.pending.setdefault(group_id, [])
+        group.append((data, future))
+        if len(group) == 1:
+            loop.call_later(BATCH_WINDOW, self.flush, group_id, group)
+        elif sum(len(d) for d, _ in group) >= MAX_BATCH_SIZE:
+            self.flush(group_id, group)
+
+        return await future
+
+    # Run a group if it is still waiting
+    # Input: The group id and the group the timer was started for
+    # Output: None
+    def flush(self, group_id, group):
+        if self.pending.get(group_id) is group:
+            del self.pending[group_id]
+            self.run(group_id, group)
+
+    # Run a group, in the pool if it's large enough to hold up the loop
+    # Input: The group id and a list of (data, future)
+    # Output: None
+    def run(self, group_id, group):
+        self.stats.batches += 1
+        self.stats.batched += len(group)
+        payloads = [data for data, _ in group]
+
+        # Runs from a timer on the loop for small groups, an error that got
+        # away would leave every client in the group waiting for good
+        if self.pool is None or sum(map(len, payloads)) < LARGE_SIZE:
+            try:
+                results = run_batch(*group_id, payloads)
+            except Exception as error:
+                results = [(ERROR, str(error))] * len(group)
+            self.deliver(group, results)
+            return
+
+        work = asyncio.get_running_loop().run_in_executor(
+            self.pool, run_batch, *group_id, payloads)
+        work.add_done_callback(lambda done: self.finish(group, done))
+
+    # Input: The group and the finished pool job
+    # Output: None
+    def finish(self, group, done):
+        if done.exception() is not None:
+            results = [(ERROR, str(done.exception()))] * len(group)
+        else:
+            results = done.result()
+        self.deliver(group, results)
+
+    # Input: The group and a result for every message in it
+    # Output: None
+    def deliver(self, group, results):
+        for (_, future), result in zip(group, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class Server:
+    def __init__(self, pool):
+        self.stats = Stats()
+        self.batcher = Batcher(pool, self.stats)
+
+    # Answer one request
+    # Input: The body of the request frame
+    # Output: The status and the body of the response
+    async def answer(self, frame):
+        try:
+            (header_length,) = HEADER_LENGTH.unpack_from(frame)
+            header = json.loads(bytes(frame[2:2 + header_length]))
+            data = bytes(frame[2 + header_length:])
+        except (struct.error, ValueError):
+            return ERROR, b"Badly formed request"
+        if not isinstance(header, dict):
+            return ERROR, b"The request header must be a JSON object"
+
+        if header.get("op") == "stats":
+            return OK, json.dumps(self.stats.report()).encode()
+
+        name = str(header.get("cipher", "")).lower()
+        key = str(header.get("key", ""))
+        mode = header.get("mode")
+
+        if name not in Cipher.REGISTRY:
+            return ERROR, "Unknown cipher: {}".format(name).encode()
+        if mode not in ("e", "d"):
+            return ERROR, b"Mode must be \"e\" or \"d\""
+
+        status, result = await self.batcher.submit(name, key, mode, data)
+        if status == ERROR:
+            result = result.encode()
+        return status, result
+
+    # Serve one connection until the client hangs up. Requests on the same
+    # connection are answered in order.
+    # Input: The stream reader and writer for the connection
+    # Output: None
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    (length,) = LENGTH.unpack(
+                        await reader.readexactly(LENGTH.size))
+                    if length > MAX_FRAME_SIZE:
+                        break
+                    frame = await reader.readexactly(length)
+                except asyncio.IncompleteReadError:
+                    break
+
+                start = time.perf_counter()
+                status, body = await self.answer(frame)
+
+                writer.write(LENGTH.pack(len(body) + 1) + bytes([status]))
+                writer.write(body)
+                await writer.drain()
+
+                self.stats.record(time.perf_counter() - start,
+                                  status == ERROR)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # Print the stats every so often
+    # Input: The number of seconds between reports
+    # Output: None
+    async def report_every(self, seconds):
+        while True:
+            await asyncio.sleep(seconds)
+            print_report(self.stats.report())
+
+
+# Nothing to do, run once so the pool starts its workers
+# Input: None
+# Output: None
+def start_worker():
+    pass
+
+
+# Input: The stats to print
+# Output: None
+def print_report(report):
+    print("{requests} requests, {requests_per_sec:.1f} requests/sec, "
+          "p50 {p50_ms:.3f} ms, p99 {p99_ms:.3f} ms, "
+          "{mean_batch_size:.2f} per batch".format(**report), file=sys.stderr)
+
+
+# Run the server until it gets SIGINT or SIGTERM
+# Input: The Unix socket path, or the host and port, the number of worker
+#        processes and how often to print the stats (0 for never)
+# Output: None
+async def serve(unix_path=None, host="127.0.0.1", port=8765, workers=None,
+                report_seconds=0):
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        server = Server(pool)
+
+        # The pool forks its workers on the first job. Doing that before
+        # listening keeps client sockets out of the workers.
+        await asyncio.get_running_loop().run_in_executor(pool, start_worker)
+
+        if unix_path:
+            remove_socket(unix_path)
+            listener = await asyncio.start_unix_server(server.handle,
+                                                       path=unix_path)
+            print("Listening on {}".format(unix_path), file=sys.stderr)
+        else:
+            listener = await asyncio.start_server(server.handle, host, port)
+            print("Listening on {}:{}".format(host, port), file=sys.stderr)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signal_number, stop.set)
+
+        reporter = None
+        if report_seconds:
+            reporter = asyncio.create_task(
+                server.report_every(report_seconds))
+
+        async with listener:
+            await stop.wait()
+
+        if reporter is not None:
+            reporter.cancel()
+        if unix_path:
+            remove_socket(unix_path)
+        print_report(server.stats.report())
+
+
+# Remove a Unix socket left behind by an earlier run. Anything that isn't a
+# socket is left alone.
+# Input: The socket path
+# Output: None
+def remove_socket(path):
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+# Send one request and wait for the answer. A small blocking client for
+# scripts and for trying the server out.
+# Input: A connected socket, the request header and the data
+# Output: The result bytes. Raises ValueError if the server sent an error
+def call(sock, header, data=b""):
+    header = json.dumps(header).encode()
+    body = HEADER_LENGTH.pack(len(header)) + header + data
+    sock.sendall(LENGTH.pack(len(body)) + body)
+
+    (length,) = LENGTH.unpack(receive(sock, LENGTH.size))
+    response = receive(sock, length)
+    if response[0] == ERROR:
+        raise ValueError(response[1:].decode())
+
+    return response[1:]
+
+
+# Input: A connected socket and the number of bytes to read
+# Output: Exactly that many bytes
+def receive(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Server closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+
+    return b"".join(chunks)
+
+
+# Connect to a server
+# Input: A Unix socket path or host:port
+# Output: The connected socket
+def connect(address):
+    if ":" in address:
+        host, port = address.rsplit(":", 1)
+        return socket.create_connection((host, int(port)))
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(address)
+    return sock
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the cipher server")
+    parser.add_argument("--unix", help="Unix socket to listen on")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to listen on when not using --unix")
+    parser.add_argument("--port", type=int, default=8765,
+                        help="TCP port to listen on when not using --unix")
+    parser.add_argument("-w", "--workers", type=int,
+                        help="number of worker processes for large requests")
+    parser.add_argument("--report", type=float, default=0,
+                        help="print the stats every this many seconds")
+    args = parser.parse_args(argv)
+
+    asyncio.run(serve(args.unix, args.host, args.port, args.workers,
+                      args.report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: Sizes.py                                                         #
+# Description: Reads sizes like 64KB or 1.5MB given on the command line, for  #
+#              the benchmark and the pipeline                                 #
+###############################################################################
+
+UNITS = {"B": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+
+
+# Turn a size like 64KB into a number of characters or bytes
+# Input: The size as a string
+# Output: The number. Raises ValueError if it isn't a size.
+def parse_size(size):
+    size = size.strip().upper()
+    for unit in ("KB", "MB", "GB", "B"):
+        if size.endswith(unit):
+            return int(float(size[:-len(unit)]) * UNITS[unit])
+
+    return int(size)
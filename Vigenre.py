@@ -9,34 +9,343 @@
 #              letter to build encryption or decrypt the cipher text.         #
 ###############################################################################
 
+import Alphabet
 import CipherInterface
+import KeyCache
+import Normalize
+import contextlib
+
+# Placeholder for cipher text characters that don't decrypt to anything
+DROPPED = 0
+
+
+# Encrypting looks the plain text letter up in the matrix with
+# ord(letter) - 97, so anything from G (71) to z (122) lands on a column
+# thanks to negative indexing. Everything else is left as it is.
+# Input: The shift for one key letter
+# Output: A str translate table and the matching bytes table
+def build_encrypt_tables(shift):
+    table = {}
+    byte_table = bytearray(range(256))
+
+    for letter_ascii in range(71, 123):
+        column = (letter_ascii - 97) % 26
+        table[letter_ascii] = (column + shift) % 26 + 97
+        byte_table[letter_ascii] = table[letter_ascii]
+
+    return table, bytes(byte_table)
+
+
+class DropTable(dict):
+    # Anything without an entry becomes DROPPED instead of staying the same
+    def __missing__(self, letter_ascii):
+        return DROPPED
+
+
+# Decrypting only finds letters a-z in the matrix, everything else is skipped
+# but still uses up a letter of the key. Those characters are turned into
+# DROPPED so the key stays lined up, then removed at the end.
+# Input: The shift for one key letter
+# Output: A str translate table and the matching bytes table
+def build_decrypt_tables(shift):
+    table = DropTable()
+    byte_table = bytearray([DROPPED] * 256)
+
+    for letter_ascii in range(97, 123):
+        table[letter_ascii] = (letter_ascii - 97 - shift) % 26 + 97
+        byte_table[letter_ascii] = table[letter_ascii]
+
+    return table, bytes(byte_table)
+
+
+ENCRYPT_TABLES = [build_encrypt_tables(shift) for shift in range(26)]
+DECRYPT_TABLES = [build_decrypt_tables(shift) for shift in range(26)]
+
+# The bytes alphabet adds or takes away the key byte mod 256. There is no
+# str table, that alphabet only works on bytes.
+BYTE_ENCRYPT_TABLES = [(None, Alphabet.ADD_TABLES[shift])
+                       for shift in range(Alphabet.SIZE)]
+BYTE_DECRYPT_TABLES = [(None, Alphabet.subtract_table(shift))
+                       for shift in range(Alphabet.SIZE)]
+
+
+# Characters of text the key is applied to at a time. Only the result is
+# as long as the text, anything worked out along the way is one block.
+KEY_BLOCK = 1 << 20
+
+# Characters of text that isn't ASCII the key is applied to at a time
+WIDE_BLOCK = 1 << 16
+
+# The fewest characters each key letter gets in a block, so a long key
+# doesn't turn a block into a lot of tiny translates
+MIN_COLUMN = 64
+
+
+# Apply the key to one block of text a column at a time. Every key letter
+# handles the letters at positions i, i + len(key), i + 2 * len(key), ...
+# so there is one translate per key letter rather than one lookup per text
+# letter, and the key is never stretched to the length of the text.
+# Input: The block (str or bytes), the key shifts, the tables to use and
+#        the position in the key that its first letter lines up with
+# Output: The translated block, a str for str and a bytearray for bytes
+def apply_key_block(block, shifts, tables, phase):
+    length_of_key = len(shifts)
+
+    if isinstance(block, str) and not block.isascii():
+        # Wider characters can't go through a byte buffer, collect the
+        # columns in a list instead. A list entry is 8 bytes a character,
+        # so that is done WIDE_BLOCK characters at a time.
+        size = length_of_key * max(MIN_COLUMN, WIDE_BLOCK // length_of_key)
+        pieces = []
+        for start in range(0, len(block), size):
+            piece = block[start:start + size]
+            out = [""] * len(piece)
+            for i in range(min(length_of_key, len(piece))):
+                shift = shifts[(start + i + phase) % length_of_key]
+                out[i::length_of_key] = \
+                    piece[i::length_of_key].translate(tables[shift][0])
+            pieces.append("".join(out))
+        return "".join(pieces)
+
+    # ASCII strings and bytes use the byte tables, which give the same result
+    data = block.encode("ascii") if isinstance(block, str) else block
+    out = bytearray(len(data))
+    for i in range(min(length_of_key, len(data))):
+        shift = shifts[(i + phase) % length_of_key]
+        out[i::length_of_key] = \
+            data[i::length_of_key].translate(tables[shift][1])
+
+    if isinstance(block, str):
+        return out.decode("ascii")
+
+    return out
+
+
+# Apply the key to the text a block at a time. Whitespace is deleted from
+# each block before the key is applied and DROPPED taken out after, so
+# neither needs a copy of the whole text. str comes back as a str, the
+# only copy the size of the text. Anything else is written into one
+# bytearray, or straight into the caller's buffer.
+# Input: The text (str or any buffer), the key shifts, the tables to use,
+#        the position in the key that the first letter lines up with, the
+#        whitespace to delete first (or None), whether to take DROPPED out
+#        and a writable buffer for the result (or None)
+# Output: The translated text (the number of bytes written if there was a
+#         buffer) and how many key letters were used
+def apply_key(text, shifts, tables, phase=0, delete=None, drop=False,
+              out=None):
+    length_of_key = len(shifts)
+    block_size = length_of_key * max(MIN_COLUMN,
+                                     KEY_BLOCK // length_of_key)
+    is_str = isinstance(text, str)
+
+    with contextlib.ExitStack() as views:
+        if is_str:
+            pieces = []
+        else:
+            text = views.enter_context(memoryview(text)).cast("B")
+            views.enter_context(text)
+            if out is None:
+                result = out = bytearray(len(text))
+            else:
+                result = None
+                out = views.enter_context(memoryview(out)).cast("B")
+                views.enter_context(out)
+
+        written = 0
+        used = 0
+        for start in range(0, len(text), block_size):
+            block = text[start:start + block_size]
+            if not is_str:
+                block = block.tobytes()
+
+            if delete is not None:
+                block = block.translate(delete) if is_str else \
+                    block.translate(None, delete)
+
+            block_out = apply_key_block(block, shifts, tables,
+                                        (phase + used) % length_of_key)
+            used += len(block)
+
+            if drop:
+                block_out = block_out.replace(
+                    chr(DROPPED) if is_str else bytes([DROPPED]),
+                    block_out[:0])
+
+            if is_str:
+                pieces.append(block_out)
+                continue
+
+            if written + len(block_out) > len(out):
+                raise ValueError("Output buffer is too small: more than {} "
+                                 "bytes needed, {} given".format(
+                                     len(out), len(out)))
+            out[written:written + len(block_out)] = block_out
+            written += len(block_out)
+
+    if is_str:
+        return "".join(pieces), used
+
+    if result is None:
+        return written, used
+
+    del result[written:]
+    return result, used
+
+
+# Apply the key to many texts at once. Each text is padded out to a whole
+# number of key lengths so every one of them starts on the first key
+# letter, then each key letter is one translate over all of them.
+# Input: The texts as bytes, the key shifts and the tables to use
+# Output: The translated texts laid end to end and where each one starts
+def apply_key_many(texts, shifts, tables):
+    padding = bytes(len(shifts))
+    pieces = []
+    starts = []
+    position = 0
+    for text in texts:
+        pad = -len(text) % len(shifts)
+        pieces.append(text)
+        pieces.append(padding[:pad])
+        starts.append(position)
+        position += len(text) + pad
+
+    # The messages are short, one copy keeps their slices bytes
+    return bytes(apply_key(b"".join(pieces), shifts, tables)[0]), starts
+
+
+# Encrypt text starting part way through the key
+# Input: A string (or bytes) of plain text, the key shifts and the position
+#        in the key to start from
+# Output: The cipher text (a bytearray for bytes) and how many key letters
+#         were used
+def encrypt_text(plain_text, shifts, phase=0):
+    # Strip all whitespace from the plain text
+    delete = CipherInterface.WHITESPACE if isinstance(plain_text, str) \
+        else CipherInterface.BYTE_WHITESPACE
+
+    return apply_key(plain_text, shifts, ENCRYPT_TABLES, phase, delete)
+
+
+# Decrypt text starting part way through the key. Characters that weren't
+# letters don't make it into the plain text.
+# Input: A string (or bytes) of cipher text, the key shifts and the position
+#        in the key to start from
+# Output: The plain text (a bytearray for bytes) and how many key letters
+#         were used
+def decrypt_text(cipher_text, shifts, phase=0):
+    return apply_key(cipher_text, shifts, DECRYPT_TABLES, phase, drop=True)
+
+
+# Encrypt bytes over the bytes alphabet starting part way through the key.
+# Nothing is stripped or dropped.
+# Input: Bytes of plain text, the key shifts and the position in the key to
+#        start from
+# Output: The cipher text as a bytearray and how many key bytes were used
+def encrypt_bytes(plain_text, shifts, phase=0):
+    plain = CipherInterface.raw_bytes(plain_text)
+    return apply_key(plain, shifts, BYTE_ENCRYPT_TABLES, phase)
+
+
+# Decrypt bytes over the bytes alphabet starting part way through the key
+# Input: Bytes of cipher text, the key shifts and the position in the key
+#        to start from
+# Output: The plain text as a bytearray and how many key bytes were used
+def decrypt_bytes(cipher_text, shifts, phase=0):
+    cipher = CipherInterface.raw_bytes(cipher_text)
+    return apply_key(cipher, shifts, BYTE_DECRYPT_TABLES, phase)
+
+
+# encrypt() and decrpyt() give back bytes like every other cipher, so the
+# bytearray the key was applied into is copied once there. The streams and
+# the *_into methods hand it on as it is.
+# Input: The result of applying the key
+# Output: The result, bytes instead of a bytearray
+def as_bytes_result(text):
+    if isinstance(text, bytearray):
+        return bytes(text)
+
+    return text
+
+
+class KeyStream:
+    # Incremental encrypt/decrypt that remembers how far into the key the
+    # text has got, so the next chunk picks up with the right key letter
+    def __init__(self, function, shifts, empty=""):
+        self.function = function
+        self.shifts = shifts
+        self.phase = 0
+        self.empty = empty
+
+    # Input: The next chunk of text
+    # Output: The text that is ready
+    def update(self, chunk):
+        self.empty = chunk[:0]
+        text, used = self.function(chunk, self.shifts, self.phase)
+        self.phase = (self.phase + used) % len(self.shifts)
+        return text
+
+    # Input: None
+    # Output: The rest of the text, always empty for this stream
+    def finalize(self):
+        return self.empty
+
+
+# Input: None
+# Output: The 26x26 matrix as a tuple of rows, row i is the alphabet
+#         shifted by i
+def make_rows():
+    matrix = [[0 for x in range(26)] for y in range(26)]
+    for i in range(0, 26):
+        for j in range(0, 26):
+            char_to_add = j + i + 97
+            if char_to_add > 122:
+                char_to_add -= 26
+            matrix[i][j] = (chr(char_to_add))
+
+    return tuple(tuple(row) for row in matrix)
+
+
+# Each key letter is a Caesar shift, a = 0 through z = 25
+# Input: A valid lowercase key
+# Output: The shifts as a tuple
+def make_shifts(key):
+    return tuple(ord(c) - 97 for c in key)
 
 
 class Vigenre(CipherInterface.CipherInterface):
+    alphabets = Alphabet.ALPHABETS
+    policies = Normalize.POLICIES
+
     def __init__(self):
         self.key = ""
         self.matrix = [[]]
+        self.shifts = ()
 
-    # Build the 26x26 matrix
+    # Build the 26x26 matrix. Encryption no longer needs it, the key letters
+    # are applied as shifts directly, but it is kept for anyone who wants to
+    # look at the table. The matrix is the same for every key, so it is only
+    # worked out once. Its cache entry is named apart from the key shifts so
+    # no key can land on it.
     # Input: None
     # Output: None. Sets the matrix for the object.
     def build_rows(self):
-        self.matrix = [[0 for x in range(26)] for y in range(26)]
-        for i in range(0, 26):
-            for j in range(0, 26):
-                char_to_add = j + i + 97
-                if char_to_add > 122:
-                    char_to_add -= 26
-                self.matrix[i][j] = (chr(char_to_add))
-
-        return
+        self.matrix = [list(row) for row in
+                       KeyCache.SCHEDULES.get(("vigenre-rows",), make_rows)]
 
     # Determine if the key is valid or not
     # Input: User defined key
     # Output: True of False if the key is valid
     def set_key(self, key):
+        if self.alphabet == Alphabet.BYTES:
+            return self.set_byte_key(key)
+
         key = key.lower()
 
+        # An empty key has nothing to repeat across the text
+        if not key:
+            return False
+
         # Check if key is a-z lowercase
         for c in key:
             if 97 <= ord(c) <= 122:
@@ -47,83 +356,188 @@ class Vigenre(CipherInterface.CipherInterface):
 
         # If we make it out of the loop without returning, key is fine
         self.key = key
-        return True
 
-    # The key needs to be modified to be the same length as the text
-    # Input: A string of text
-    # Output: A key matching the length of the input
-    def modify_key(self, in_text):
-        key = self.key
-        text = in_text
-
-        length_of_key = len(key)
-        length_of_text = len(text)
-
-        # If the key is smaller than the plain text, duplicate it until it is
-        # equal or greater than the size of the plain text
-        while length_of_key < length_of_text:
-            key += self.key
-            length_of_key = len(key)
+        # Each key letter is a Caesar shift, a = 0 through z = 25
+        self.shifts = KeyCache.SCHEDULES.get(("vigenre-shifts", key),
+                                             lambda: make_shifts(key))
+        return True
 
-        # If the key is greater than the plain text, remove letters from the
-        # back to make the lengths equal
-        if length_of_key > length_of_text:
-            num_to_remove = length_of_key - length_of_text
-            key = key[:-num_to_remove]
+    # Any key works over the bytes alphabet, as long as every character is
+    # a byte. Each one is the shift for its spot, a = 97 and so on.
+    # Input: User defined key
+    # Output: True of False if the key is valid
+    def set_byte_key(self, key):
+        if not key or max(map(ord, key)) >= Alphabet.SIZE:
+            return False
 
-        return key
+        self.key = key
+        self.shifts = KeyCache.SCHEDULES.get(
+            ("vigenre-byte-shifts", key),
+            lambda: tuple(key.encode("latin-1")))
+        return True
 
     # Encrypt the given plain text based on the key
-    # Input: A string of plain text
+    # Input: A string (or bytes) of plain text
     # Output: The resulting cipher text
     def encrypt(self, plain_text):
-        cipher_text = ""
-
-        # Strip all whitespace from the plain text
-        plain = "".join(plain_text.split())
-
-        # Modify key to match plain text length
-        key = self.modify_key(plain)
+        return as_bytes_result(self.encrypt_part(plain_text, self.shifts)[0])
 
-        # Find the spot in the matrix to begin encryption
-        for i in range(0, len(plain)):
-            # Row - Subtract 97 to find proper spot in the matrix
-            matrix_index_for_key = ord(key[i]) - 97
+    # Encrypt text starting part way through the key, cleaning it up with
+    # the cipher's policy first. Normalized text has no whitespace left to
+    # strip. Passthrough only uses up a key letter on letters.
+    # Input: A string (or bytes) of plain text, the key shifts and the
+    #        position in the key to start from
+    # Output: The cipher text and how many key letters were used
+    def encrypt_part(self, plain_text, shifts, phase=0):
+        if self.alphabet == Alphabet.BYTES:
+            return encrypt_bytes(plain_text, shifts, phase)
 
-            # Column - Subtract 97 to find proper spot in the matrix
-            matrix_index_for_plain = ord(plain[i]) - 97
+        if self.policy == Normalize.PASSTHROUGH:
+            return Normalize.pass_through(
+                plain_text, lambda letters: apply_key(
+                    letters, shifts, Normalize.SHIFT_TABLES, phase)[0])
 
-            # Build cipher text
-            cipher_text += \
-                self.matrix[matrix_index_for_key][matrix_index_for_plain]
+        if self.policy == Normalize.KEEP:
+            return encrypt_text(plain_text, shifts, phase)
 
-        return cipher_text
+        return apply_key(self.normalize(plain_text), shifts, ENCRYPT_TABLES,
+                         phase)
 
     # Decrypt the given cipher text based on the key
-    # Input: A string of cipher text
+    # Input: A string (or bytes) of cipher text
     # Output: The resulting plain text
     def decrpyt(self, cipher_text):
-        key = self.modify_key(cipher_text)
-        cipher = cipher_text
-        plain_text = ""
-
-        # Find the spot in the matrix to begin encryption
-        for i in range(0, len(key)):
-            # The letter of the cipher text we need to find in the matrix
-            letter = cipher[i]
-
-            # Row - Subtract 97 to find proper spot in the matrix
-            matrix_index_for_key = ord(key[i]) - 97
-
-            # Look through the matrix at row found in previous step for the
-            # letter of the cipher text
-            for j in range(0, 26):
-                # When the letter is found, use the index it is at to determine
-                # which letter of plain text it maps to
-                if self.matrix[matrix_index_for_key][j] == letter:
-                    # Build the plain text
-                    plain_text += chr(j+97)
-
-                    break
-
-        return plain_text
+        if self.alphabet == Alphabet.BYTES:
+            return bytes(decrypt_bytes(cipher_text, self.shifts)[0])
+
+        return as_bytes_result(self.decrypt_part(cipher_text,
+                                                 self.shifts)[0])
+
+    # Decrypt text starting part way through the key. Passthrough leaves
+    # everything but the letters where it is, the rest drops it.
+    # Input: A string (or bytes) of cipher text, the key shifts and the
+    #        position in the key to start from
+    # Output: The plain text and how many key letters were used
+    def decrypt_part(self, cipher_text, shifts, phase=0):
+        if self.policy == Normalize.PASSTHROUGH:
+            return Normalize.pass_through(
+                cipher_text, lambda letters: apply_key(
+                    letters, shifts, Normalize.UNSHIFT_TABLES, phase)[0])
+
+        return decrypt_text(cipher_text, shifts, phase)
+
+    # Encrypt straight from one buffer into another. The key is applied a
+    # block at a time into dst, so neither side is copied whole.
+    # Input: A buffer of plain text and a writable buffer for the result
+    # Output: The number of bytes written to dst
+    def encrypt_into(self, src, dst):
+        if self.alphabet == Alphabet.BYTES:
+            return apply_key(src, self.shifts, BYTE_ENCRYPT_TABLES,
+                             out=dst)[0]
+
+        if self.policy != Normalize.KEEP:
+            return CipherInterface.CipherInterface.encrypt_into(self, src,
+                                                                dst)
+
+        return apply_key(src, self.shifts, ENCRYPT_TABLES,
+                         delete=CipherInterface.BYTE_WHITESPACE, out=dst)[0]
+
+    # Decrypt straight from one buffer into another
+    # Input: A buffer of cipher text and a writable buffer for the result
+    # Output: The number of bytes written to dst
+    def decrypt_into(self, src, dst):
+        if self.alphabet == Alphabet.BYTES:
+            return apply_key(src, self.shifts, BYTE_DECRYPT_TABLES,
+                             out=dst)[0]
+
+        if self.policy == Normalize.PASSTHROUGH:
+            return CipherInterface.CipherInterface.decrypt_into(self, src,
+                                                                dst)
+
+        return apply_key(src, self.shifts, DECRYPT_TABLES, drop=True,
+                         out=dst)[0]
+
+    # Encrypt many texts, every one from the start of the key, with one
+    # pass of the key over all of them
+    # Input: A list of strings (or bytes) of plain text
+    # Output: A list of the cipher texts, in the same order
+    def encrypt_many(self, plain_texts):
+        if self.alphabet == Alphabet.BYTES:
+            texts = list(map(CipherInterface.raw_bytes, plain_texts))
+            out, starts = apply_key_many(texts, self.shifts,
+                                         BYTE_ENCRYPT_TABLES)
+            return [out[start:start + len(text)]
+                    for start, text in zip(starts, texts)]
+
+        if self.policy != Normalize.KEEP:
+            plain_texts = [self.normalize(text) for text in plain_texts]
+
+        texts, is_str = CipherInterface.as_byte_texts(plain_texts)
+        if texts is None or self.policy == Normalize.PASSTHROUGH:
+            return CipherInterface.CipherInterface.encrypt_many(self,
+                                                                plain_texts)
+
+        # Strip the same whitespace encrypt would for the type of the texts
+        if self.policy == Normalize.KEEP:
+            whitespace = CipherInterface.BYTE_WHITESPACE \
+                if not is_str else CipherInterface.ASCII_WHITESPACE
+            texts = [text.translate(None, whitespace) for text in texts]
+
+        out, starts = apply_key_many(texts, self.shifts, ENCRYPT_TABLES)
+        return CipherInterface.from_byte_texts(
+            [out[start:start + len(text)]
+             for start, text in zip(starts, texts)], is_str)
+
+    # Decrypt many texts with one pass of the key over all of them
+    # Input: A list of strings (or bytes) of cipher text
+    # Output: A list of the plain texts, in the same order
+    def decrypt_many(self, cipher_texts):
+        if self.alphabet == Alphabet.BYTES:
+            texts = list(map(CipherInterface.raw_bytes, cipher_texts))
+            out, starts = apply_key_many(texts, self.shifts,
+                                         BYTE_DECRYPT_TABLES)
+            return [out[start:start + len(text)]
+                    for start, text in zip(starts, texts)]
+
+        texts, is_str = CipherInterface.as_byte_texts(cipher_texts)
+        if texts is None or self.policy == Normalize.PASSTHROUGH:
+            return CipherInterface.CipherInterface.decrypt_many(self,
+                                                                cipher_texts)
+
+        out, starts = apply_key_many(texts, self.shifts, DECRYPT_TABLES)
+        dropped = bytes([DROPPED])
+        return CipherInterface.from_byte_texts(
+            [out[start:start + len(text)].replace(dropped, b"")
+             for start, text in zip(starts, texts)], is_str)
+
+    # Input: None
+    # Output: An object with update() and finalize()
+    def encryptor(self):
+        return KeyStream(self.encrypt_part, self.shifts, self.empty_text())
+
+    # Input: None
+    # Output: An object with update() and finalize()
+    def decryptor(self):
+        if self.alphabet == Alphabet.BYTES:
+            return KeyStream(decrypt_bytes, self.shifts, b"")
+
+        return KeyStream(self.decrypt_part, self.shifts)
+
+    # Input: "e" or "d" and the whitespace to delete
+    # Output: Whitespace is deleted when encrypting and there is one table
+    #         per key letter. Decrypting drops anything that isn't a letter.
+    #         The bytes alphabet deletes and drops nothing.
+    def substitution(self, mode,
+                     whitespace=CipherInterface.BYTE_WHITESPACE):
+        if self.alphabet == Alphabet.BYTES:
+            tables = BYTE_ENCRYPT_TABLES if mode == "e" else \
+                BYTE_DECRYPT_TABLES
+            return b"", [list(tables[shift][1]) for shift in self.shifts]
+
+        if mode == "e":
+            return whitespace, \
+                [list(ENCRYPT_TABLES[shift][1]) for shift in self.shifts]
+
+        return b"", [[-1 if c == DROPPED else c
+                      for c in DECRYPT_TABLES[shift][1]]
+                     for shift in self.shifts]
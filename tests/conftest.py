@@ -0,0 +1,33 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: conftest.py                                                      #
+# Description: The cipher modules sit at the top of the repo and import each  #
+#              other by name, so the tests need that folder on the path.      #
+#              Run the tests from the top of the repo with python3 -m pytest  #
+#              The texts every way of reading a file is checked with are here #
+#              too.                                                           #
+###############################################################################
+
+import os
+import pytest
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Text mode turns \r\n into \n, decodes UTF-8 and str counts \x1c as
+# whitespace, none of which the bytes see
+TEXTS = {"plain": "attack at dawn\nby the old mill\n" * 50,
+         "windows": "Café attack\r\nat dawn\x1c by the mill\r\n" * 50}
+
+
+# A text the CLI has to read the same way whichever path it takes
+@pytest.fixture(params=list(TEXTS.values()), ids=list(TEXTS))
+def text(request):
+    return request.param
+
+
+# Input: None
+# Output: Every text, by name
+@pytest.fixture
+def texts():
+    return dict(TEXTS)
@@ -0,0 +1,32 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_batch.py                                                    #
+# Description: Tests for running a cipher over a batch of files               #
+###############################################################################
+
+import Cipher
+import pytest
+
+
+# Every file in a batch has to come out the way the CLI writes it on its
+# own, the batch used to work on the raw bytes
+@pytest.mark.parametrize("name, key", [("caesar", "3"), ("vigenre", "lemon"),
+                                       ("playfair", "monarchy"),
+                                       ("railfence", "3")])
+def test_batch_matches_single_files(tmp_path, name, key, texts):
+    in_dir = tmp_path / "in"
+    in_dir.mkdir()
+    for text_name, text in texts.items():
+        (in_dir / (text_name + ".txt")).write_bytes(text.encode("utf-8"))
+
+    for mode in ("-e", "-d"):
+        out_dir = tmp_path / ("batch" + mode)
+        Cipher.main(["-b", "-w", "2", "-c", name, "-k", key, mode,
+                     str(in_dir), "-o", str(out_dir)])
+
+        for text_name in texts:
+            file_name = text_name + ".txt"
+            single = tmp_path / "single.txt"
+            Cipher.main(["-c", name, "-k", key, mode,
+                         str(in_dir / file_name), "-o", str(single)])
+            assert (out_dir / file_name).read_bytes() == single.read_bytes()
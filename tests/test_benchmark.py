@@ -0,0 +1,73 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_benchmark.py                                                #
+# Description: Tests for the benchmark's corpus and regression gate           #
+###############################################################################
+
+import Benchmark
+import json
+
+
+# Input: The MB/s and seconds of a measurement and whether it was bytes
+# Output: A result record for caesar encrypt of 1MB
+def record(mb_per_sec, seconds=1.0, use_bytes=False, key="3"):
+    result = Benchmark.make_record("caesar", key, 1 << 20, "encrypt",
+                                   seconds, use_bytes)
+    result["mb_per_sec"] = mb_per_sec
+    return result
+
+
+def test_corpus_is_deterministic():
+    for size in (100, Benchmark.PIECE_SIZE + 1):
+        assert Benchmark.make_corpus(size, 5) == \
+            Benchmark.make_corpus(size, 5)
+        assert len(Benchmark.make_corpus(size, 5)) == size
+    assert Benchmark.make_corpus(1000, 1) != Benchmark.make_corpus(1000, 2)
+
+
+def test_slowdown_past_threshold():
+    baseline = [record(100.0)]
+
+    assert Benchmark.find_regressions([record(91.0)], baseline, 10) == []
+    regressions = Benchmark.find_regressions([record(89.0)], baseline, 10)
+    assert len(regressions) == 1
+    assert round(regressions[0][2]) == 11
+
+
+# Short calls are noisy, they get SHORT_TOLERANCE times the threshold
+def test_short_calls_are_allowed_more():
+    short = Benchmark.SHORT_CALL / 2
+    baseline = [record(100.0, short)]
+
+    assert Benchmark.find_regressions([record(75.0, short)], baseline,
+                                      10) == []
+    assert len(Benchmark.find_regressions([record(65.0, short)], baseline,
+                                          10)) == 1
+
+
+def test_missing_baseline_record_is_skipped():
+    baseline = [record(100.0, key="23")]
+    assert Benchmark.find_regressions([record(1.0)], baseline, 10) == []
+
+
+# The str and bytes paths used to be compared with each other
+def test_bytes_and_str_are_different_measurements():
+    baseline = [record(100.0, use_bytes=True)]
+    assert Benchmark.find_regressions([record(1.0)], baseline, 10) == []
+
+
+def test_baseline_of_the_other_path_is_refused(tmp_path):
+    baseline = tmp_path / "str.json"
+    argv = ["-c", "caesar", "-s", "1KB", "-r", "1"]
+    Benchmark.main(argv + ["-o", str(baseline)])
+
+    assert Benchmark.main(argv + ["--bytes", "--baseline", str(baseline),
+                                  "-o", str(tmp_path / "bytes.json")]) == 2
+
+    # Old baselines only say which path they timed for the whole report
+    report = json.loads(baseline.read_text())
+    for result in report["results"]:
+        del result["bytes"]
+    baseline.write_text(json.dumps(report))
+    assert Benchmark.main(argv + ["--bytes", "--baseline", str(baseline),
+                                  "-o", str(tmp_path / "bytes.json")]) == 2
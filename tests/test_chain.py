@@ -0,0 +1,63 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_chain.py                                                    #
+# Description: Tests for running chains of ciphers                            #
+###############################################################################
+
+import Chain
+import Cipher
+import pytest
+
+STAGES = "vigenre:lemon,caesar:3,railfence:3,rowtransposition:3142"
+TEXT = "Attack at dawn\tby the\x1cold mill\n" * 20
+
+
+# Counts the folded passes while the real ones run
+@pytest.fixture
+def passes(monkeypatch):
+    counts = {"substitutions": 0, "transpositions": 0}
+
+    def counted(name, run):
+        def run_counted(self, data):
+            counts[name] += 1
+            return run(self, data)
+        return run_counted
+
+    monkeypatch.setattr(Chain.Substitutions, "run",
+                        counted("substitutions", Chain.Substitutions.run))
+    monkeypatch.setattr(Chain.Transpositions, "run",
+                        counted("transpositions", Chain.Transpositions.run))
+    return counts
+
+
+# Text read by the CLI is str, it used to go through every stage in turn
+def test_cli_text_is_folded(tmp_path, passes):
+    in_file = tmp_path / "plain.txt"
+    out_file = tmp_path / "cipher.txt"
+    back_file = tmp_path / "back.txt"
+    in_file.write_text(TEXT)
+
+    Cipher.main(["-c", STAGES, "-e", str(in_file), "-o", str(out_file)])
+    assert passes == {"substitutions": 1, "transpositions": 1}
+
+    Cipher.main(["-c", STAGES, "-d", str(out_file), "-o", str(back_file)])
+    assert passes == {"substitutions": 2, "transpositions": 2}
+
+    expected = TEXT
+    for stage in STAGES.split(","):
+        name, key = stage.split(":")
+        expected = Cipher.encrypt(name, key, expected)
+    assert out_file.read_text() == expected
+    assert back_file.read_text() == \
+        Cipher.decrypt("chain", STAGES, Cipher.encrypt("chain", STAGES, TEXT))
+
+
+# Playfair can't be folded, it is given str and sees the same whitespace
+def test_folded_str_matches_each_stage():
+    stages = "vigenre:lemon,playfair:monarchy,caesar:3"
+    expected = TEXT
+    for stage in stages.split(","):
+        name, key = stage.split(":")
+        expected = Cipher.encrypt(name, key, expected)
+
+    assert Cipher.encrypt("chain", stages, TEXT) == expected
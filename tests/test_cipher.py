@@ -0,0 +1,94 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_cipher.py                                                   #
+# Description: Tests for building ciphers from Python                         #
+###############################################################################
+
+import Cipher
+import pytest
+
+
+def test_unknown_alphabet():
+    with pytest.raises(ValueError, match="Unknown alphabet: hex"):
+        Cipher.encrypt("caesar", "3", b"abc", alphabet="hex")
+
+
+def test_alphabet_the_cipher_cant_use():
+    with pytest.raises(ValueError, match="can't work over the bytes"):
+        Cipher.encrypt("playfair", "monarchy", b"abc", alphabet="bytes")
+
+
+ALL_BYTES = bytes(range(256)) * 3 + bytes(range(255, -1, -1))
+
+
+# Every byte value has to come back out, whatever the key
+@pytest.mark.parametrize("name, key", [("caesar", "3"), ("caesar", "255"),
+                                       ("vigenre", "lemon"),
+                                       ("vigenre", "\xff\x00k"),
+                                       ("railfence", "7"),
+                                       ("rowtransposition", "3142"),
+                                       ("chain", "vigenre:lemon,caesar:3,"
+                                                 "railfence:3")])
+def test_bytes_alphabet_round_trip(name, key):
+    cipher = Cipher.make_cipher(name, key, alphabet="bytes")
+
+    encrypted = cipher.encrypt(ALL_BYTES)
+    assert len(encrypted) == len(ALL_BYTES)
+    assert cipher.decrpyt(encrypted) == ALL_BYTES
+    assert cipher.decrypt_many(cipher.encrypt_many([ALL_BYTES, b"\x00"])) \
+        == [ALL_BYTES, b"\x00"]
+
+    stream = cipher.encryptor()
+    chunks = [stream.update(ALL_BYTES[i:i + 100])
+              for i in range(0, len(ALL_BYTES), 100)]
+    assert b"".join(chunks) + stream.finalize() == encrypted
+
+
+CIPHERS = [("caesar", "3"), ("vigenre", "lemon"), ("playfair", "monarchy"),
+           ("railfence", "3"), ("rowtransposition", "3142"),
+           ("chain", "vigenre:lemon,caesar:3")]
+
+
+# Input: The command line arguments and the file the output goes to
+# Output: What was written to the file, as bytes
+def run_cli(argv, out_file):
+    Cipher.main(argv + ["-o", str(out_file)])
+    return out_file.read_bytes()
+
+
+# Mapping the files or overlapping the I/O used to work on the raw bytes
+# and give different cipher text than the plain run
+@pytest.mark.parametrize("flag", ["--mmap", "--pipeline"])
+@pytest.mark.parametrize("name, key", CIPHERS)
+def test_io_flags_match_plain_run(tmp_path, flag, name, key, text):
+    in_file = tmp_path / "in.txt"
+    in_file.write_bytes(text.encode("utf-8"))
+
+    for mode in ("-e", "-d"):
+        argv = ["-c", name, "-k", key, mode, str(in_file)]
+        assert run_cli(argv + [flag], tmp_path / "flag.txt") == \
+            run_cli(argv, tmp_path / "plain.txt")
+
+
+# A run that fails part way used to leave its output behind, cut short or
+# full of NULs from laying out the mapped file
+@pytest.mark.parametrize("flags", [[], ["--mmap"], ["--pipeline"]])
+@pytest.mark.parametrize("name, key", [("caesar", "3"), ("railfence", "3")])
+def test_failed_run_leaves_no_output(tmp_path, flags, name, key):
+    in_file = tmp_path / "in.txt"
+    in_file.write_text("attack at dawn\n" * 100 + "1\n")
+    out_file = tmp_path / "out.txt"
+
+    Cipher.main(["-c", name, "-k", key, "--normalize", "reject", "-e",
+                 str(in_file), "-o", str(out_file)] + flags)
+    assert not out_file.exists()
+
+
+def test_bad_key_leaves_no_output(tmp_path):
+    in_file = tmp_path / "in.txt"
+    in_file.write_text("attack at dawn\n")
+    out_file = tmp_path / "out.txt"
+
+    Cipher.main(["-c", "caesar", "-k", "x", "-e", str(in_file), "-o",
+                 str(out_file)])
+    assert not out_file.exists()
@@ -0,0 +1,26 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_crackcaesar.py                                              #
+# Description: Tests for ranking Caesar keys                                  #
+###############################################################################
+
+import Cipher
+import CrackCaesar
+import English
+import pytest
+
+
+@pytest.mark.parametrize("key", [1, 3, 13, 25])
+def test_right_key_ranks_first(key):
+    cipher_text = Cipher.encrypt("caesar", str(key), English.SAMPLE_TEXT)
+    ranked = CrackCaesar.crack(cipher_text)
+
+    assert sorted(k for k, _, _ in ranked) == list(CrackCaesar.KEYS)
+    assert ranked[0][0] == key
+    assert ranked[0][1] > 0.99
+    assert CrackCaesar.decrypt(cipher_text) == \
+        (key, Cipher.decrypt("caesar", str(key), cipher_text))
+
+
+def test_no_letters():
+    assert CrackCaesar.crack("123 !?") == []
@@ -0,0 +1,68 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_crackplayfair.py                                            #
+# Description: Tests for the Playfair key search                              #
+###############################################################################
+
+import Cipher
+import CrackPlayfair
+import English
+import NGrams
+import random
+
+KEY = "monarchy"
+
+
+# Input: How many characters of the sample text to use and where to start
+# Output: The text encrypted with KEY
+def sample_cipher_text(length, start=0):
+    return Cipher.encrypt("playfair", KEY,
+                          English.SAMPLE_TEXT[start:start + length])
+
+
+# The default target used to sit above what a right decryption scores, so
+# the search never stopped early
+def test_right_decryption_reaches_default_target():
+    scorer = NGrams.default_table(4)
+    target = CrackPlayfair.default_target(scorer)
+
+    for length in (600, 1200, 2400):
+        for start in range(0, len(English.SAMPLE_TEXT) - length, 300):
+            cipher_text = sample_cipher_text(length, start)
+            decrypted = Cipher.decrypt("playfair", KEY, cipher_text)
+            assert scorer.average(decrypted) >= target
+
+
+def test_reaching_target_stops_other_restarts():
+    iterations = 5000
+    results, tried, seconds = CrackPlayfair.solve(
+        sample_cipher_text(200), restarts=4, iterations=iterations,
+        workers=1, target=-100.0)
+
+    # Running every restart would try more than 4 * iterations keys
+    assert tried < 3 * iterations
+
+
+def test_zero_iterations_only_polishes():
+    digraphs = CrackPlayfair.Digraphs(sample_cipher_text(200))
+    score, square, tried = CrackPlayfair.anneal(
+        digraphs, NGrams.default_table(4), random.Random(0), iterations=0)
+
+    assert sorted(square) == CrackPlayfair.SQUARE_LETTERS
+    assert tried > 0
+
+
+# Swapping two letters only looks up the pairs they are in again, the result
+# has to match working out every pair
+def test_swap_table_matches_spot_table():
+    digraphs = CrackPlayfair.Digraphs(sample_cipher_text(600))
+    rng = random.Random(1)
+    square = bytes(rng.sample(CrackPlayfair.SQUARE_LETTERS, 25))
+    table = digraphs.spot_table(square)
+
+    for _ in range(200):
+        candidate, swapped = CrackPlayfair.change_square(square, rng)
+        if swapped is not None:
+            assert digraphs.swap_table(table, candidate, *swapped) == \
+                digraphs.spot_table(candidate)
+        square, table = candidate, digraphs.spot_table(candidate)
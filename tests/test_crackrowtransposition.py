@@ -0,0 +1,30 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_crackrowtransposition.py                                    #
+# Description: Tests for the Row Transposition key search                     #
+###############################################################################
+
+import Cipher
+import CrackRowTransposition
+import English
+import pytest
+
+
+@pytest.mark.parametrize("key", ["3142", "524163"])
+def test_right_key_ranks_first(key):
+    cipher_text = Cipher.encrypt("rowtransposition", key, English.SAMPLE_TEXT)
+    ranked, total, scored, pruned = CrackRowTransposition.crack(
+        cipher_text, lengths=[len(key)], workers=1)
+
+    assert ranked[0][1] == key
+
+
+# Splitting the search over the pool has to find the same keys as running
+# it here
+def test_pool_matches_serial():
+    cipher_text = Cipher.encrypt("rowtransposition", "35142",
+                                 English.SAMPLE_TEXT)
+
+    serial = CrackRowTransposition.crack(cipher_text, top=5, workers=1)
+    pooled = CrackRowTransposition.crack(cipher_text, top=5, workers=2)
+    assert pooled == serial
@@ -0,0 +1,18 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_crackvigenre.py                                             #
+# Description: Tests for recovering Vigenre keys                              #
+###############################################################################
+
+import Cipher
+import CrackVigenre
+import English
+import pytest
+
+
+@pytest.mark.parametrize("key", ["lemon", "thequickfox", "k"])
+def test_recover_key(key):
+    cipher_text = Cipher.encrypt("vigenre", key, English.SAMPLE_TEXT)
+
+    assert CrackVigenre.crack(cipher_text)[0][0] == key
+    assert CrackVigenre.recover_key(cipher_text) == key
@@ -0,0 +1,43 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_differential.py                                             #
+# Description: Tests that the fast ciphers give what Reference.py gives. Only #
+#              the results are checked here, the time budgets are left to     #
+#              python3 Differential.py                                        #
+###############################################################################
+
+import Cipher
+import Differential
+import pytest
+import random
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("name", sorted(Differential.KEYS))
+def test_fast_matches_reference(name, seed):
+    rng = random.Random(seed)
+    for size in ("tiny", "small", "medium"):
+        cases, failures, slow = Differential.run_class(name, size, 10, rng,
+                                                       timing=False)
+        assert failures == 0
+
+
+# Only the first text of a batch used to be checked, a batch that gets the
+# later ones wrong has to fail and shrink on its own path
+def test_later_batch_items_are_checked(monkeypatch):
+    cipher = Cipher.make_cipher("vigenre", "lemon")
+
+    def encrypt_many(texts):
+        return [cipher.encrypt(texts[0])] + \
+            [cipher.encrypt("x" + text) for text in texts[1:]]
+
+    monkeypatch.setattr(cipher, "encrypt_many", encrypt_many)
+
+    problems = Differential.check_case("vigenre", "lemon", "attack at dawn")
+    assert any(problem.startswith("many[1] e") for problem in problems)
+    assert not any(problem.startswith("many[0]") for problem in problems)
+
+    key, text, problems = Differential.shrink("vigenre", "lemon",
+                                              "attack at dawn")
+    assert len(text) <= 1
+    assert problems
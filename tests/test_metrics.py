@@ -0,0 +1,39 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_metrics.py                                                  #
+# Description: Tests for the timings the cipher driver records                #
+###############################################################################
+
+import Cipher
+import Metrics
+import io
+import pytest
+
+
+# Vigenre and Playfair streams don't go through encrypt or decrpyt, they
+# used to record no calls at all
+@pytest.mark.parametrize("name, key", [("vigenre", "lemon"),
+                                       ("playfair", "monarchy"),
+                                       ("caesar", "3")])
+@pytest.mark.parametrize("mode", ["e", "d"])
+def test_stream_calls_are_timed(name, key, mode):
+    metrics = Metrics.Metrics()
+    cipher = Cipher.make_cipher(name, key)
+    output_file = io.StringIO()
+
+    Cipher.run_file(cipher, mode, io.StringIO("attack at dawn"), output_file,
+                    metrics=metrics)
+
+    stream = "encryptor" if mode == "e" else "decryptor"
+    assert metrics.calls[stream + ".update"]["calls"] == 1
+    assert metrics.calls[stream + ".update"]["bytes"] == 14
+    assert metrics.calls[stream + ".finalize"]["calls"] == 1
+    assert output_file.getvalue()
+
+
+# The cipher in the cache is shared, only the copy is timed
+def test_cached_cipher_is_left_alone():
+    cipher = Cipher.make_cipher("vigenre", "lemon")
+    Metrics.instrument(cipher, Metrics.Metrics())
+
+    assert "encryptor" not in vars(cipher)
@@ -0,0 +1,51 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_ngrams.py                                                   #
+# Description: Tests for n-gram scoring                                       #
+###############################################################################
+
+import English
+import NGrams
+import pytest
+
+
+# Quadgrams are scored through rows of the table, it has to add up to the
+# same as looking every index up
+@pytest.mark.parametrize("length", [0, 3, 4, 5, 8, 601])
+def test_quadgram_rows_match_indexes(tmp_path, length):
+    path = str(tmp_path / "english.ngrams")
+    NGrams.write_tables([NGrams.build_table(English.SAMPLE_TEXT, 4)], path)
+    table = NGrams.open_tables(path)[4]
+    codes = NGrams.to_codes(English.SAMPLE_TEXT)[:length]
+
+    expected = sum(map(table.log_probs.__getitem__,
+                       NGrams.gram_indexes(codes, 4)))
+    assert table.score_codes(codes) == pytest.approx(expected)
+
+
+# The rows are views of the mapped file, not a copy of the table
+def test_rows_share_the_mapped_table(tmp_path):
+    path = str(tmp_path / "english.ngrams")
+    NGrams.write_tables([NGrams.build_table(English.SAMPLE_TEXT, 4)], path)
+    table = NGrams.open_tables(path)[4]
+
+    rows = table.pair_rows()
+    assert all(isinstance(row, memoryview) for row in rows)
+    assert len(set(map(id, rows))) == 26 * 26
+
+
+# The mapped file holds float32, scores from it have to match the table it
+# was written from
+@pytest.mark.parametrize("n", [2, 3, 4])
+def test_table_file_matches_build_table(tmp_path, n):
+    path = str(tmp_path / "english.ngrams")
+    built = NGrams.build_table(English.SAMPLE_TEXT, n)
+    NGrams.write_tables([built], path)
+    mapped = NGrams.open_tables(path)[n]
+
+    text = English.SAMPLE_TEXT[:500] + " zqxj qqqq"
+    assert mapped.floor == pytest.approx(built.floor)
+    assert mapped.score(text) == pytest.approx(built.score(text))
+    assert mapped.average(text) == pytest.approx(built.average(text))
+    assert NGrams.load_table(path, n).score(text) == \
+        pytest.approx(built.score(text))
@@ -0,0 +1,85 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_normalize.py                                                #
+# Description: Tests for cleaning up plain text before it is encrypted       #
+###############################################################################
+
+import Cipher
+import Normalize
+import pytest
+import tracemalloc
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Hello, World 123\n", "helloworld"),
+    ("Café au lait\x1c!", "cafaulait"),
+    (b"Hello, World 123\n", b"helloworld"),
+])
+def test_strip(text, expected):
+    assert Normalize.strip(text) == expected
+
+
+# Stripping ASCII str used to encode, translate and decode it, three copies
+def test_strip_copies_str_once():
+    text = "Hello, World 123\n" * 100000
+
+    tracemalloc.start()
+    try:
+        Normalize.strip(text)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < 1.5 * len(text)
+
+
+PASSTHROUGH_TEXT = "Hello, World! Café 123\nattack AT dawn\r\n"
+
+
+# Passthrough ciphers the letters and leaves everything else in place
+@pytest.mark.parametrize("name, key", [("caesar", "3"), ("vigenre", "lemon")])
+@pytest.mark.parametrize("as_bytes", [False, True])
+def test_passthrough(name, key, as_bytes):
+    cipher = Cipher.make_cipher(name, key, policy=Normalize.PASSTHROUGH)
+    text = PASSTHROUGH_TEXT.encode() if as_bytes else PASSTHROUGH_TEXT
+
+    encrypted = cipher.encrypt(text)
+    assert len(encrypted) == len(text)
+    assert Normalize.strip(encrypted) == \
+        Cipher.encrypt(name, key, Normalize.strip(text))
+    runs = Normalize.NOT_LETTER_RUNS if as_bytes else \
+        Normalize.STR_NOT_LETTER_RUNS
+    assert list(map(len, runs.split(encrypted))) == \
+        list(map(len, runs.split(text)))
+    assert runs.split(encrypted)[1::2] == runs.split(text)[1::2]
+    assert cipher.decrpyt(encrypted) == text
+    assert cipher.encrypt_many([text, text]) == [encrypted, encrypted]
+    assert cipher.decrypt_many([encrypted]) == [text]
+
+
+# Vigenre only moves on through the key at letters, so where a chunk ends
+# doesn't matter
+def test_passthrough_stream():
+    cipher = Cipher.make_cipher("vigenre", "lemon",
+                                policy=Normalize.PASSTHROUGH)
+    for make_stream, function in ((cipher.encryptor, cipher.encrypt),
+                                  (cipher.decryptor, cipher.decrpyt)):
+        stream = make_stream()
+        out = "".join(stream.update(PASSTHROUGH_TEXT[i:i + 3])
+                      for i in range(0, len(PASSTHROUGH_TEXT), 3))
+        assert out + stream.finalize() == function(PASSTHROUGH_TEXT)
+
+
+def test_passthrough_only_for_substitutions():
+    with pytest.raises(ValueError, match="can't use the passthrough"):
+        Cipher.make_cipher("playfair", "monarchy",
+                           policy=Normalize.PASSTHROUGH)
+
+
+# The library decrypt used to leave the policy out and lower case the text
+@pytest.mark.parametrize("name, key", [("caesar", "3"), ("vigenre", "lemon")])
+def test_passthrough_library_round_trip(name, key):
+    encrypted = Cipher.encrypt(name, key, PASSTHROUGH_TEXT,
+                               policy=Normalize.PASSTHROUGH)
+    assert Cipher.decrypt(name, key, encrypted,
+                          policy=Normalize.PASSTHROUGH) == PASSTHROUGH_TEXT
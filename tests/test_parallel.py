@@ -0,0 +1,28 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_parallel.py                                                 #
+# Description: Tests for splitting one file over several processes            #
+###############################################################################
+
+import Cipher
+import Parallel
+import pytest
+
+
+# -p has to write what a plain run writes, it used to work on the raw bytes
+@pytest.mark.parametrize("name, key", [("caesar", "3"), ("vigenre", "lemon"),
+                                       ("playfair", "monarchy")])
+def test_parallel_matches_plain_run(tmp_path, monkeypatch, name, key, text):
+    # Small segments and blocks, so even this text is split and cleaned up
+    # in place over several blocks
+    monkeypatch.setattr(Parallel, "MIN_SEGMENT_SIZE", 64)
+    monkeypatch.setattr(Cipher, "BLOCK_SIZE", 7)
+    in_file = tmp_path / "in.txt"
+    in_file.write_bytes(text.encode("utf-8"))
+
+    for mode in ("-e", "-d"):
+        argv = ["-c", name, "-k", key, mode, str(in_file), "-o"]
+        Cipher.main(argv + [str(tmp_path / "plain.txt")])
+        Cipher.main(["-p", "-w", "3"] + argv + [str(tmp_path / "p.txt")])
+        assert (tmp_path / "p.txt").read_bytes() == \
+            (tmp_path / "plain.txt").read_bytes()
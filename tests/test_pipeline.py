@@ -0,0 +1,60 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_pipeline.py                                                 #
+# Description: Tests for running a file through the read, cipher and write   #
+#              pipeline                                                       #
+###############################################################################
+
+import Cipher
+import Normalize
+import Pipeline
+import io
+import pytest
+import threading
+
+
+# Railfence only sees the text when it finishes, so reject raises from
+# finalize after the reader is done. That used to hang for good.
+@pytest.mark.parametrize("name, key", [("railfence", "3"),
+                                       ("rowtransposition", "3142")])
+def test_error_from_finalize(name, key):
+    cipher = Cipher.make_cipher(name, key, policy=Normalize.REJECT)
+    errors = []
+
+    def run():
+        try:
+            Pipeline.run_pipeline(cipher.encryptor(),
+                                  io.StringIO("attack at dawn 123\n"),
+                                  io.StringIO(), 4)
+        except ValueError as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(10)
+
+    assert not thread.is_alive()
+    assert len(errors) == 1
+
+
+# Small blocks split the text mid pair and mid key, the output still has to
+# be byte for byte what the serial run writes
+@pytest.mark.parametrize("name, key", [("caesar", "3"), ("vigenre", "lemon"),
+                                       ("playfair", "monarchy"),
+                                       ("railfence", "3"),
+                                       ("rowtransposition", "3142")])
+@pytest.mark.parametrize("buffer_size, depth", [("7", "1"), ("64", "3"),
+                                                ("1MB", "3")])
+def test_pipeline_matches_serial_run(tmp_path, text, name, key, buffer_size,
+                                     depth):
+    in_file = tmp_path / "in.txt"
+    in_file.write_bytes(text.encode("utf-8"))
+
+    for mode in ("-e", "-d"):
+        argv = ["-c", name, "-k", key, mode, str(in_file), "-o"]
+        Cipher.main(argv + [str(tmp_path / "serial.txt")])
+        Cipher.main(argv + [str(tmp_path / "pipeline.txt"), "--pipeline",
+                            "--buffer-size", buffer_size, "--queue-depth",
+                            depth])
+        assert (tmp_path / "pipeline.txt").read_bytes() == \
+            (tmp_path / "serial.txt").read_bytes()
@@ -0,0 +1,38 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_playfair.py                                                 #
+# Description: Tests for the Playfair cipher                                  #
+###############################################################################
+
+import KeyCache
+import Playfair
+
+
+# Input: The key
+# Output: A Playfair cipher with its matrix built
+def make(key):
+    cipher = Playfair.Playfair()
+    assert cipher.set_key(key)
+    cipher.construct_key_matrix(key)
+    return cipher
+
+
+# Repeated letters build the same matrix, so they share one cache entry
+def test_same_matrix_shares_cache_entry():
+    KeyCache.SCHEDULES.clear()
+    first = make("hello")
+    second = make("hellooo")
+
+    assert len(KeyCache.SCHEDULES) == 1
+    assert first.matrix == second.matrix
+    assert first.encrypt("attack at dawn") == second.encrypt("attack at dawn")
+
+
+# j is turned into i after the check for duplicates, so these differ
+def test_different_matrix_keeps_own_entry():
+    KeyCache.SCHEDULES.clear()
+    make("i")
+    make("j")
+
+    assert len(KeyCache.SCHEDULES) == 2
+    assert make("j").matrix == [list(row) for row in Playfair.make_matrix("j")]
@@ -0,0 +1,79 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_server.py                                                   #
+# Description: Tests for how the server answers requests                      #
+###############################################################################
+
+import Cipher
+import Server
+import asyncio
+import json
+import pytest
+import types
+
+
+# Input: The request header, already JSON
+# Output: The status and body of the answer
+def answer(header, data=b""):
+    header = header.encode()
+    frame = Server.HEADER_LENGTH.pack(len(header)) + header + data
+    return asyncio.run(Server.Server(None).answer(frame))
+
+
+# Headers that aren't objects used to raise and leave the client waiting
+@pytest.mark.parametrize("header", ["[]", "3", "\"stats\"", "null"])
+def test_header_that_is_not_an_object(header):
+    status, body = answer(header)
+    assert status == Server.ERROR
+    assert body == b"The request header must be a JSON object"
+
+
+def test_request_is_answered():
+    header = json.dumps({"cipher": "caesar", "key": "3", "mode": "e"})
+    assert answer(header, b"abc") == (Server.OK, b"def")
+
+
+# Input: The Batcher and a list of data to send together
+# Output: The answer to each
+def submit_together(batcher, payloads):
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(*(
+            batcher.submit("caesar", "3", "e", data) for data in payloads)),
+            10)
+
+    return asyncio.run(run())
+
+
+# Only the request that fails gets an error, the rest of its group is
+# still answered
+def test_one_request_in_group_fails(monkeypatch):
+    cipher = Cipher.make_cipher("caesar", "3")
+
+    def encrypt(data):
+        if data == b"bad":
+            raise RuntimeError("broken")
+        return cipher.encrypt(data)
+
+    def encrypt_many(payloads):
+        return [encrypt(data) for data in payloads]
+
+    broken = types.SimpleNamespace(encrypt=encrypt, encrypt_many=encrypt_many)
+    monkeypatch.setattr(Cipher, "make_cipher", lambda name, key: broken)
+    batcher = Server.Batcher(None, Server.Stats())
+
+    assert submit_together(batcher, [b"abc", b"bad", b"xyz"]) == \
+        [(Server.OK, b"def"), (Server.ERROR, "broken"), (Server.OK, b"abc")]
+    assert batcher.stats.batches == 1
+
+
+# The batch is run from a timer on the loop, an error that got away used to
+# leave the whole group waiting for good
+def test_failed_batch_answers_whole_group(monkeypatch):
+    def run_batch(name, key, mode, payloads):
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr(Server, "run_batch", run_batch)
+    batcher = Server.Batcher(None, Server.Stats())
+
+    assert submit_together(batcher, [b"abc", b"xyz"]) == \
+        [(Server.ERROR, "broken")] * 2
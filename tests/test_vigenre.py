@@ -0,0 +1,81 @@
+###############################################################################
+# Programmer: Tyler Stickler                                                  #
+# File name: test_vigenre.py                                                  #
+# Description: Tests for the Vigenre cipher                                   #
+###############################################################################
+
+import Cipher
+import KeyCache
+import Vigenre
+import pytest
+import tracemalloc
+
+
+# The key "rows" used to share a cache entry with the 26x26 matrix
+def test_key_rows_after_build_rows():
+    KeyCache.SCHEDULES.clear()
+    cipher = Vigenre.Vigenre()
+    cipher.build_rows()
+
+    assert cipher.set_key("rows")
+    assert cipher.encrypt("hello") == "yshdf"
+    assert cipher.decrpyt("yshdf") == "hello"
+    assert len(cipher.matrix) == 26
+
+
+def test_build_rows_after_key_rows():
+    KeyCache.SCHEDULES.clear()
+    cipher = Vigenre.Vigenre()
+
+    assert cipher.set_key("rows")
+    cipher.build_rows()
+
+    assert cipher.matrix[1][:3] == ["b", "c", "d"]
+    assert cipher.encrypt("hello") == "yshdf"
+
+
+TEXT = "Attack at dawn\tby the\x1cold mill, café\r\n" * 30
+
+
+# Small blocks, so the key has to carry on from one block to the next
+@pytest.mark.parametrize("key", ["lemon", "k", "thequickbrownfoxjumps"])
+@pytest.mark.parametrize("text", [TEXT, TEXT.encode("utf-8"),
+                                  TEXT.encode("ascii", "ignore").decode()],
+                         ids=["str", "bytes", "ascii"])
+def test_blocks_match_one_block(monkeypatch, key, text):
+    cipher = Cipher.make_cipher("vigenre", key)
+    encrypted = cipher.encrypt(text)
+    decrypted = cipher.decrpyt(encrypted)
+
+    monkeypatch.setattr(Vigenre, "KEY_BLOCK", 50)
+    monkeypatch.setattr(Vigenre, "WIDE_BLOCK", 20)
+    monkeypatch.setattr(Vigenre, "MIN_COLUMN", 1)
+    assert cipher.encrypt(text) == encrypted
+    assert cipher.decrpyt(encrypted) == decrypted
+
+    stream = cipher.encryptor()
+    chunks = [stream.update(text[i:i + 77]) for i in range(0, len(text), 77)]
+    assert text[:0].join(chunks) + stream.finalize() == encrypted
+
+    if isinstance(text, bytes):
+        out = bytearray(len(text))
+        assert out[:cipher.encrypt_into(text, out)] == encrypted
+        assert out[:cipher.decrypt_into(encrypted, out)] == decrypted
+
+
+# Only the result is the size of the text, wide characters used to need a
+# list entry each and ASCII went through three copies
+@pytest.mark.parametrize("text", ["attack at dawn\n" * 200000,
+                                  "attack at café\n" * 200000],
+                         ids=["ascii", "wide"])
+def test_encrypt_copies_text_once(text):
+    cipher = Cipher.make_cipher("vigenre", "lemon")
+
+    tracemalloc.start()
+    try:
+        cipher.encrypt(text)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < 2 * len(text)